@@ -0,0 +1,116 @@
+import threading
+import time
+from enum import IntEnum
+from config import settings
+from logger import logger
+from exceptions import ServiceOverloadedException
+
+class Priority(IntEnum):
+    LOW = 0
+    NORMAL = 1
+    HIGH = 2
+
+# Endpoint analitik/export: boleh ditolak lebih dulu saat pool penuh
+LOW_PRIORITY_SUFFIXES = ("/stats", "/leaderboard", "/export", "/item-analysis", "/timeseries")
+
+def route_priority(method: str, path: str) -> Priority:
+    """Submit dan start attempt didahulukan, statistik/export paling akhir."""
+    path = path.rstrip("/")
+    if method == "POST" and (path.endswith("/submit") or path.endswith("/attempt")):
+        return Priority.HIGH
+    if path.endswith(LOW_PRIORITY_SUFFIXES):
+        return Priority.LOW
+    return Priority.NORMAL
+
+class PoolAdmission:
+    """Admission limiter di depan connection pool database.
+
+    Setiap request memegang satu slot selama memakai session. Jika semua slot
+    terpakai, request menunggu; jika antrean untuk prioritasnya sudah melewati
+    batas, atau menunggu lebih lama dari ``timeout``, request langsung ditolak
+    dengan 503 daripada menumpuk di threadpool.
+    """
+
+    def __init__(self, capacity: int, max_waiting: dict, timeout: float, retry_after: int, metrics_interval: int):
+        self.capacity = capacity
+        self.max_waiting = max_waiting
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.metrics_interval = metrics_interval
+        self._condition = threading.Condition()
+        self._in_use = 0
+        self._waiting = {priority: 0 for priority in Priority}
+        self._reset_metrics()
+
+    def _reset_metrics(self) -> None:
+        self._metrics_started = time.monotonic()
+        self._admitted = 0
+        self._rejected = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def _higher_waiting(self, priority: Priority) -> bool:
+        return any(self._waiting[other] for other in Priority if other > priority)
+
+    def acquire(self, priority: Priority = Priority.NORMAL) -> None:
+        started = time.monotonic()
+        with self._condition:
+            if self._in_use >= self.capacity and self._waiting[priority] >= self.max_waiting[priority]:
+                self._rejected += 1
+                raise ServiceOverloadedException(self.retry_after)
+
+            self._waiting[priority] += 1
+            try:
+                deadline = started + self.timeout
+                while self._in_use >= self.capacity or self._higher_waiting(priority):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._rejected += 1
+                        raise ServiceOverloadedException(self.retry_after)
+                    self._condition.wait(remaining)
+            finally:
+                self._waiting[priority] -= 1
+
+            self._in_use += 1
+            waited = time.monotonic() - started
+            self._admitted += 1
+            self._total_wait += waited
+            self._max_wait = max(self._max_wait, waited)
+
+    def release(self) -> None:
+        with self._condition:
+            self._in_use -= 1
+            self._condition.notify_all()
+            if time.monotonic() - self._metrics_started >= self.metrics_interval:
+                self._log_metrics()
+
+    def _log_metrics(self) -> None:
+        if self._admitted or self._rejected:
+            average_wait = self._total_wait / self._admitted * 1000 if self._admitted else 0.0
+            logger.info(
+                f"DB pool: in_use={self._in_use}/{self.capacity} "
+                f"waiting={sum(self._waiting.values())} admitted={self._admitted} "
+                f"rejected={self._rejected} avg_wait={average_wait:.1f}ms "
+                f"max_wait={self._max_wait * 1000:.1f}ms"
+            )
+        self._reset_metrics()
+
+    def snapshot(self) -> dict:
+        with self._condition:
+            return {
+                "in_use": self._in_use,
+                "capacity": self.capacity,
+                "waiting": {priority.name.lower(): count for priority, count in self._waiting.items()}
+            }
+
+db_admission = PoolAdmission(
+    capacity=settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW,
+    max_waiting={
+        Priority.HIGH: settings.DB_ADMISSION_MAX_WAITING_HIGH,
+        Priority.NORMAL: settings.DB_ADMISSION_MAX_WAITING,
+        Priority.LOW: settings.DB_ADMISSION_MAX_WAITING_LOW
+    },
+    timeout=settings.DB_POOL_TIMEOUT,
+    retry_after=settings.DB_ADMISSION_RETRY_AFTER,
+    metrics_interval=settings.DB_POOL_METRICS_INTERVAL
+)
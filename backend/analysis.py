@@ -0,0 +1,186 @@
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional
+import numpy as np
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+from config import settings
+from logger import logger
+
+from models import Question, AnswerOption, QuizAttempt, UserAnswer
+import snapshots
+
+# Proporsi kelompok atas/bawah untuk discrimination index (Kelley)
+DISCRIMINATION_GROUP = 0.27
+
+def _metric(value) -> Optional[float]:
+    value = float(value)
+    return None if np.isnan(value) else round(value, 4)
+
+def _load_answers(db: Session, quiz_id: int, completed_after: Optional[datetime] = None) -> np.ndarray:
+    """Jawaban attempt selesai (hanya yang selesai setelah ``completed_after`` jika
+    diisi) sebagai array int64 (attempt_id, question_id, selected_option_id atau 0,
+    is_correct), dibaca streaming per batch."""
+    if completed_after is None:
+        criteria = (QuizAttempt.quiz_id == quiz_id, QuizAttempt.is_completed == True)
+    else:
+        criteria = snapshots.window(quiz_id, completed_after)
+    result = db.execute(
+        select(
+            UserAnswer.attempt_id,
+            UserAnswer.question_id,
+            func.coalesce(UserAnswer.selected_option_id, 0),
+            case((UserAnswer.is_correct == True, 1), else_=0)
+        ).join(
+            QuizAttempt, QuizAttempt.id == UserAnswer.attempt_id
+        ).where(*criteria).execution_options(yield_per=settings.ITEM_ANALYSIS_BATCH_SIZE)
+    )
+    chunks = [np.array(rows, dtype=np.int64) for rows in result.partitions()]
+    if not chunks:
+        return np.empty((0, 4), dtype=np.int64)
+    return np.concatenate(chunks)
+
+def compute_item_analysis(db: Session, quiz_id: int) -> dict:
+    """Hitung difficulty, discrimination index, point-biserial, dan distribusi
+    option untuk setiap pertanyaan dari matriks attempt x pertanyaan.
+
+    Jawaban dibaca dari snapshot kolumnar jika tersedia, ditambah jawaban
+    attempt yang selesai setelah watermark-nya dari database; tanpa snapshot
+    semuanya dibaca langsung dari database.
+    """
+    questions = db.query(Question).filter(Question.quiz_id == quiz_id).order_by(Question.id).all()
+    options = db.query(AnswerOption).join(Question).filter(
+        Question.quiz_id == quiz_id
+    ).order_by(AnswerOption.question_id, AnswerOption.option_order, AnswerOption.id).all()
+    snapshot = snapshots.load(quiz_id)
+    if snapshot is not None:
+        answers = np.column_stack([
+            snapshot.answers["attempt_id"],
+            snapshot.answers["question_id"],
+            snapshot.answers["option_id"],
+            snapshot.answers["is_correct"].astype(np.int64)
+        ]) if len(snapshot.answers["attempt_id"]) else np.empty((0, 4), dtype=np.int64)
+        answers = np.concatenate([answers, _load_answers(db, quiz_id, snapshot.watermark)])
+    else:
+        answers = _load_answers(db, quiz_id)
+
+    question_ids = np.array([question.id for question in questions], dtype=np.int64)
+    points = np.array([question.points or 0 for question in questions], dtype=np.float64)
+
+    # Buang jawaban untuk pertanyaan yang sudah tidak ada di quiz
+    if len(question_ids):
+        columns = np.searchsorted(question_ids, answers[:, 1])
+        columns = np.minimum(columns, len(question_ids) - 1)
+        known = question_ids[columns] == answers[:, 1]
+    else:
+        columns = np.zeros(len(answers), dtype=np.int64)
+        known = np.zeros(len(answers), dtype=bool)
+    answers, columns = answers[known], columns[known]
+
+    attempt_ids, rows = np.unique(answers[:, 0], return_inverse=True)
+    n_attempts, n_questions = len(attempt_ids), len(question_ids)
+
+    # Jawaban ganda untuk pertanyaan yang sama: dianggap benar jika salah satunya benar
+    correct = np.zeros((n_attempts, n_questions), dtype=np.float64)
+    answered = np.zeros((n_attempts, n_questions), dtype=bool)
+    np.maximum.at(correct, (rows, columns), answers[:, 3])
+    answered[rows, columns] = True
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        difficulty = correct.mean(axis=0) if n_attempts else np.full(n_questions, np.nan)
+
+        # Discrimination: proporsi benar kelompok 27% skor tertinggi - 27% terendah
+        totals = correct @ points
+        group = max(1, int(round(n_attempts * DISCRIMINATION_GROUP))) if n_attempts else 0
+        if n_attempts >= 2:
+            order = np.argsort(totals, kind="stable")
+            discrimination = correct[order[-group:]].mean(axis=0) - correct[order[:group]].mean(axis=0)
+        else:
+            discrimination = np.full(n_questions, np.nan)
+
+        # Point-biserial terkoreksi: korelasi item dengan skor total tanpa item itu sendiri
+        rest = totals[:, None] - correct * points
+        item_centered = correct - correct.mean(axis=0) if n_attempts else correct
+        rest_centered = rest - rest.mean(axis=0) if n_attempts else rest
+        covariance = (item_centered * rest_centered).sum(axis=0)
+        spread = np.sqrt((item_centered ** 2).sum(axis=0) * (rest_centered ** 2).sum(axis=0))
+        point_biserial = np.where(spread > 0, covariance / spread, np.nan)
+
+    option_ids, option_counts = np.unique(answers[answers[:, 2] > 0, 2], return_counts=True)
+    counts_by_option = dict(zip(option_ids.tolist(), option_counts.tolist()))
+    answered_counts = answered.sum(axis=0)
+
+    options_by_question = {}
+    for option in options:
+        options_by_question.setdefault(option.question_id, []).append(option)
+
+    items = []
+    for index, question in enumerate(questions):
+        total_answered = int(answered_counts[index])
+        items.append({
+            "question_id": question.id,
+            "question_text": question.question_text,
+            "points": question.points or 0,
+            "answered": total_answered,
+            "difficulty": _metric(difficulty[index]),
+            "discrimination": _metric(discrimination[index]),
+            "point_biserial": _metric(point_biserial[index]),
+            "options": [
+                {
+                    "option_id": option.id,
+                    "option_text": option.option_text,
+                    "is_correct": bool(option.is_correct),
+                    "count": counts_by_option.get(option.id, 0),
+                    "proportion": round(counts_by_option.get(option.id, 0) / total_answered, 4) if total_answered else 0.0
+                }
+                for option in options_by_question.get(question.id, [])
+            ]
+        })
+
+    logger.info(f"Item analysis quiz {quiz_id} dihitung ({n_attempts} attempts x {n_questions} questions)")
+    return {
+        "quiz_id": quiz_id,
+        "total_attempts": n_attempts,
+        "computed_at": datetime.utcnow(),
+        "snapshot_watermark": snapshot.watermark if snapshot is not None else None,
+        "items": items
+    }
+
+class ItemAnalysisCache:
+    """Cache LRU hasil item analysis per quiz.
+
+    Hasil di-invalidate saat ada submission baru, regrade, atau perubahan
+    pertanyaan. Hasil yang selesai dihitung setelah invalidate terjadi tidak
+    disimpan, agar cache tidak menahan data yang sudah usang.
+    """
+
+    def __init__(self, max_quizzes: int):
+        self.max_quizzes = max_quizzes
+        self._lock = threading.Lock()
+        self._results: "OrderedDict[int, dict]" = OrderedDict()
+        self._generations = {}
+
+    def get(self, db: Session, quiz_id: int) -> dict:
+        with self._lock:
+            result = self._results.get(quiz_id)
+            if result is not None:
+                self._results.move_to_end(quiz_id)
+                return result
+            generation = self._generations.get(quiz_id, 0)
+
+        result = compute_item_analysis(db, quiz_id)
+        with self._lock:
+            if self._generations.get(quiz_id, 0) == generation:
+                self._results[quiz_id] = result
+                self._results.move_to_end(quiz_id)
+                while len(self._results) > self.max_quizzes:
+                    self._results.popitem(last=False)
+        return result
+
+    def invalidate(self, quiz_id: int) -> None:
+        with self._lock:
+            self._results.pop(quiz_id, None)
+            self._generations[quiz_id] = self._generations.get(quiz_id, 0) + 1
+
+item_analysis = ItemAnalysisCache(settings.ITEM_ANALYSIS_MAX_QUIZZES)
@@ -0,0 +1,136 @@
+"""Micro-benchmark overhead Python per query di hot path CRUD.
+
+Membandingkan query yang dibangun ulang setiap panggilan (gaya ``db.query(...)``
+lama) dengan ``lambda_stmt`` dan statement ``select()`` yang dibangun sekali di
+modul CRUD. Database-nya SQLite in-memory dengan sedikit baris, sehingga waktu
+yang terukur hampir seluruhnya konstruksi statement, cache key, compile, dan
+pemrosesan hasil di sisi Python, bukan kerja database.
+
+    python bench_queries.py --iterations 5000
+"""
+import argparse
+import time
+from typing import Callable, List, Tuple
+
+from sqlalchemy import and_, create_engine, lambda_stmt, select
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.pool import StaticPool
+
+import migrations
+from models import Quiz, Question, AnswerOption, QuizAttempt
+from crud import QuizCRUD, QuizAttemptCRUD
+from crud.attempt import _COMPLETED_SCORES, _QUIZ_TITLE_AND_MAX_SCORE, _load_answer_key
+
+QUESTIONS = 10
+OPTIONS = 4
+ATTEMPTS = 200
+
+def _seed(db: Session) -> Tuple[int, int, List[Tuple[int, int]]]:
+    quiz = Quiz(title="Benchmark quiz", category="Benchmark", difficulty_level="medium", is_active=True)
+    db.add(quiz)
+    db.flush()
+    answers = []
+    for number in range(QUESTIONS):
+        question = Question(quiz_id=quiz.id, question_text=f"Pertanyaan {number}?", points=1)
+        db.add(question)
+        db.flush()
+        options = [
+            AnswerOption(question_id=question.id, option_text=f"Option {order}", is_correct=order == 0, option_order=order)
+            for order in range(OPTIONS)
+        ]
+        db.add_all(options)
+        db.flush()
+        answers.append((question.id, options[number % OPTIONS].id))
+    attempts = [
+        QuizAttempt(quiz_id=quiz.id, score=number % (QUESTIONS + 1), time_taken=60 + number, total_questions=QUESTIONS, is_completed=True)
+        for number in range(ATTEMPTS)
+    ]
+    db.add_all(attempts)
+    db.commit()
+    return quiz.id, attempts[0].id, answers
+
+def _legacy_answer_key(db: Session, answers: List[Tuple[int, int]]) -> int:
+    """Penilaian submit lama: satu query option dan satu query pertanyaan per jawaban."""
+    score = 0
+    for question_id, option_id in answers:
+        option = db.query(AnswerOption).filter(AnswerOption.id == option_id).first()
+        if option and option.is_correct:
+            question = db.query(Question).filter(Question.id == question_id).first()
+            if question:
+                score += question.points
+    return score
+
+def _legacy_stats(db: Session, quiz_id: int) -> int:
+    quiz = db.query(Quiz).filter(Quiz.id == quiz_id).first()
+    rows = db.query(QuizAttempt.score, QuizAttempt.time_taken).filter(
+        and_(QuizAttempt.quiz_id == quiz_id, QuizAttempt.is_completed == True)
+    ).all()
+    db.expire(quiz, ["questions"])  # setiap request memuat relasi questions dari awal
+    return sum(q.points for q in quiz.questions) + len(rows)
+
+def _cached_stats(db: Session, quiz_id: int) -> int:
+    quiz = db.execute(_QUIZ_TITLE_AND_MAX_SCORE, {"quiz_id": quiz_id}).first()
+    rows = db.execute(_COMPLETED_SCORES, {"quiz_id": quiz_id}).all()
+    return quiz.max_score + len(rows)
+
+def _measure(call: Callable[[], object], iterations: int) -> float:
+    """Mikrodetik per panggilan setelah pemanasan (cache compile terisi)."""
+    for _ in range(min(iterations, 200)):
+        call()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        call()
+    return (time.perf_counter() - started) / iterations * 1_000_000
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python bench_queries.py", description="Benchmark overhead query hot path")
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    migrations.upgrade(engine)
+    db = Session(engine)
+    quiz_id, attempt_id, answers = _seed(db)
+
+    cases = {
+        "quiz fetch": {
+            "db.query": lambda: db.query(Quiz).filter(Quiz.id == quiz_id, Quiz.deleted_at.is_(None)).first(),
+            "lambda_stmt": lambda: db.execute(lambda_stmt(
+                lambda: select(Quiz).where(Quiz.id == quiz_id, Quiz.deleted_at.is_(None))
+            )).scalar_one_or_none(),
+            "select cached": lambda: QuizCRUD.get_quiz(db, quiz_id),
+        },
+        "quiz + pertanyaan": {
+            "db.query": lambda: db.query(Quiz).options(
+                joinedload(Quiz.questions).joinedload(Question.options)
+            ).filter(Quiz.id == quiz_id, Quiz.deleted_at.is_(None)).first(),
+            "select cached": lambda: QuizCRUD.get_quiz_with_questions(db, quiz_id),
+        },
+        "attempt fetch": {
+            "db.query": lambda: db.query(QuizAttempt).filter(QuizAttempt.id == attempt_id).first(),
+            "lambda_stmt": lambda: db.execute(lambda_stmt(
+                lambda: select(QuizAttempt).where(QuizAttempt.id == attempt_id)
+            )).scalar_one_or_none(),
+            "select cached": lambda: QuizAttemptCRUD.get_attempt(db, attempt_id),
+        },
+        f"kunci jawaban ({QUESTIONS} jawaban)": {
+            "db.query": lambda: _legacy_answer_key(db, answers),
+            "select cached": lambda: _load_answer_key(db, quiz_id),
+        },
+        "stats quiz": {
+            "db.query": lambda: _legacy_stats(db, quiz_id),
+            "select cached": lambda: _cached_stats(db, quiz_id),
+        },
+    }
+
+    print(f"{'hot path':<28}{'varian':<16}{'us/panggilan':>14}{'vs db.query':>14}")
+    for name, variants in cases.items():
+        baseline = None
+        for variant, call in variants.items():
+            micros = _measure(call, args.iterations)
+            baseline = baseline or micros
+            print(f"{name:<28}{variant:<16}{micros:>14.1f}{baseline / micros:>13.2f}x")
+    db.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List
 import os
 
 class Settings(BaseSettings):
@@ -30,10 +30,127 @@ class Settings(BaseSettings):
     HOST: str = "0.0.0.0"
     PORT: int = 8000
 
+    # Launcher multi-worker (server.py): jumlah worker (0 = jumlah CPU) dan batas
+    # waktu worker untuk siap / berhenti graceful. Default satu worker karena sesi
+    # live disimpan di memori worker yang membuatnya
+    WEB_WORKERS: int = int(os.getenv("WEB_WORKERS", "1"))
+    WORKER_READY_TIMEOUT: int = 60
+    WORKER_GRACEFUL_TIMEOUT: int = 30
+    # Task latar (maintenance partisi, jadwal snapshot/sweep); server.py hanya
+    # mengaktifkannya di satu worker
+    BACKGROUND_TASKS: bool = True
+
     # Database connection pool settings
     DB_POOL_SIZE: int = 20
     DB_MAX_OVERFLOW: int = 0
     DB_POOL_RECYCLE: int = 3600
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "3"))
+
+    # Admission control di depan pool: batas antrean per prioritas route
+    DB_ADMISSION_MAX_WAITING_HIGH: int = 50
+    DB_ADMISSION_MAX_WAITING: int = 20
+    DB_ADMISSION_MAX_WAITING_LOW: int = 2
+    DB_ADMISSION_RETRY_AFTER: int = 2
+    DB_POOL_METRICS_INTERVAL: int = 60
+
+    # Rate limiting per client: group -> [burst, token per detik]
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "True").lower() == "true"
+    RATE_LIMIT_BUDGETS: Dict[str, List[float]] = {
+        "heartbeat": [10, 0.5],
+        "submit": [5, 0.2],
+        "attempt": [10, 0.5],
+        "read": [120, 4],
+        "write": [30, 1],
+        "default": [60, 2]
+    }
+    RATE_LIMIT_IDLE_TTL: int = 600
+    RATE_LIMIT_MAX_BUCKETS: int = 100_000
+    RATE_LIMIT_TRUST_FORWARDED: bool = False
+    # Budget per IP = budget peserta x pengali ini (peserta sekelas berbagi IP NAT);
+    # peserta dikenali dari header X-Participant-Email / X-Participant-Id
+    RATE_LIMIT_IP_MULTIPLIER: float = float(os.getenv("RATE_LIMIT_IP_MULTIPLIER", "50"))
+
+    # Profiler request opt-in: header X-Profile berisi token atau sampling acak.
+    # Jika nonaktif, middleware tidak dipasang sama sekali
+    PROFILE_ENABLED: bool = os.getenv("PROFILE_ENABLED", "False").lower() == "true"
+    PROFILE_TOKEN: str = os.getenv("PROFILE_TOKEN", "")
+    PROFILE_SAMPLE_RATE: float = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+    PROFILE_DIR: str = os.getenv("PROFILE_DIR", "profiles")
+    PROFILE_INTERVAL: float = 0.005
+    PROFILE_MAX_SECONDS: float = 60.0
+    PROFILE_MAX_FILES: int = 200
+
+    # Partisi bulanan quiz_attempts/user_answers dan retention (0 = tanpa retention)
+    PARTITION_MONTHS_AHEAD: int = 3
+    PARTITION_MAINTENANCE_INTERVAL: int = 6 * 3600
+    ATTEMPT_RETENTION_MONTHS: int = int(os.getenv("ATTEMPT_RETENTION_MONTHS", "0"))
+    ARCHIVE_DIR: str = os.getenv("ARCHIVE_DIR", "archive")
+
+    # Sweeper attempt terbengkalai (interval 0 = nonaktif): attempt quiz ber-time_limit
+    # ditutup setelah batas waktu + grace, attempt quiz lain setelah STALE_AGE
+    ATTEMPT_SWEEP_INTERVAL: int = int(os.getenv("ATTEMPT_SWEEP_INTERVAL", "300"))
+    ATTEMPT_SWEEP_BATCH_SIZE: int = 500
+    ATTEMPT_SWEEP_GRACE: int = 60
+    ATTEMPT_STALE_AGE: int = int(os.getenv("ATTEMPT_STALE_AGE", str(24 * 3600)))
+
+    # Quiz dengan attempt lebih dari threshold di-soft delete lalu di-purge bertahap
+    QUIZ_PURGE_THRESHOLD: int = 10_000
+    QUIZ_PURGE_CHUNK_SIZE: int = 1_000
+
+    # Regrade attempt per chunk setelah kunci jawaban berubah
+    REGRADE_CHUNK_SIZE: int = 5_000
+
+    # Background job runner: jumlah worker (= ukuran pool DB khusus job)
+    JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", "2"))
+    JOB_PROGRESS_INTERVAL: float = 1.0
+    # Heartbeat pemilik job; job yang heartbeat-nya lewat timeout diambil alih worker lain
+    JOB_HEARTBEAT_INTERVAL: float = 10.0
+    JOB_HEARTBEAT_TIMEOUT: int = 60
+
+    # Item analysis (NumPy): jumlah quiz yang di-cache dan ukuran batch streaming
+    ITEM_ANALYSIS_MAX_QUIZZES: int = 64
+    ITEM_ANALYSIS_BATCH_SIZE: int = 10_000
+
+    # Snapshot kolumnar (.npy) jawaban per quiz untuk analitik (interval 0 = nonaktif)
+    SNAPSHOT_DIR: str = os.getenv("SNAPSHOT_DIR", "snapshots")
+    SNAPSHOT_INTERVAL: int = int(os.getenv("SNAPSHOT_INTERVAL", "900"))
+    SNAPSHOT_LAG: int = 60
+    SNAPSHOT_BATCH_SIZE: int = 50_000
+
+    # Time-series dari rollup aktivitas: batas jumlah bucket per request
+    TIMESERIES_MAX_POINTS: int = 2_000
+    # Setiap bucket rollup dipecah ke beberapa baris shard agar submit bersamaan
+    # untuk quiz yang sama tidak antre di lock satu baris
+    ROLLUP_SHARDS: int = int(os.getenv("ROLLUP_SHARDS", "16"))
+
+    # Facet kategori/difficulty in-memory: dimuat ulang berkala (perubahan worker lain)
+    CATEGORY_FACETS_TTL: float = 30.0
+
+    # Cache konten quiz (single-flight + TTL), prewarm sebelum jadwal mulai.
+    # PREWARM_TTL juga batas atas TTL prewarm: selama itu edit dari worker lain belum terlihat
+    QUIZ_CONTENT_MAX_QUIZZES: int = 256
+    QUIZ_CONTENT_TTL: float = 60.0
+    QUIZ_CONTENT_PREWARM_TTL: float = float(os.getenv("QUIZ_CONTENT_PREWARM_TTL", "300"))
+
+    # Stream SSE statistik quiz: interval push, resync dari database, heartbeat
+    STATS_STREAM_INTERVAL: float = 2.0
+    STATS_STREAM_RESYNC_INTERVAL: float = 30.0
+    STATS_STREAM_HEARTBEAT: float = 15.0
+
+    # Sesi live lewat WebSocket (hub in-process, per worker)
+    # Dimatikan server.py jika worker lebih dari satu (belum ada hub lintas worker)
+    LIVE_SESSIONS_ENABLED: bool = True
+    LIVE_MAX_CONNECTIONS: int = int(os.getenv("LIVE_MAX_CONNECTIONS", "5000"))
+    LIVE_SEND_QUEUE_SIZE: int = 64
+    LIVE_FLUSH_INTERVAL: float = 0.25
+    LIVE_STATS_INTERVAL: float = 1.0
+    LIVE_IDLE_TIMEOUT: int = 3600
+
+    # Leaderboard settings
+    LEADERBOARD_TOP_K: int = 500
+    LEADERBOARD_MAX_QUIZZES: int = 256
+    # Leaderboard dimuat ulang setelah TTL agar submit di worker lain ikut terlihat
+    LEADERBOARD_TTL: float = 30.0
 
     class Config:
         env_file = ".env"
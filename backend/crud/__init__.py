@@ -2,10 +2,12 @@ from crud.base import BaseCRUD
 from crud.quiz import QuizCRUD
 from crud.question import QuestionCRUD
 from crud.attempt import QuizAttemptCRUD
+from crud.search import SearchCRUD
 
 __all__ = [
     "BaseCRUD",
     "QuizCRUD",
     "QuestionCRUD",
-    "QuizAttemptCRUD"
+    "QuizAttemptCRUD",
+    "SearchCRUD"
 ]
\ No newline at end of file
@@ -1,25 +1,94 @@
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_
-from typing import List, Optional
-from datetime import datetime
+from sqlalchemy import and_, bindparam, case, insert, delete, func, literal, select, tuple_, update
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+import base64
+import binascii
+import hashlib
+import numpy as np
+from config import settings
 from logger import logger
 
-from models import Quiz, Question, AnswerOption, QuizAttempt, UserAnswer
-from schemas import QuizAttemptCreate, UserAnswerCreate, QuizResult, QuizStats, AnswerDetail
-from exceptions import AttemptNotFoundException, QuizNotFoundException, QuizAlreadyCompletedException
+from models import Quiz, Question, AnswerOption, QuizAttempt, UserAnswer, Job
+from schemas import QuizAttemptCreate, QuizAttemptBatchCreate, QuizAttemptBatchResponse, AttemptHistory, AttemptSummary, UserAnswerCreate, QuizResult, QuizStats, AnswerDetail, Leaderboard, QuizTimeseries
+from exceptions import AttemptNotFoundException, QuizNotFoundException, QuizAlreadyCompletedException, ValidationException
+from leaderboard import leaderboards
+from analysis import item_analysis
+from stats_stream import stats_streams
+import snapshots
+import rollups
+from partitions import answers_since, is_supported
+from jobs import job_runner, PENDING
+
+# Statement hot path dibangun sekali saat import dengan bound parameter: cache key
+# dan hasil compile-nya dipakai ulang, per request hanya nilai parameter yang dikirim
+_ATTEMPT_BY_ID = select(QuizAttempt).where(QuizAttempt.id == bindparam("attempt_id"))
+# Dengan started_at dari client, PostgreSQL hanya membaca partisi bulan attempt tersebut;
+# rentang kecil menoleransi presisi timestamp yang hilang di sisi client
+_ATTEMPT_BY_ID_AND_START = _ATTEMPT_BY_ID.where(
+    QuizAttempt.started_at.between(bindparam("started_from"), bindparam("started_to"))
+)
+_STARTED_AT_TOLERANCE = timedelta(seconds=1)
+# Kunci jawaban satu quiz: poin setiap pertanyaan dan option yang benar (NULL jika tidak ada)
+_ANSWER_KEY = select(Question.id, Question.points, AnswerOption.id).outerjoin(
+    AnswerOption, and_(AnswerOption.question_id == Question.id, AnswerOption.is_correct == True)
+).where(Question.quiz_id == bindparam("quiz_id"))
+# Jumlah pertanyaan quiz yang belum dihapus (tanpa baris jika quiz tidak ada). Dibaca
+# langsung di jalur tulis, bukan dari cache konten per worker yang bisa tertinggal;
+# cukup primary key quizzes dan idx_questions_quiz_id
+_QUESTION_COUNT = select(func.count(Question.id)).select_from(Quiz).outerjoin(
+    Question, Question.quiz_id == Quiz.id
+).where(Quiz.id == bindparam("quiz_id"), Quiz.deleted_at.is_(None)).group_by(Quiz.id)
+_MAX_SCORE = select(func.coalesce(func.sum(Question.points), 0)).where(Question.quiz_id == bindparam("quiz_id"))
+_QUIZ_TITLE_AND_MAX_SCORE = select(
+    Quiz.title,
+    select(func.coalesce(func.sum(Question.points), 0)).where(Question.quiz_id == Quiz.id).scalar_subquery().label("max_score")
+).where(Quiz.id == bindparam("quiz_id"))
+_COMPLETED_SCORES = select(QuizAttempt.score, QuizAttempt.time_taken).where(
+    QuizAttempt.quiz_id == bindparam("quiz_id"), QuizAttempt.is_completed == True
+)
+
+def _load_answer_key(db: Session, quiz_id: int) -> Dict[int, Tuple[int, set]]:
+    """question_id -> (poin, id option benar) untuk menilai submit dengan satu query."""
+    answer_key: Dict[int, Tuple[int, set]] = {}
+    for question_id, points, option_id in db.execute(_ANSWER_KEY, {"quiz_id": quiz_id}):
+        _, correct_options = answer_key.setdefault(question_id, (points or 0, set()))
+        if option_id is not None:
+            correct_options.add(option_id)
+    return answer_key
+
+def _find_attempt(db: Session, attempt_id: int, started_at: Optional[datetime] = None) -> Optional[QuizAttempt]:
+    if started_at is not None and is_supported(db):
+        started_at = started_at.replace(tzinfo=None)
+        attempt = db.execute(_ATTEMPT_BY_ID_AND_START, {
+            "attempt_id": attempt_id,
+            "started_from": started_at - _STARTED_AT_TOLERANCE,
+            "started_to": started_at + _STARTED_AT_TOLERANCE
+        }).scalar_one_or_none()
+        if attempt:
+            return attempt
+    # started_at tidak dikirim atau tidak cocok: cari di semua partisi
+    return db.execute(_ATTEMPT_BY_ID, {"attempt_id": attempt_id}).scalar_one_or_none()
+
+def _encode_cursor(started_at: datetime, attempt_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{started_at.isoformat()}|{attempt_id}".encode()).decode()
+
+def _decode_cursor(cursor: str):
+    """Cursor keyset (started_at, id) dari halaman sebelumnya."""
+    try:
+        started_at, attempt_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(started_at), int(attempt_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValidationException("Cursor tidak valid")
 
 class QuizAttemptCRUD:
     @staticmethod
     def create_attempt(db: Session, attempt: QuizAttemptCreate) -> QuizAttempt:
         try:
-            quiz = db.query(Quiz).filter(Quiz.id == attempt.quiz_id).first()
-            if not quiz:
+            question_count = db.execute(_QUESTION_COUNT, {"quiz_id": attempt.quiz_id}).scalar_one_or_none()
+            if question_count is None:
                 raise QuizNotFoundException(attempt.quiz_id)
             
-            question_count = db.query(Question).filter(
-                Question.quiz_id == attempt.quiz_id
-            ).count()
-            
             db_attempt = QuizAttempt(
                 quiz_id=attempt.quiz_id,
                 participant_name=attempt.participant_name,
@@ -27,8 +96,10 @@ class QuizAttemptCRUD:
                 total_questions=question_count
             )
             db.add(db_attempt)
+            rollups.record_started(db, attempt.quiz_id)
             db.commit()
             db.refresh(db_attempt)
+            stats_streams.record_started(attempt.quiz_id)
             logger.info(f"Created attempt dengan id {db_attempt.id}")
             return db_attempt
         except Exception as e:
@@ -37,60 +108,161 @@ class QuizAttemptCRUD:
             raise
     
     @staticmethod
-    def get_attempt(db: Session, attempt_id: int) -> Optional[QuizAttempt]:
+    def create_attempts_batch(db: Session, batch: QuizAttemptBatchCreate) -> QuizAttemptBatchResponse:
+        try:
+            question_count = db.execute(_QUESTION_COUNT, {"quiz_id": batch.quiz_id}).scalar_one_or_none()
+            if question_count is None:
+                raise QuizNotFoundException(batch.quiz_id)
+            
+            rows = [
+                {
+                    "quiz_id": batch.quiz_id,
+                    "participant_name": participant.participant_name,
+                    "participant_email": participant.participant_email,
+                    "total_questions": question_count
+                }
+                for participant in batch.participants
+            ]
+            # Satu INSERT multi-row ... RETURNING, id dikembalikan sesuai urutan input
+            attempt_ids = db.execute(
+                insert(QuizAttempt).returning(QuizAttempt.id, sort_by_parameter_order=True),
+                rows
+            ).scalars().all()
+            rollups.record_started(db, batch.quiz_id, len(attempt_ids))
+            db.commit()
+            stats_streams.record_started(batch.quiz_id, len(attempt_ids))
+            logger.info(f"Created {len(attempt_ids)} attempts untuk quiz {batch.quiz_id}")
+            return QuizAttemptBatchResponse(
+                quiz_id=batch.quiz_id,
+                total_questions=question_count,
+                attempt_ids=attempt_ids
+            )
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error creating batch attempts: {str(e)}")
+            raise
+    
+    @staticmethod
+    def get_attempt(db: Session, attempt_id: int, started_at: Optional[datetime] = None) -> Optional[QuizAttempt]:
         try:
-            return db.query(QuizAttempt).filter(QuizAttempt.id == attempt_id).first()
+            return _find_attempt(db, attempt_id, started_at)
         except Exception as e:
             logger.error(f"Error fetching attempt {attempt_id}: {str(e)}")
             raise
     
+    @staticmethod
+    def get_participant_history(
+        db: Session,
+        participant_email: str,
+        cursor: Optional[str] = None,
+        limit: int = 20
+    ) -> AttemptHistory:
+        """Riwayat attempt peserta, terbaru dulu, dengan keyset pagination.
+
+        Memakai index (participant_email, started_at DESC, id DESC): setiap halaman
+        melanjutkan dari (started_at, id) terakhir tanpa OFFSET. Judul quiz dan
+        total poin diambil dalam query yang sama.
+        """
+        try:
+            max_score = select(
+                func.coalesce(func.sum(Question.points), 0)
+            ).where(Question.quiz_id == QuizAttempt.quiz_id).scalar_subquery()
+            query = select(
+                QuizAttempt.id,
+                QuizAttempt.quiz_id,
+                Quiz.title,
+                QuizAttempt.score,
+                QuizAttempt.is_completed,
+                QuizAttempt.started_at,
+                QuizAttempt.completed_at,
+                max_score.label("max_score")
+            ).join(Quiz, Quiz.id == QuizAttempt.quiz_id).where(
+                QuizAttempt.participant_email == participant_email,
+                Quiz.deleted_at.is_(None)
+            )
+            if cursor:
+                started_at, attempt_id = _decode_cursor(cursor)
+                started_bound = literal(started_at, QuizAttempt.started_at.type)
+                if db.get_bind().dialect.name == "sqlite" and not started_at.microsecond:
+                    # started_at dari CURRENT_TIMESTAMP SQLite disimpan tanpa pecahan detik
+                    started_bound = literal(started_at.strftime("%Y-%m-%d %H:%M:%S"))
+                query = query.where(tuple_(QuizAttempt.started_at, QuizAttempt.id) < tuple_(
+                    started_bound, literal(attempt_id, QuizAttempt.id.type)
+                ))
+            rows = db.execute(
+                query.order_by(QuizAttempt.started_at.desc(), QuizAttempt.id.desc()).limit(limit + 1)
+            ).all()
+            
+            attempts = [
+                AttemptSummary(
+                    attempt_id=row.id,
+                    quiz_id=row.quiz_id,
+                    quiz_title=row.title,
+                    score=row.score or 0,
+                    percentage=round((row.score or 0) / row.max_score * 100, 2) if row.max_score > 0 else 0.0,
+                    is_completed=bool(row.is_completed),
+                    started_at=row.started_at,
+                    completed_at=row.completed_at
+                )
+                for row in rows[:limit]
+            ]
+            next_cursor = None
+            if len(rows) > limit:
+                last = rows[limit - 1]
+                next_cursor = _encode_cursor(last.started_at, last.id)
+            return AttemptHistory(participant_email=participant_email, attempts=attempts, next_cursor=next_cursor)
+        except ValidationException:
+            raise
+        except Exception as e:
+            logger.error(f"Error getting history peserta {participant_email}: {str(e)}")
+            raise
+    
     @staticmethod
     def submit_answers(
         db: Session,
         attempt_id: int,
-        answers: List[UserAnswerCreate]
+        answers: List[UserAnswerCreate],
+        started_at: Optional[datetime] = None
     ) -> QuizAttempt:
         try:
-            attempt = db.query(QuizAttempt).filter(QuizAttempt.id == attempt_id).first()
+            attempt = _find_attempt(db, attempt_id, started_at)
             if not attempt:
                 raise AttemptNotFoundException(attempt_id)
             
             if attempt.is_completed:
                 raise QuizAlreadyCompletedException()
             
+            # Satu query kunci jawaban untuk semua jawaban, bukan query option dan
+            # pertanyaan per jawaban; option hanya benar untuk pertanyaannya sendiri
+            answer_key = _load_answer_key(db, attempt.quiz_id)
             score = 0
-            
+            rows = []
             for answer_data in answers:
-                is_correct = False
-                
-                if answer_data.selected_option_id:
-                    option = db.query(AnswerOption).filter(
-                        AnswerOption.id == answer_data.selected_option_id
-                    ).first()
-                    
-                    if option and option.is_correct:
-                        is_correct = True
-                        question = db.query(Question).filter(
-                            Question.id == answer_data.question_id
-                        ).first()
-                        if question:
-                            score += question.points
-                
-                db_answer = UserAnswer(
-                    attempt_id=attempt_id,
-                    question_id=answer_data.question_id,
-                    selected_option_id=answer_data.selected_option_id,
-                    text_answer=answer_data.text_answer,
-                    is_correct=is_correct
-                )
-                db.add(db_answer)
+                points, correct_options = answer_key.get(answer_data.question_id, (0, ()))
+                is_correct = answer_data.selected_option_id is not None and answer_data.selected_option_id in correct_options
+                if is_correct:
+                    score += points
+                rows.append({
+                    "attempt_id": attempt_id,
+                    "question_id": answer_data.question_id,
+                    "selected_option_id": answer_data.selected_option_id,
+                    "text_answer": answer_data.text_answer,
+                    "is_correct": is_correct
+                })
+            if rows:
+                db.execute(insert(UserAnswer), rows)
             
             attempt.score = score
             attempt.completed_at = datetime.utcnow()
             attempt.is_completed = True
+            # Upsert rollup terakhir agar lock baris rollup dipegang sesingkat mungkin
+            rollups.record_completed(db, attempt)
             
             db.commit()
             db.refresh(attempt)
+            leaderboards.record(attempt)
+            item_analysis.invalidate(attempt.quiz_id)
+            stats_streams.record_completed(attempt.quiz_id, attempt.score, attempt.time_taken)
             logger.info(f"Submitted answers untuk attempt {attempt_id}")
             return attempt
         except Exception as e:
@@ -99,20 +271,100 @@ class QuizAttemptCRUD:
             raise
     
     @staticmethod
-    def get_quiz_results(db: Session, attempt_id: int) -> Optional[QuizResult]:
+    def record_live_answers(db: Session, rows: List[dict]) -> None:
+        """Simpan jawaban sesi live yang sudah dinilai di memori (satu INSERT multi-row)."""
+        try:
+            db.execute(insert(UserAnswer), rows)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error menyimpan {len(rows)} jawaban live: {str(e)}")
+            raise
+    
+    @staticmethod
+    def complete_live_attempts(db: Session, quiz_id: int, results: Dict[int, Tuple[int, int]]) -> int:
+        """Tutup attempt sesi live sekaligus; ``results`` = attempt_id -> (score, time_taken).
+
+        Attempt yang sudah selesai (misalnya ditutup sweeper) dilewati agar rollup
+        tidak terhitung dua kali.
+        """
         try:
-            attempt = db.query(QuizAttempt).options(
-                joinedload(QuizAttempt.user_answers).joinedload(UserAnswer.question),
-                joinedload(QuizAttempt.user_answers).joinedload(UserAnswer.selected_option)
-            ).filter(QuizAttempt.id == attempt_id).first()
+            open_attempts = {}
+            attempt_ids = list(results)
+            for start in range(0, len(attempt_ids), 1000):
+                statement = select(QuizAttempt.id, QuizAttempt.started_at).where(
+                    QuizAttempt.id.in_(attempt_ids[start:start + 1000]),
+                    QuizAttempt.is_completed == False
+                )
+                if db.get_bind().dialect.name == "postgresql":
+                    # Kunci baris agar sweeper tidak menutup attempt yang sama di antara SELECT dan UPDATE
+                    statement = statement.with_for_update()
+                open_attempts.update((row.id, row.started_at) for row in db.execute(statement))
+            if not open_attempts:
+                return 0
+            
+            completed_at = datetime.utcnow()
+            rows = [
+                {
+                    "attempt_id": attempt_id,
+                    "attempt_started_at": started_at,
+                    "new_score": results[attempt_id][0],
+                    "new_time_taken": results[attempt_id][1]
+                }
+                for attempt_id, started_at in open_attempts.items()
+            ]
+            attempts = QuizAttempt.__table__
+            # is_completed sama seperti sweeper; di PostgreSQL started_at membatasi
+            # UPDATE ke partisi attempt (SQLite menyimpan CURRENT_TIMESTAMP tanpa
+            # pecahan detik, jadi tidak bisa dibandingkan langsung dengan datetime)
+            criteria = [attempts.c.id == bindparam("attempt_id"), attempts.c.is_completed == False]
+            if is_supported(db):
+                criteria.append(attempts.c.started_at == bindparam("attempt_started_at"))
+            db.connection().execute(
+                attempts.update().where(*criteria).values(
+                    score=bindparam("new_score"),
+                    time_taken=bindparam("new_time_taken"),
+                    completed_at=completed_at,
+                    is_completed=True
+                ),
+                rows
+            )
+            rollups.record_completed_many(
+                db, quiz_id, completed_at, len(rows),
+                sum(row["new_score"] for row in rows),
+                sum(row["new_time_taken"] for row in rows)
+            )
+            db.commit()
+            leaderboards.invalidate(quiz_id)
+            item_analysis.invalidate(quiz_id)
+            stats_streams.invalidate(quiz_id)
+            logger.info(f"Menutup {len(rows)} attempt live untuk quiz {quiz_id}")
+            return len(rows)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error menutup attempt live quiz {quiz_id}: {str(e)}")
+            raise
+    
+    @staticmethod
+    def get_quiz_results(db: Session, attempt_id: int, started_at: Optional[datetime] = None) -> Optional[QuizResult]:
+        try:
+            attempt = _find_attempt(db, attempt_id, started_at)
             
             if not attempt:
                 raise AttemptNotFoundException(attempt_id)
             
+            user_answers = db.query(UserAnswer).options(
+                joinedload(UserAnswer.question),
+                joinedload(UserAnswer.selected_option)
+            ).filter(
+                UserAnswer.attempt_id == attempt_id,
+                *answers_since(db, attempt.started_at)
+            ).all()
+            
             correct_answers = []
             incorrect_answers = []
             
-            for user_answer in attempt.user_answers:
+            for user_answer in user_answers:
                 correct_option_text = None
                 for option in user_answer.question.options:
                     if option.is_correct:
@@ -131,9 +383,7 @@ class QuizAttemptCRUD:
                 else:
                     incorrect_answers.append(answer_detail)
             
-            max_score = sum(q.points for q in db.query(Question).filter(
-                Question.quiz_id == attempt.quiz_id
-            ).all())
+            max_score = db.execute(_MAX_SCORE, {"quiz_id": attempt.quiz_id}).scalar()
             
             percentage = (attempt.score / max_score * 100) if max_score > 0 else 0
             
@@ -154,15 +404,27 @@ class QuizAttemptCRUD:
     @staticmethod
     def get_quiz_stats(db: Session, quiz_id: int) -> Optional[QuizStats]:
         try:
-            quiz = db.query(Quiz).filter(Quiz.id == quiz_id).first()
+            quiz = db.execute(_QUIZ_TITLE_AND_MAX_SCORE, {"quiz_id": quiz_id}).first()
             if not quiz:
                 raise QuizNotFoundException(quiz_id)
+            max_possible_score = quiz.max_score
             
-            attempts = db.query(QuizAttempt).filter(
-                and_(QuizAttempt.quiz_id == quiz_id, QuizAttempt.is_completed == True)
-            ).all()
+            # Snapshot kolumnar jika tersedia ditambah attempt setelah watermark-nya,
+            # selain itu hanya dua kolom dari database
+            snapshot = snapshots.load(quiz_id)
+            if snapshot is not None:
+                rows = db.execute(
+                    select(QuizAttempt.score, QuizAttempt.time_taken).where(*snapshots.window(quiz_id, snapshot.watermark))
+                ).all()
+            else:
+                rows = db.execute(_COMPLETED_SCORES, {"quiz_id": quiz_id}).all()
+            scores = np.array([row.score or 0 for row in rows], dtype=np.float64)
+            times = np.array([row.time_taken or 0 for row in rows], dtype=np.float64)
+            if snapshot is not None:
+                scores = np.concatenate([np.asarray(snapshot.attempts["score"], dtype=np.float64), scores])
+                times = np.concatenate([np.asarray(snapshot.attempts["time_taken"], dtype=np.float64), times])
             
-            if not attempts:
+            if not len(scores):
                 return QuizStats(
                     quiz_id=quiz_id,
                     quiz_title=quiz.title,
@@ -172,22 +434,17 @@ class QuizAttemptCRUD:
                     average_time=0.0
                 )
             
-            total_attempts = len(attempts)
-            total_score = sum(attempt.score for attempt in attempts)
-            max_possible_score = sum(q.points for q in quiz.questions)
+            total_attempts = len(scores)
             
             if max_possible_score > 0:
-                average_score = (total_score / total_attempts / max_possible_score * 100)
-                passed_attempts = sum(
-                    1 for attempt in attempts 
-                    if (attempt.score / max_possible_score * 100) >= 60
-                )
+                average_score = float(scores.mean() / max_possible_score * 100)
+                passed_attempts = int((scores / max_possible_score * 100 >= 60).sum())
             else:
                 average_score = 0
                 passed_attempts = 0
             
             pass_rate = (passed_attempts / total_attempts * 100) if total_attempts > 0 else 0
-            average_time = sum(attempt.time_taken for attempt in attempts) / total_attempts
+            average_time = float(times.mean())
             
             logger.info(f"Retrieved stats untuk quiz {quiz_id}")
             
@@ -203,15 +460,179 @@ class QuizAttemptCRUD:
             logger.error(f"Error getting quiz stats {quiz_id}: {str(e)}")
             raise
     
+    @staticmethod
+    def get_quizzes_stats(
+        db: Session,
+        quiz_ids: Optional[List[int]] = None,
+        skip: int = 0,
+        limit: int = 100
+    ) -> List[QuizStats]:
+        """QuizStats banyak quiz sekaligus dengan satu query agregat.
+
+        Tanpa ``quiz_ids`` yang diambil adalah quiz aktif, urut id, dengan paginasi.
+        Rumus sama dengan get_quiz_stats: skor dalam persen dari total poin quiz,
+        lulus jika >= 60%.
+        """
+        try:
+            if quiz_ids is not None:
+                selected = select(Quiz.id).where(Quiz.id.in_(quiz_ids), Quiz.deleted_at.is_(None))
+            else:
+                selected = select(Quiz.id).where(
+                    Quiz.is_active == True, Quiz.deleted_at.is_(None)
+                ).order_by(Quiz.id).offset(skip).limit(limit)
+            selected = selected.subquery()
+            
+            max_scores = select(
+                Question.quiz_id,
+                func.sum(Question.points).label("max_score")
+            ).where(Question.quiz_id.in_(select(selected.c.id))).group_by(Question.quiz_id).subquery()
+            max_score = func.coalesce(max_scores.c.max_score, 0)
+            
+            rows = db.execute(
+                select(
+                    Quiz.id,
+                    Quiz.title,
+                    max_score.label("max_score"),
+                    func.count(QuizAttempt.id).label("total_attempts"),
+                    func.avg(QuizAttempt.score).label("average_raw_score"),
+                    func.sum(case((QuizAttempt.score * 100 >= max_score * 60, 1), else_=0)).label("passed"),
+                    func.avg(QuizAttempt.time_taken).label("average_time")
+                ).select_from(Quiz).join(
+                    selected, selected.c.id == Quiz.id
+                ).outerjoin(
+                    max_scores, max_scores.c.quiz_id == Quiz.id
+                ).outerjoin(
+                    QuizAttempt, and_(QuizAttempt.quiz_id == Quiz.id, QuizAttempt.is_completed == True)
+                ).group_by(Quiz.id, Quiz.title, max_scores.c.max_score).order_by(Quiz.id)
+            ).all()
+            
+            stats = []
+            for row in rows:
+                total_attempts = row.total_attempts or 0
+                has_score = total_attempts > 0 and row.max_score > 0
+                stats.append(QuizStats(
+                    quiz_id=row.id,
+                    quiz_title=row.title,
+                    total_attempts=total_attempts,
+                    average_score=round(float(row.average_raw_score) / row.max_score * 100, 2) if has_score else 0.0,
+                    pass_rate=round(row.passed / total_attempts * 100, 2) if has_score else 0.0,
+                    average_time=round(float(row.average_time), 2) if total_attempts else 0.0
+                ))
+            logger.info(f"Retrieved stats untuk {len(stats)} quiz")
+            return stats
+        except Exception as e:
+            logger.error(f"Error getting stats quizzes: {str(e)}")
+            raise
+    
+    @staticmethod
+    def get_leaderboard(
+        db: Session,
+        quiz_id: int,
+        skip: int = 0,
+        limit: int = 10,
+        attempt_id: Optional[int] = None
+    ) -> Leaderboard:
+        try:
+            if not db.query(Quiz.id).filter(Quiz.id == quiz_id, Quiz.deleted_at.is_(None)).first():
+                raise QuizNotFoundException(quiz_id)
+            
+            total_completed, entries = leaderboards.page(db, quiz_id, skip, limit)
+            my_rank = leaderboards.rank_of(db, quiz_id, attempt_id) if attempt_id else None
+            
+            return Leaderboard(
+                quiz_id=quiz_id,
+                total_completed=total_completed,
+                entries=entries,
+                my_rank=my_rank
+            )
+        except QuizNotFoundException:
+            raise
+        except Exception as e:
+            logger.error(f"Error getting leaderboard quiz {quiz_id}: {str(e)}")
+            raise
+    
+    @staticmethod
+    def get_timeseries(
+        db: Session,
+        quiz_id: int,
+        granularity: str = "day",
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> QuizTimeseries:
+        try:
+            if not db.query(Quiz.id).filter(Quiz.id == quiz_id, Quiz.deleted_at.is_(None)).first():
+                raise QuizNotFoundException(quiz_id)
+            
+            # Bucket rollup disimpan dalam UTC tanpa timezone
+            start, end = (
+                value.astimezone(timezone.utc).replace(tzinfo=None) if value and value.tzinfo else value
+                for value in (start, end)
+            )
+            step = {"hour": timedelta(hours=1), "day": timedelta(days=1), "week": timedelta(weeks=1)}[granularity]
+            end = end or datetime.utcnow()
+            start = start or end - step * {"hour": 48, "day": 30, "week": 12}[granularity]
+            if start >= end:
+                raise ValidationException("Parameter from harus lebih awal dari to.")
+            if (end - start) / step > settings.TIMESERIES_MAX_POINTS:
+                raise ValidationException(
+                    f"Rentang waktu terlalu besar untuk granularity {granularity} "
+                    f"(maksimal {settings.TIMESERIES_MAX_POINTS} bucket)."
+                )
+            
+            return QuizTimeseries(
+                quiz_id=quiz_id,
+                granularity=granularity,
+                start=start,
+                end=end,
+                points=rollups.timeseries(db, quiz_id, granularity, start, end)
+            )
+        except (QuizNotFoundException, ValidationException):
+            raise
+        except Exception as e:
+            logger.error(f"Error getting timeseries quiz {quiz_id}: {str(e)}")
+            raise
+    
+    @staticmethod
+    def get_item_analysis(db: Session, quiz_id: int) -> dict:
+        try:
+            if not db.query(Quiz.id).filter(Quiz.id == quiz_id, Quiz.deleted_at.is_(None)).first():
+                raise QuizNotFoundException(quiz_id)
+            return item_analysis.get(db, quiz_id)
+        except QuizNotFoundException:
+            raise
+        except Exception as e:
+            logger.error(f"Error getting item analysis quiz {quiz_id}: {str(e)}")
+            raise
+    
     @staticmethod
     def delete_attempt(db: Session, attempt_id: int) -> bool:
         try:
-            attempt = db.query(QuizAttempt).filter(QuizAttempt.id == attempt_id).first()
-            if not attempt:
+            # Jawaban ikut terhapus oleh cascade di database, tanpa dimuat ke session
+            deleted = db.execute(
+                delete(QuizAttempt).where(QuizAttempt.id == attempt_id).returning(
+                    QuizAttempt.quiz_id,
+                    QuizAttempt.started_at,
+                    QuizAttempt.completed_at,
+                    QuizAttempt.score,
+                    QuizAttempt.time_taken,
+                    QuizAttempt.is_completed
+                )
+            ).first()
+            if deleted is None:
+                db.rollback()
                 return False
             
-            db.delete(attempt)
+            quiz_id = deleted.quiz_id
+            rollups.record_deleted(
+                db, quiz_id, deleted.started_at,
+                deleted.completed_at if deleted.is_completed else None,
+                deleted.score, deleted.time_taken
+            )
             db.commit()
+            leaderboards.invalidate(quiz_id)
+            snapshots.invalidate(quiz_id)
+            item_analysis.invalidate(quiz_id)
+            stats_streams.invalidate(quiz_id)
             logger.info(f"Deleted attempt dengan id {attempt_id}")
             return True
         except Exception as e:
@@ -220,9 +641,143 @@ class QuizAttemptCRUD:
             raise
     
     @staticmethod
-    def update_time_taken(db: Session, attempt_id: int, time_taken: int) -> Optional[QuizAttempt]:
+    def answer_key_fingerprint(db: Session, quiz_id: int, question_id: Optional[int] = None) -> str:
+        """Hash dari poin dan option benar; dipakai sebagai job_key regrade agar
+        regrade untuk kunci jawaban yang sama hanya berjalan sekali."""
+        query = db.query(Question.id, Question.points, AnswerOption.id).outerjoin(
+            AnswerOption, and_(AnswerOption.question_id == Question.id, AnswerOption.is_correct == True)
+        ).filter(Question.quiz_id == quiz_id)
+        if question_id:
+            query = query.filter(Question.id == question_id)
+        rows = query.order_by(Question.id, AnswerOption.id).all()
+        return hashlib.sha1(repr(rows).encode()).hexdigest()[:16]
+    
+    @staticmethod
+    def schedule_regrade(db: Session, quiz_id: int, question_id: Optional[int] = None) -> Job:
+        if not db.query(Quiz.id).filter(Quiz.id == quiz_id, Quiz.deleted_at.is_(None)).first():
+            raise QuizNotFoundException(quiz_id)
+        fingerprint = QuizAttemptCRUD.answer_key_fingerprint(db, quiz_id, question_id)
+        # Hanya job yang belum mulai yang digabung: job pending membaca kunci jawaban
+        # terbaru saat berjalan, sedangkan job yang sudah jalan/selesai mungkin memakai
+        # kunci lama (misalnya kunci berubah A -> B -> A)
+        return job_runner.submit(
+            "regrade_quiz",
+            {"quiz_id": quiz_id, "question_id": question_id},
+            job_key=f"regrade:{quiz_id}:{question_id or 'all'}:{fingerprint}",
+            dedupe_statuses=(PENDING,)
+        )
+    
+    @staticmethod
+    def regrade(
+        db: Session,
+        quiz_id: int,
+        question_id: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+        context=None
+    ) -> dict:
+        """Hitung ulang user_answers.is_correct dan quiz_attempts.score sebuah quiz
+        (atau satu pertanyaan) setelah kunci jawaban berubah.
+
+        Attempt diproses per rentang id; setiap chunk memakai dua UPDATE ... FROM
+        set-based (jawaban, lalu skor) dalam satu transaksi, dan hanya menulis
+        baris yang nilainya berubah.
+        """
+        chunk_size = chunk_size or settings.REGRADE_CHUNK_SIZE
+        question_ids = select(Question.id).where(Question.quiz_id == quiz_id)
+        if question_id:
+            question_ids = question_ids.where(Question.id == question_id)
+        correct = func.coalesce(AnswerOption.is_correct, False)
+        
+        total = db.query(func.count(QuizAttempt.id)).filter(QuizAttempt.quiz_id == quiz_id).scalar()
+        processed = answers_updated = scores_updated = 0
+        last_id = 0
+        try:
+            while True:
+                attempt_ids = db.execute(
+                    select(QuizAttempt.id)
+                    .where(QuizAttempt.quiz_id == quiz_id, QuizAttempt.id > last_id)
+                    .order_by(QuizAttempt.id)
+                    .limit(chunk_size)
+                ).scalars().all()
+                if not attempt_ids:
+                    break
+                first_id, last_id = attempt_ids[0], attempt_ids[-1]
+                
+                answers_updated += db.execute(
+                    update(UserAnswer)
+                    .where(
+                        # Option hanya benar untuk pertanyaannya sendiri, sama seperti submit_answers
+                        UserAnswer.selected_option_id == AnswerOption.id,
+                        AnswerOption.question_id == UserAnswer.question_id,
+                        UserAnswer.attempt_id.between(first_id, last_id),
+                        UserAnswer.question_id.in_(question_ids),
+                        UserAnswer.is_correct.is_distinct_from(correct)
+                    )
+                    .values(is_correct=correct)
+                    .execution_options(synchronize_session=False)
+                ).rowcount
+                
+                scores = select(
+                    QuizAttempt.id.label("attempt_id"),
+                    func.coalesce(func.sum(Question.points), 0).label("score")
+                ).select_from(QuizAttempt).outerjoin(
+                    UserAnswer, and_(UserAnswer.attempt_id == QuizAttempt.id, UserAnswer.is_correct == True)
+                ).outerjoin(
+                    Question, Question.id == UserAnswer.question_id
+                ).where(
+                    QuizAttempt.quiz_id == quiz_id,
+                    QuizAttempt.is_completed == True,
+                    QuizAttempt.id.between(first_id, last_id)
+                ).group_by(QuizAttempt.id).subquery()
+                
+                scores_updated += db.execute(
+                    update(QuizAttempt)
+                    .where(
+                        QuizAttempt.id == scores.c.attempt_id,
+                        QuizAttempt.score.is_distinct_from(scores.c.score)
+                    )
+                    .values(score=scores.c.score)
+                    .execution_options(synchronize_session=False)
+                ).rowcount
+                db.commit()
+                
+                processed += len(attempt_ids)
+                if context:
+                    context.report(processed / total * 100 if total else 0)
+            
+            if scores_updated:
+                rollups.rebuild(db, quiz_id)
+                db.commit()
+            leaderboards.invalidate(quiz_id)
+            if answers_updated or scores_updated:
+                snapshots.invalidate(quiz_id)
+            item_analysis.invalidate(quiz_id)
+            stats_streams.invalidate(quiz_id)
+            logger.info(
+                f"Regraded quiz {quiz_id}: {processed} attempts, "
+                f"{answers_updated} answers dan {scores_updated} skor berubah"
+            )
+            return {
+                "quiz_id": quiz_id,
+                "question_id": question_id,
+                "attempts": processed,
+                "answers_updated": answers_updated,
+                "scores_updated": scores_updated
+            }
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error regrading quiz {quiz_id}: {str(e)}")
+            raise
+    
+    @staticmethod
+    def update_time_taken(
+        db: Session,
+        attempt_id: int,
+        time_taken: int,
+        started_at: Optional[datetime] = None
+    ) -> Optional[QuizAttempt]:
         try:
-            attempt = db.query(QuizAttempt).filter(QuizAttempt.id == attempt_id).first()
+            attempt = _find_attempt(db, attempt_id, started_at)
             if not attempt:
                 raise AttemptNotFoundException(attempt_id)
             
@@ -1,9 +1,15 @@
 from sqlalchemy.orm import Session
-from typing import Optional
+from sqlalchemy import insert, update, delete
+from typing import List, Optional
 from logger import logger
-from models import Question, AnswerOption
-from schemas import QuestionCreate, QuestionUpdate
-from exceptions import QuestionNotFoundException
+from models import Question, AnswerOption, UserAnswer
+from schemas import QuestionCreate, QuestionUpdate, AnswerOptionUpdate
+from exceptions import QuestionNotFoundException, InvalidQuizDataException
+from crud.search import SearchCRUD
+from crud.attempt import QuizAttemptCRUD
+from analysis import item_analysis
+from stats_stream import stats_streams
+from quiz_content import quiz_contents
 
 class QuestionCRUD:
     @staticmethod
@@ -29,8 +35,13 @@ class QuestionCRUD:
                     )
                     db.add(db_option)
             
+            db.flush()
+            SearchCRUD.index_quiz(db, quiz_id)
             db.commit()
             db.refresh(db_question)
+            item_analysis.invalidate(quiz_id)
+            stats_streams.invalidate(quiz_id)
+            quiz_contents.invalidate(quiz_id)
             logger.info(f"Created question {db_question.id} untuk quiz {quiz_id}")
             return db_question
         except Exception as e:
@@ -46,6 +57,82 @@ class QuestionCRUD:
             logger.error(f"Error fetching question {question_id}: {str(e)}")
             raise
 
+    @staticmethod
+    def _sync_options(db: Session, question_id: int, options: List[AnswerOptionUpdate]) -> bool:
+        """Samakan answer_options dengan daftar baru lewat UPDATE/INSERT/DELETE minimal.
+
+        Option dicocokkan berdasarkan id jika ada, sisanya berdasarkan teks yang
+        sama persis dengan option lama yang belum terpakai, sehingga id option
+        tetap stabil dan user_answers.selected_option_id lama tetap valid. Option
+        tanpa pasangan disisipkan baru; option lama yang tidak terpakai dihapus,
+        kecuali sudah dipilih peserta (ubah teksnya dengan menyertakan id).
+        Mengembalikan True jika is_correct option lama berubah (jawaban yang
+        sudah ada perlu regrade).
+        """
+        existing = db.query(AnswerOption).filter(
+            AnswerOption.question_id == question_id
+        ).order_by(AnswerOption.option_order, AnswerOption.id).all()
+        existing_by_id = {option.id: option for option in existing}
+        
+        matched = {}
+        for index, opt_data in enumerate(options):
+            if opt_data.id is None:
+                continue
+            if opt_data.id not in existing_by_id:
+                raise InvalidQuizDataException(f"Option {opt_data.id} bukan milik pertanyaan {question_id}.")
+            if existing_by_id[opt_data.id] in matched.values():
+                raise InvalidQuizDataException(f"Option {opt_data.id} muncul lebih dari sekali.")
+            matched[index] = existing_by_id[opt_data.id]
+        
+        claimed = set(matched.values())
+        unclaimed_by_text = {}
+        for option in existing:
+            if option not in claimed:
+                unclaimed_by_text.setdefault(option.option_text.strip(), []).append(option)
+        for index, opt_data in enumerate(options):
+            if opt_data.id is None:
+                candidates = unclaimed_by_text.get(opt_data.option_text.strip())
+                if candidates:
+                    matched[index] = candidates.pop(0)
+        
+        updates, inserts = [], []
+        answer_key_changed = False
+        for index, opt_data in enumerate(options):
+            values = {
+                "option_text": opt_data.option_text,
+                "is_correct": opt_data.is_correct,
+                "option_order": opt_data.option_order
+            }
+            option = matched.get(index)
+            if option is None:
+                inserts.append(dict(values, question_id=question_id))
+            elif any(getattr(option, field) != value for field, value in values.items()):
+                updates.append(dict(values, id=option.id))
+                answer_key_changed = answer_key_changed or bool(option.is_correct) != opt_data.is_correct
+        
+        kept_ids = {option.id for option in matched.values()}
+        removed_ids = [option.id for option in existing if option.id not in kept_ids]
+        if removed_ids:
+            referenced = db.query(UserAnswer.selected_option_id).filter(
+                UserAnswer.selected_option_id.in_(removed_ids)
+            ).first()
+            if referenced:
+                raise InvalidQuizDataException(
+                    f"Option {referenced[0]} sudah dipilih di jawaban peserta dan tidak dapat dihapus; "
+                    f"sertakan id option untuk mengubahnya."
+                )
+            db.execute(delete(AnswerOption).where(AnswerOption.id.in_(removed_ids)))
+        if updates:
+            db.execute(update(AnswerOption), updates)
+        if inserts:
+            db.execute(insert(AnswerOption), inserts)
+        
+        logger.info(
+            f"Synced options question {question_id}: {len(updates)} updated, "
+            f"{len(inserts)} inserted, {len(removed_ids)} deleted"
+        )
+        return answer_key_changed
+
     @staticmethod
     def update_question(db: Session, question_id: int, question_update: QuestionUpdate) -> Optional[Question]:
         try:
@@ -56,28 +143,32 @@ class QuestionCRUD:
             
             # Update basic fields
             update_data = question_update.dict(exclude_unset=True, exclude={'options'})
+            needs_regrade = update_data.get("points") not in (None, question.points)
             for field, value in update_data.items():
                 if value is not None:
                     setattr(question, field, value)
             
             # Update options if provided
             if question_update.options is not None:
-                # Delete existing options
-                db.query(AnswerOption).filter(AnswerOption.question_id == question_id).delete()
-                
-                # Add new options
-                for opt_data in question_update.options:
-                    db_option = AnswerOption(
-                        question_id=question_id,
-                        option_text=opt_data.option_text,
-                        is_correct=opt_data.is_correct,
-                        option_order=opt_data.option_order
-                    )
-                    db.add(db_option)
+                if QuestionCRUD._sync_options(db, question_id, question_update.options):
+                    needs_regrade = True
             
+            if "question_text" in update_data:
+                db.flush()
+                SearchCRUD.index_quiz(db, question.quiz_id)
             db.commit()
             db.refresh(question)
+            item_analysis.invalidate(question.quiz_id)
+            stats_streams.invalidate(question.quiz_id)
+            quiz_contents.invalidate(question.quiz_id)
             logger.info(f"Updated question {question_id}")
+            
+            if needs_regrade:
+                # Kunci jawaban/poin berubah: nilai jawaban lama dihitung ulang di background
+                try:
+                    QuizAttemptCRUD.schedule_regrade(db, question.quiz_id, question_id)
+                except Exception as e:
+                    logger.error(f"Error scheduling regrade question {question_id}: {str(e)}")
             return question
             
         except QuestionNotFoundException:
@@ -90,14 +181,19 @@ class QuestionCRUD:
     @staticmethod
     def delete_question(db: Session, question_id: int) -> bool:
         try:
-            question = db.query(Question).filter(Question.id == question_id).first()
-            if not question:
+            # Options dan jawaban ikut terhapus oleh ON DELETE CASCADE
+            quiz_id = db.execute(
+                delete(Question).where(Question.id == question_id).returning(Question.quiz_id)
+            ).scalar()
+            if quiz_id is None:
+                db.rollback()
                 return False
             
-            # Delete options first
-            db.query(AnswerOption).filter(AnswerOption.question_id == question_id).delete()
-            db.delete(question)
+            SearchCRUD.index_quiz(db, quiz_id)
             db.commit()
+            item_analysis.invalidate(quiz_id)
+            stats_streams.invalidate(quiz_id)
+            quiz_contents.invalidate(quiz_id)
             logger.info(f"Deleted question {question_id}")
             return True
         except Exception as e:
@@ -1,9 +1,22 @@
 from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import bindparam, delete, func, select
 from typing import List, Optional
+from datetime import datetime
+from config import settings
 from logger import logger
-from models import Quiz, Question, AnswerOption
-from schemas import QuizCreateRequest, QuizUpdateRequest
+from database import JobSessionLocal
+from models import Quiz, Question, AnswerOption, QuizAttempt
+from schemas import QuizCreateRequest, QuizUpdateRequest, QuizWithQuestions
 from exceptions import QuizNotFoundException
+from crud.search import SearchCRUD
+from facets import category_facets
+from quiz_content import quiz_contents
+from jobs import job_runner
+import snapshots
+
+# Dibangun sekali saat import (bound parameter), compile-nya dipakai ulang antar request
+_QUIZ_BY_ID = select(Quiz).where(Quiz.id == bindparam("quiz_id"), Quiz.deleted_at.is_(None))
+_QUIZ_WITH_QUESTIONS = _QUIZ_BY_ID.options(joinedload(Quiz.questions).joinedload(Question.options))
 
 class QuizCRUD:
     @staticmethod
@@ -42,8 +55,11 @@ class QuizCRUD:
                         )
                         db.add(db_option)
             
+            db.flush()
+            SearchCRUD.index_quiz(db, db_quiz.id)
             db.commit()
             db.refresh(db_quiz)
+            category_facets.apply(None, category_facets.key_for(db_quiz))
             logger.info(f"Created quiz {db_quiz.id} dengan {len(quiz.questions) if quiz.questions else 0} questions")
             return db_quiz
             
@@ -55,7 +71,7 @@ class QuizCRUD:
     @staticmethod
     def get_quiz(db: Session, quiz_id: int) -> Optional[Quiz]:
         try:
-            return db.query(Quiz).filter(Quiz.id == quiz_id).first()
+            return db.execute(_QUIZ_BY_ID, {"quiz_id": quiz_id}).scalar_one_or_none()
         except Exception as e:
             logger.error(f"Error fetching quiz {quiz_id}: {str(e)}")
             raise
@@ -63,13 +79,28 @@ class QuizCRUD:
     @staticmethod
     def get_quiz_with_questions(db: Session, quiz_id: int) -> Optional[Quiz]:
         try:
-            return db.query(Quiz).options(
-                joinedload(Quiz.questions).joinedload(Question.options)
-            ).filter(Quiz.id == quiz_id).first()
+            return db.execute(_QUIZ_WITH_QUESTIONS, {"quiz_id": quiz_id}).unique().scalar_one_or_none()
         except Exception as e:
             logger.error(f"Error fetching quiz with questions {quiz_id}: {str(e)}")
             raise
 
+    @staticmethod
+    def get_quiz_content(db: Session, quiz_id: int) -> Optional[QuizWithQuestions]:
+        """Konten publik quiz dari cache; load bersamaan digabung jadi satu query."""
+        try:
+            return quiz_contents.get(db, quiz_id)
+        except Exception as e:
+            logger.error(f"Error fetching quiz content {quiz_id}: {str(e)}")
+            raise
+
+    @staticmethod
+    def prewarm_quiz(db: Session, quiz_id: int, ttl: Optional[float] = None) -> Optional[QuizWithQuestions]:
+        try:
+            return quiz_contents.prewarm(db, quiz_id, ttl)
+        except Exception as e:
+            logger.error(f"Error prewarming quiz {quiz_id}: {str(e)}")
+            raise
+
     @staticmethod
     def get_quizzes(
         db: Session,
@@ -78,7 +109,7 @@ class QuizCRUD:
         category: Optional[str] = None
     ) -> List[Quiz]:
         try:
-            query = db.query(Quiz).filter(Quiz.is_active == True)
+            query = db.query(Quiz).filter(Quiz.is_active == True, Quiz.deleted_at.is_(None))
             if category:
                 query = query.filter(Quiz.category == category)
             return query.offset(skip).limit(limit).all()
@@ -89,28 +120,38 @@ class QuizCRUD:
     @staticmethod
     def get_categories(db: Session) -> List[str]:
         try:
-            categories = db.query(Quiz.category).filter(
-                Quiz.category.isnot(None),
-                Quiz.is_active == True
-            ).distinct().all()
-            return [cat[0] for cat in categories if cat[0]]
+            return category_facets.categories(db)
         except Exception as e:
             logger.error(f"Error fetching categories: {str(e)}")
             raise
 
+    @staticmethod
+    def get_category_facets(db: Session) -> dict:
+        try:
+            return category_facets.facets(db)
+        except Exception as e:
+            logger.error(f"Error fetching category facets: {str(e)}")
+            raise
+
     @staticmethod
     def update_quiz(db: Session, quiz_id: int, quiz_update: QuizUpdateRequest) -> Optional[Quiz]:
         try:
-            db_quiz = db.query(Quiz).filter(Quiz.id == quiz_id).first()
+            db_quiz = db.execute(_QUIZ_BY_ID, {"quiz_id": quiz_id}).scalar_one_or_none()
             if not db_quiz:
                 return None
             
+            old_facet_key = category_facets.key_for(db_quiz)
             update_data = quiz_update.dict(exclude_unset=True)
             for field, value in update_data.items():
                 setattr(db_quiz, field, value)
             
+            if update_data.keys() & {"title", "description", "category"}:
+                db.flush()
+                SearchCRUD.index_quiz(db, quiz_id)
             db.commit()
             db.refresh(db_quiz)
+            category_facets.apply(old_facet_key, category_facets.key_for(db_quiz))
+            quiz_contents.invalidate(quiz_id)
             logger.info(f"Updated quiz {quiz_id}")
             return db_quiz
         except Exception as e:
@@ -121,15 +162,84 @@ class QuizCRUD:
     @staticmethod
     def delete_quiz(db: Session, quiz_id: int) -> bool:
         try:
-            db_quiz = db.query(Quiz).filter(Quiz.id == quiz_id).first()
+            db_quiz = db.execute(_QUIZ_BY_ID, {"quiz_id": quiz_id}).scalar_one_or_none()
             if not db_quiz:
                 return False
             
-            db.delete(db_quiz)
+            old_facet_key = category_facets.key_for(db_quiz)
+            attempt_count = db.query(func.count(QuizAttempt.id)).filter(
+                QuizAttempt.quiz_id == quiz_id
+            ).scalar()
+            
+            if attempt_count > settings.QUIZ_PURGE_THRESHOLD:
+                # Quiz besar: sembunyikan sekarang, hapus datanya bertahap di background
+                db_quiz.is_active = False
+                db_quiz.deleted_at = datetime.utcnow()
+                db.commit()
+                category_facets.apply(old_facet_key, None)
+                quiz_contents.invalidate(quiz_id)
+                snapshots.remove(quiz_id)
+                QuizCRUD._start_purge(quiz_id)
+                logger.info(f"Soft deleted quiz {quiz_id} ({attempt_count} attempts), purge dijadwalkan")
+                return True
+            
+            # Satu DELETE, child rows dihapus oleh ON DELETE CASCADE di database
+            SearchCRUD.remove_quiz(db, quiz_id)
+            db.execute(delete(Quiz).where(Quiz.id == quiz_id))
             db.commit()
+            category_facets.apply(old_facet_key, None)
+            quiz_contents.invalidate(quiz_id)
+            snapshots.remove(quiz_id)
             logger.info(f"Deleted quiz {quiz_id}")
             return True
         except Exception as e:
             db.rollback()
             logger.error(f"Error deleting quiz {quiz_id}: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+
+    @staticmethod
+    def _start_purge(quiz_id: int) -> None:
+        job_runner.submit("purge_quiz", {"quiz_id": quiz_id}, job_key=f"purge_quiz:{quiz_id}")
+
+    @staticmethod
+    def purge_quiz(db: Session, quiz_id: int, chunk_size: Optional[int] = None, context=None) -> int:
+        """Hapus attempt quiz yang sudah di-soft delete per chunk, lalu quiz-nya.
+
+        Setiap chunk berjalan di transaksi sendiri sehingga lock dan ukuran WAL
+        tetap kecil; jawaban ikut terhapus lewat cascade. Aman diulang. Jika
+        dijalankan sebagai job, ``context`` menerima progress dan pembatalan.
+        """
+        chunk_size = chunk_size or settings.QUIZ_PURGE_CHUNK_SIZE
+        purged = 0
+        try:
+            total = db.query(func.count(QuizAttempt.id)).filter(QuizAttempt.quiz_id == quiz_id).scalar()
+            while True:
+                chunk = select(QuizAttempt.id).where(QuizAttempt.quiz_id == quiz_id).limit(chunk_size)
+                deleted = db.execute(delete(QuizAttempt).where(QuizAttempt.id.in_(chunk))).rowcount
+                db.commit()
+                purged += deleted
+                if deleted < chunk_size:
+                    break
+                if context:
+                    context.report(purged / total * 100 if total else 0)
+            
+            SearchCRUD.remove_quiz(db, quiz_id)
+            db.execute(delete(Quiz).where(Quiz.id == quiz_id))
+            db.commit()
+            logger.info(f"Purged quiz {quiz_id} ({purged} attempts)")
+            return purged
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error purging quiz {quiz_id}: {str(e)}")
+            raise
+
+    @staticmethod
+    def resume_purges() -> None:
+        """Jadwalkan purge quiz soft-deleted yang belum punya job aktif (idempotent lewat job_key)."""
+        db = JobSessionLocal()
+        try:
+            quiz_ids = db.query(Quiz.id).filter(Quiz.deleted_at.isnot(None)).all()
+        finally:
+            db.close()
+        for (quiz_id,) in quiz_ids:
+            QuizCRUD._start_purge(quiz_id)
@@ -0,0 +1,176 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import text, func
+from typing import List, Optional
+import html
+from logger import logger
+
+from models import Quiz, Question
+from schemas import QuizSearchResult
+
+# Kata yang cocok ditandai dengan karakter kontrol yang tidak dipakai di teks
+# quiz; snippet di-escape sebagai HTML dulu, baru penandanya diganti <mark>
+SNIPPET_START = "\x02"
+SNIPPET_STOP = "\x03"
+
+POSTGRES_INDEX_SQL = """
+    INSERT INTO quiz_search (quiz_id, title, description, category, questions)
+    SELECT q.id, coalesce(q.title, ''), coalesce(q.description, ''), coalesce(q.category, ''),
+           coalesce(string_agg(qs.question_text, E'\\n' ORDER BY qs.id), '')
+    FROM quizzes q
+    LEFT JOIN questions qs ON qs.quiz_id = q.id
+    WHERE {where}
+    GROUP BY q.id
+"""
+
+SQLITE_INDEX_SQL = """
+    INSERT INTO quiz_search (rowid, title, description, category, questions)
+    SELECT q.id, coalesce(q.title, ''), coalesce(q.description, ''), coalesce(q.category, ''),
+           coalesce(group_concat(qs.question_text, char(10)), '')
+    FROM quizzes q
+    LEFT JOIN questions qs ON qs.quiz_id = q.id
+    WHERE {where}
+    GROUP BY q.id
+"""
+
+POSTGRES_SEARCH_SQL = f"""
+    SELECT ranked.quiz_id, ranked.rank,
+           ts_headline('simple',
+                       concat_ws(' ... ', ranked.title, ranked.description, ranked.questions),
+                       ranked.query,
+                       'StartSel={SNIPPET_START}, StopSel={SNIPPET_STOP}, MaxWords=20, MinWords=5, MaxFragments=2') AS snippet
+    FROM (
+        SELECT s.quiz_id, s.title, s.description, s.questions, query,
+               ts_rank(s.document, query) AS rank
+        FROM quiz_search s
+        JOIN quizzes q ON q.id = s.quiz_id,
+             websearch_to_tsquery('simple', :q) query
+        WHERE q.is_active = true AND s.document @@ query
+        ORDER BY rank DESC, s.quiz_id
+        LIMIT :limit OFFSET :skip
+    ) ranked
+    ORDER BY ranked.rank DESC, ranked.quiz_id
+"""
+
+# bm25() makin kecil makin relevan; bobot kolom: title, description, category, questions
+SQLITE_SEARCH_SQL = f"""
+    SELECT quiz_search.rowid AS quiz_id,
+           -bm25(quiz_search, 10.0, 2.0, 4.0, 1.0) AS rank,
+           snippet(quiz_search, -1, '{SNIPPET_START}', '{SNIPPET_STOP}', '...', 16) AS snippet
+    FROM quiz_search
+    JOIN quizzes q ON q.id = quiz_search.rowid
+    WHERE quiz_search MATCH :q AND q.is_active = 1
+    ORDER BY rank DESC, quiz_search.rowid
+    LIMIT :limit OFFSET :skip
+"""
+
+class SearchCRUD:
+    @staticmethod
+    def _dialect(db) -> str:
+        return db.get_bind().dialect.name
+
+    @staticmethod
+    def _fts5_query(q: str) -> str:
+        # Setiap kata di-quote agar karakter sintaks FTS5 dari user tidak error
+        terms = [term.replace('"', '""') for term in q.split()]
+        return " ".join(f'"{term}"' for term in terms if term)
+
+    @staticmethod
+    def _snippet_html(snippet: Optional[str]) -> Optional[str]:
+        """Snippet sebagai HTML aman: teks di-escape, hanya <mark> yang tersisa."""
+        if snippet is None:
+            return None
+        return html.escape(snippet).replace(SNIPPET_START, "<mark>").replace(SNIPPET_STOP, "</mark>")
+
+    @staticmethod
+    def backfill(connection) -> int:
+        """Isi dokumen search untuk quiz yang belum terindeks."""
+        dialect = connection.dialect.name
+        if dialect == "postgresql":
+            backfill = POSTGRES_INDEX_SQL.format(
+                where="NOT EXISTS (SELECT 1 FROM quiz_search s WHERE s.quiz_id = q.id)"
+            )
+        elif dialect == "sqlite":
+            backfill = SQLITE_INDEX_SQL.format(
+                where="q.id NOT IN (SELECT rowid FROM quiz_search)"
+            )
+        else:
+            logger.warning(f"Full-text search tidak didukung untuk dialect {dialect}")
+            return 0
+
+        result = connection.execute(text(backfill))
+        logger.info(f"Search index di-backfill untuk {result.rowcount} quiz")
+        return result.rowcount
+
+    @staticmethod
+    def index_quiz(db: Session, quiz_id: int) -> None:
+        """Sinkronkan dokumen search untuk satu quiz. Tidak melakukan commit."""
+        try:
+            dialect = SearchCRUD._dialect(db)
+            if dialect == "postgresql":
+                db.execute(text("DELETE FROM quiz_search WHERE quiz_id = :quiz_id"), {"quiz_id": quiz_id})
+                db.execute(text(POSTGRES_INDEX_SQL.format(where="q.id = :quiz_id")), {"quiz_id": quiz_id})
+            elif dialect == "sqlite":
+                db.execute(text("DELETE FROM quiz_search WHERE rowid = :quiz_id"), {"quiz_id": quiz_id})
+                db.execute(text(SQLITE_INDEX_SQL.format(where="q.id = :quiz_id")), {"quiz_id": quiz_id})
+        except Exception as e:
+            logger.error(f"Error indexing quiz {quiz_id}: {str(e)}")
+            raise
+
+    @staticmethod
+    def remove_quiz(db: Session, quiz_id: int) -> None:
+        """Hapus dokumen search quiz. PostgreSQL sudah ditangani ON DELETE CASCADE."""
+        try:
+            if SearchCRUD._dialect(db) == "sqlite":
+                db.execute(text("DELETE FROM quiz_search WHERE rowid = :quiz_id"), {"quiz_id": quiz_id})
+        except Exception as e:
+            logger.error(f"Error removing quiz {quiz_id} dari search index: {str(e)}")
+            raise
+
+    @staticmethod
+    def search(db: Session, q: str, skip: int = 0, limit: int = 20) -> List[QuizSearchResult]:
+        try:
+            dialect = SearchCRUD._dialect(db)
+            if dialect == "postgresql":
+                sql, query = POSTGRES_SEARCH_SQL, q
+            elif dialect == "sqlite":
+                sql, query = SQLITE_SEARCH_SQL, SearchCRUD._fts5_query(q)
+            else:
+                return []
+
+            if not query.strip():
+                return []
+
+            hits = db.execute(text(sql), {"q": query, "skip": skip, "limit": limit}).mappings().all()
+            if not hits:
+                return []
+
+            quiz_ids = [hit["quiz_id"] for hit in hits]
+            quizzes = {quiz.id: quiz for quiz in db.query(Quiz).filter(Quiz.id.in_(quiz_ids)).all()}
+            question_counts = dict(
+                db.query(Question.quiz_id, func.count(Question.id))
+                .filter(Question.quiz_id.in_(quiz_ids))
+                .group_by(Question.quiz_id)
+                .all()
+            )
+
+            results = []
+            for hit in hits:
+                quiz = quizzes.get(hit["quiz_id"])
+                if not quiz:
+                    continue
+                results.append(QuizSearchResult(
+                    id=quiz.id,
+                    title=quiz.title,
+                    description=quiz.description,
+                    category=quiz.category,
+                    difficulty_level=quiz.difficulty_level,
+                    time_limit=quiz.time_limit,
+                    question_count=question_counts.get(quiz.id, 0),
+                    is_active=quiz.is_active,
+                    rank=float(hit["rank"] or 0),
+                    snippet=SearchCRUD._snippet_html(hit["snippet"])
+                ))
+            return results
+        except Exception as e:
+            logger.error(f"Error searching quizzes '{q}': {str(e)}")
+            raise
@@ -1,9 +1,13 @@
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from fastapi import Request
 from sqlalchemy.pool import QueuePool
 from config import settings
 from logger import logger
+from admission import db_admission, route_priority, Priority
+
+is_sqlite = settings.DATABASE_URL.startswith("sqlite")
 
 engine = create_engine(
     settings.DATABASE_URL,
@@ -12,14 +16,24 @@ engine = create_engine(
     max_overflow=settings.DB_MAX_OVERFLOW,
     pool_pre_ping=True,
     pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
     echo=settings.SQLALCHEMY_ECHO,
-    # Optimasi tambahan
-    connect_args={
+    # Optimasi tambahan. Timezone session UTC: kolom TIMESTAMP dengan default now()
+    # harus sejajar dengan datetime.utcnow() di aplikasi (cutoff sweeper, snapshot, rollup)
+    connect_args={"check_same_thread": False} if is_sqlite else {
         "connect_timeout": 10,
-        "options": "-c statement_timeout=30000"
+        "options": "-c statement_timeout=30000 -c timezone=UTC"
     }
 )
 
+if is_sqlite:
+    # SQLite baru menjalankan ON DELETE CASCADE jika foreign_keys aktif
+    @event.listens_for(engine, "connect")
+    def enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
 # Create SessionLocal class
 SessionLocal = sessionmaker(
     autocommit=False, 
@@ -27,21 +41,54 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+# Engine terpisah untuk background job agar job panjang tidak memakai slot pool
+# request; satu connection per worker plus cadangan untuk update progress/status.
+# SQLite (embedded mode) tetap memakai satu engine.
+job_engine = engine if is_sqlite else create_engine(
+    settings.DATABASE_URL,
+    poolclass=QueuePool,
+    pool_size=settings.JOB_WORKERS,
+    max_overflow=settings.JOB_WORKERS + 1,
+    pool_pre_ping=True,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    echo=settings.SQLALCHEMY_ECHO,
+    connect_args={"connect_timeout": 10, "options": "-c timezone=UTC"}
+)
+
+JobSessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=job_engine
+)
+
 # Create Base class
 Base = declarative_base()
 
-# Dependency to get DB session
-def get_db():
+# Dependency to get DB session (melewati admission control pool)
+def get_db(request: Request):
+    db_admission.acquire(route_priority(request.method, request.url.path))
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+        db_admission.release()
+
+# Session di luar dependency get_db (WebSocket, SSE), tetap lewat admission control
+def run_in_session(operation, *args, priority: Priority = Priority.NORMAL):
+    db_admission.acquire(priority)
+    db = SessionLocal()
+    try:
+        return operation(db, *args)
+    finally:
+        db.close()
+        db_admission.release()
 
-# Create tables
+# Create tables (schema dikelola lewat versioned migrations)
 def create_tables():
     try:
-        Base.metadata.create_all(bind=engine)
+        import migrations
+        migrations.upgrade(engine)
         logger.info("Database tables created successfully.")
     except Exception as e:
         logger.error(f"Error creating database tables: {e}")
@@ -50,6 +97,9 @@ def create_tables():
 # Drop tables (for testing)
 def drop_tables():
     try:
+        with engine.begin() as connection:
+            connection.execute(text("DROP TABLE IF EXISTS quiz_search"))
+            connection.execute(text("DROP TABLE IF EXISTS schema_migrations"))
         Base.metadata.drop_all(bind=engine)
         logger.warning("Database tables dropped successfully.")
     except Exception as e:
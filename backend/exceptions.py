@@ -24,6 +24,29 @@ class AttemptNotFoundException(HTTPException):
             detail= detail
         )
 
+class JobNotFoundException(HTTPException):
+    def __init__(self, job_id: int = None):
+        detail = f"Job dengan id {job_id} tidak ditemukan." if job_id else "Job tidak ditemukan."
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail= detail
+        )
+
+class LiveSessionNotFoundException(HTTPException):
+    def __init__(self, session_id: str = None):
+        detail = f"Sesi live {session_id} tidak ditemukan." if session_id else "Sesi live tidak ditemukan."
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail= detail
+        )
+
+class LiveSessionsUnavailableException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail= "Sesi live hanya tersedia jika server berjalan dengan satu worker."
+        )
+
 class QuizAlreadyCompletedException(HTTPException):
     def __init__(self):
         super().__init__(
@@ -50,4 +73,12 @@ class ValidationException(HTTPException):
         super().__init__(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
             detail= message
+        )
+
+class ServiceOverloadedException(HTTPException):
+    def __init__(self, retry_after: int = 1):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail= "Server sedang sibuk, silakan coba lagi.",
+            headers={"Retry-After": str(retry_after)}
         )
\ No newline at end of file
@@ -0,0 +1,110 @@
+import threading
+import time
+from collections import Counter
+from typing import Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from config import settings
+from logger import logger
+
+from models import Quiz
+
+FacetKey = Tuple[Optional[str], str]
+
+def _difficulty(value) -> str:
+    # difficulty_level bisa berupa Enum (dari schema) atau string (dari database)
+    return getattr(value, "value", value) or "medium"
+
+class CategoryFacetIndex:
+    """Jumlah quiz aktif per kategori dan per difficulty, disimpan di memori.
+
+    Dimuat dari database dengan satu query GROUP BY, lalu diperbarui secara
+    incremental oleh QuizCRUD setiap kali quiz dibuat, diubah, atau dihapus di
+    worker ini. Perubahan dari worker lain tidak terlihat di sini, jadi hitungan
+    dimuat ulang setelah ``ttl`` detik.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._counts: Counter = Counter()
+        self._loaded = False
+        self._expires_at = 0.0
+        self._snapshot: Optional[dict] = None
+
+    def load(self, db: Session) -> None:
+        rows = db.query(Quiz.category, Quiz.difficulty_level, func.count(Quiz.id)).filter(
+            Quiz.is_active == True,
+            Quiz.deleted_at.is_(None)
+        ).group_by(Quiz.category, Quiz.difficulty_level).all()
+
+        counts = Counter()
+        for category, difficulty, count in rows:
+            counts[(category, _difficulty(difficulty))] += count
+
+        with self._lock:
+            self._counts = counts
+            self._snapshot = None
+            self._loaded = True
+            self._expires_at = time.monotonic() + self.ttl
+        logger.info(f"Category facets dimuat: {len(counts)} kombinasi kategori/difficulty")
+
+    def ensure_loaded(self, db: Session) -> None:
+        if not self._loaded or time.monotonic() >= self._expires_at:
+            self.load(db)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._loaded = False
+            self._snapshot = None
+
+    @staticmethod
+    def key_for(quiz: Quiz) -> Optional[FacetKey]:
+        """Facet key untuk quiz, atau None jika quiz tidak aktif."""
+        if not quiz.is_active:
+            return None
+        return (quiz.category, _difficulty(quiz.difficulty_level))
+
+    def apply(self, old_key: Optional[FacetKey], new_key: Optional[FacetKey]) -> None:
+        if old_key == new_key or not self._loaded:
+            return
+        with self._lock:
+            if old_key is not None:
+                self._counts[old_key] -= 1
+                if self._counts[old_key] <= 0:
+                    del self._counts[old_key]
+            if new_key is not None:
+                self._counts[new_key] += 1
+            self._snapshot = None
+
+    def categories(self, db: Session) -> list:
+        return [entry["category"] for entry in self.facets(db)["categories"]]
+
+    def facets(self, db: Session) -> dict:
+        self.ensure_loaded(db)
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot
+
+        with self._lock:
+            categories = {}
+            difficulties = Counter()
+            total = 0
+            for (category, difficulty), count in self._counts.items():
+                total += count
+                difficulties[difficulty] += count
+                if not category:
+                    continue
+                entry = categories.setdefault(category, {"category": category, "count": 0, "difficulties": {}})
+                entry["count"] += count
+                entry["difficulties"][difficulty] = entry["difficulties"].get(difficulty, 0) + count
+
+            snapshot = {
+                "total": total,
+                "categories": sorted(categories.values(), key=lambda entry: entry["category"]),
+                "difficulties": dict(difficulties)
+            }
+            self._snapshot = snapshot
+        return snapshot
+
+category_facets = CategoryFacetIndex(settings.CATEGORY_FACETS_TTL)
@@ -0,0 +1,276 @@
+"""Generator data sintetis untuk uji kapasitas (jutaan attempt dan jawaban).
+
+    python generate_data.py --quizzes 100 --questions 10 --attempts 10000 --seed 42
+
+Data dibangkitkan vektor per quiz dengan NumPy dan seed tetap, sehingga run
+dengan argumen yang sama menghasilkan isi yang sama. Distribusinya dibuat
+mendekati data nyata: peluang benar mengikuti model IRT (kemampuan peserta vs
+tingkat kesulitan pertanyaan, ditambah peluang menebak), waktu pengerjaan
+log-normal dan dibatasi time_limit quiz, jam mulai mengikuti pola harian, dan
+sebagian attempt tidak pernah di-submit.
+
+PostgreSQL memakai ``COPY ... FROM STDIN``; database lain memakai INSERT
+multi-row. Setiap batch satu transaksi. Id diisi eksplisit melanjutkan id
+terbesar dan sequence disesuaikan di akhir, jadi jalankan saat tidak ada
+penulis lain ke tabel yang sama. Setelah load, rollup aktivitas dan search
+index dibangun ulang secara set-based.
+"""
+import argparse
+import csv
+import io
+import time
+from datetime import datetime, timedelta
+from typing import List, Sequence
+
+import numpy as np
+from sqlalchemy import Table, func, select, text
+
+from database import engine
+from models import Quiz, Question, AnswerOption, QuizAttempt, UserAnswer
+from crud.search import SearchCRUD
+from partitions import ensure_partitions
+import migrations
+import rollups
+
+CATEGORIES = ("Programming", "Mathematics", "Science", "History", "Geography", "Language", "Business", "Art")
+DIFFICULTIES = ("easy", "medium", "hard")
+DIFFICULTY_WEIGHTS = (0.3, 0.5, 0.2)
+# Pergeseran tingkat kesulitan pertanyaan (skala logit) per level quiz
+DIFFICULTY_SHIFT = {"easy": -1.0, "medium": 0.0, "hard": 1.0}
+TIME_LIMITS = (0, 300, 600, 900, 1200)
+POINTS = (1, 2, 3)
+POINT_WEIGHTS = (0.7, 0.2, 0.1)
+# Bobot jam mulai attempt (UTC): sepi dini hari, ramai siang sampai malam
+HOUR_WEIGHTS = np.array([1, 1, 1, 1, 1, 2, 3, 5, 7, 8, 8, 8, 7, 7, 8, 8, 8, 9, 10, 10, 8, 5, 3, 2], dtype=np.float64)
+# Median detik per pertanyaan dan sebarannya (log-normal)
+SECONDS_PER_QUESTION = 20.0
+SECONDS_SIGMA = 0.6
+
+class TableLoader:
+    """Buffer baris satu tabel; ditulis dengan COPY (PostgreSQL) atau INSERT multi-row."""
+
+    def __init__(self, connection, table: Table, columns: Sequence[str]):
+        self.connection = connection
+        self.table = table
+        self.columns = list(columns)
+        self.rows: List[tuple] = []
+        self.written = 0
+        self.max_id = connection.execute(select(func.coalesce(func.max(table.c.id), 0))).scalar()
+
+    def next_ids(self, count: int) -> np.ndarray:
+        ids = np.arange(self.max_id + 1, self.max_id + 1 + count, dtype=np.int64)
+        self.max_id += count
+        return ids
+
+    def add(self, *columns: Sequence) -> None:
+        self.rows.extend(zip(*columns))
+
+    def flush(self) -> None:
+        if not self.rows:
+            return
+        if self.connection.dialect.name == "postgresql":
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(self.rows)
+            buffer.seek(0)
+            cursor = self.connection.connection.dbapi_connection.cursor()
+            try:
+                cursor.copy_expert(
+                    f"COPY {self.table.name} ({', '.join(self.columns)}) FROM STDIN WITH (FORMAT csv)", buffer
+                )
+            finally:
+                cursor.close()
+        else:
+            self.connection.execute(self.table.insert(), [dict(zip(self.columns, row)) for row in self.rows])
+        self.written += len(self.rows)
+        self.rows = []
+
+    def reset_sequence(self) -> None:
+        if self.connection.dialect.name == "postgresql" and self.written:
+            self.connection.execute(
+                text(f"SELECT setval('{self.table.name}_id_seq', :value)"), {"value": int(self.max_id)}
+            )
+
+class SyntheticDataGenerator:
+    def __init__(self, connection, args):
+        self.connection = connection
+        self.args = args
+        self.rng = np.random.default_rng(args.seed)
+        self.now = np.datetime64(datetime.utcnow().replace(microsecond=0), "s")
+        self.today = self.now.astype("datetime64[D]")
+        self.created_at = datetime.combine((datetime.utcnow() - timedelta(days=args.days + 1)).date(), datetime.min.time())
+        self.quizzes = TableLoader(connection, Quiz.__table__, (
+            "id", "title", "description", "category", "difficulty_level", "time_limit",
+            "created_at", "updated_at", "is_active"
+        ))
+        self.questions = TableLoader(connection, Question.__table__, (
+            "id", "quiz_id", "question_text", "question_type", "points", "explanation", "created_at"
+        ))
+        self.options = TableLoader(connection, AnswerOption.__table__, (
+            "id", "question_id", "option_text", "is_correct", "option_order"
+        ))
+        self.attempts = TableLoader(connection, QuizAttempt.__table__, (
+            "id", "quiz_id", "participant_name", "participant_email", "score", "total_questions",
+            "time_taken", "started_at", "completed_at", "is_completed"
+        ))
+        self.answers = TableLoader(connection, UserAnswer.__table__, (
+            "id", "attempt_id", "question_id", "selected_option_id", "text_answer", "is_correct", "answered_at"
+        ))
+        # Urutan foreign key: tabel induk selalu ditulis lebih dulu
+        self.loaders = (self.quizzes, self.questions, self.options, self.attempts, self.answers)
+        connection.commit()
+
+    def _buffered(self) -> int:
+        return max(len(loader.rows) for loader in self.loaders)
+
+    def _flush(self) -> None:
+        with self.connection.begin():
+            for loader in self.loaders:
+                loader.flush()
+
+    def _started_at(self, count: int) -> np.ndarray:
+        days = self.rng.integers(0, self.args.days, size=count)
+        hours = self.rng.choice(24, size=count, p=HOUR_WEIGHTS / HOUR_WEIGHTS.sum())
+        seconds = self.rng.integers(0, 3600, size=count)
+        started = (self.today - days).astype("datetime64[s]") + hours * 3600 + seconds
+        # Jam yang jatuh setelah sekarang pada hari ini digeser ke hari sebelumnya
+        return np.where(started > self.now, started - np.timedelta64(1, "D"), started)
+
+    def _generate_quiz(self, number: int) -> None:
+        args, rng = self.args, self.rng
+        quiz_id = int(self.quizzes.next_ids(1)[0])
+        category = CATEGORIES[int(rng.integers(len(CATEGORIES)))]
+        difficulty = DIFFICULTIES[int(rng.choice(len(DIFFICULTIES), p=DIFFICULTY_WEIGHTS))]
+        time_limit = TIME_LIMITS[int(rng.integers(len(TIME_LIMITS)))]
+        created_at = self.created_at
+        self.quizzes.add(
+            [quiz_id], [f"Quiz sintetis {number + 1}: {category}"], [f"Data uji kapasitas ({difficulty})"],
+            [category], [difficulty], [time_limit], [created_at], [created_at], [True]
+        )
+
+        n_questions, n_options = args.questions, args.options
+        question_ids = self.questions.next_ids(n_questions)
+        points = rng.choice(POINTS, size=n_questions, p=POINT_WEIGHTS)
+        self.questions.add(
+            question_ids.tolist(), [quiz_id] * n_questions,
+            [f"Pertanyaan {i + 1} quiz {number + 1}?" for i in range(n_questions)],
+            ["multiple_choice"] * n_questions, points.tolist(), [None] * n_questions, [created_at] * n_questions
+        )
+
+        option_ids = self.options.next_ids(n_questions * n_options).reshape(n_questions, n_options)
+        correct_position = rng.integers(0, n_options, size=n_questions)
+        is_correct = np.arange(n_options)[None, :] == correct_position[:, None]
+        self.options.add(
+            option_ids.ravel().tolist(), np.repeat(question_ids, n_options).tolist(),
+            [f"Option {chr(65 + order)}" for _ in range(n_questions) for order in range(n_options)],
+            is_correct.ravel().tolist(), np.tile(np.arange(n_options), n_questions).tolist()
+        )
+
+        n_attempts = args.attempts
+        attempt_ids = self.attempts.next_ids(n_attempts)
+        ability = rng.normal(0.0, 1.0, size=n_attempts)
+        item_difficulty = rng.normal(DIFFICULTY_SHIFT[difficulty], 1.0, size=n_questions)
+        discrimination = rng.uniform(0.5, 2.0, size=n_questions)
+        guess = 1.0 / n_options
+        p_correct = guess + (1 - guess) / (1 + np.exp(-discrimination * (ability[:, None] - item_difficulty[None, :])))
+        correct = rng.random((n_attempts, n_questions)) < p_correct
+        completed = rng.random(n_attempts) < args.completion_rate
+
+        question_seconds = rng.lognormal(np.log(SECONDS_PER_QUESTION), SECONDS_SIGMA, size=(n_attempts, n_questions))
+        time_taken = np.maximum(question_seconds.sum(axis=1).round().astype(np.int64), 5)
+        if time_limit:
+            time_taken = np.minimum(time_taken, time_limit)
+        score = (correct * points[None, :]).sum(axis=1)
+        started_at = self._started_at(n_attempts)
+        completed_at = started_at + time_taken
+
+        participants = rng.integers(0, args.participants, size=n_attempts)
+        self.attempts.add(
+            attempt_ids.tolist(), [quiz_id] * n_attempts,
+            [f"Peserta {index}" for index in participants.tolist()],
+            [f"peserta{index}@example.com" for index in participants.tolist()],
+            np.where(completed, score, 0).tolist(), [n_questions] * n_attempts,
+            np.where(completed, time_taken, 0).tolist(), started_at.tolist(),
+            [at if done else None for at, done in zip(completed_at.tolist(), completed.tolist())],
+            completed.tolist()
+        )
+
+        # Jawaban hanya untuk attempt yang di-submit, semuanya tercatat saat submit
+        done = np.flatnonzero(completed)
+        n_answers = len(done) * n_questions
+        wrong_shift = rng.integers(1, n_options, size=(len(done), n_questions))
+        answer_correct = correct[done]
+        position = np.where(answer_correct, correct_position[None, :], (correct_position[None, :] + wrong_shift) % n_options)
+        selected = option_ids[np.arange(n_questions)[None, :], position]
+        self.answers.add(
+            self.answers.next_ids(n_answers).tolist(), np.repeat(attempt_ids[done], n_questions).tolist(),
+            np.tile(question_ids, len(done)).tolist(), selected.ravel().tolist(), [None] * n_answers,
+            answer_correct.ravel().tolist(), np.repeat(completed_at[done], n_questions).tolist()
+        )
+
+    def run(self) -> dict:
+        args = self.args
+        if self.connection.dialect.name == "postgresql":
+            with self.connection.begin():
+                ensure_partitions(self.connection, since=(datetime.utcnow() - timedelta(days=args.days + 1)).date())
+
+        started = time.perf_counter()
+        for number in range(args.quizzes):
+            self._generate_quiz(number)
+            if self._buffered() >= args.batch_size:
+                self._flush()
+                elapsed = time.perf_counter() - started
+                print(
+                    f"{number + 1}/{args.quizzes} quiz, {self.attempts.written} attempt, "
+                    f"{self.answers.written} jawaban ({self.answers.written / elapsed:,.0f} jawaban/detik)"
+                )
+        self._flush()
+
+        with self.connection.begin():
+            for loader in self.loaders:
+                loader.reset_sequence()
+            rollups.rebuild(self.connection)
+            SearchCRUD.backfill(self.connection)
+        if self.connection.dialect.name == "postgresql":
+            with self.connection.begin():
+                for loader in self.loaders:
+                    self.connection.execute(text(f"ANALYZE {loader.table.name}"))
+
+        return {
+            "quizzes": self.quizzes.written,
+            "questions": self.questions.written,
+            "options": self.options.written,
+            "attempts": self.attempts.written,
+            "answers": self.answers.written,
+            "seconds": round(time.perf_counter() - started, 1)
+        }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python generate_data.py", description="Bangkitkan data sintetis untuk uji kapasitas")
+    parser.add_argument("--quizzes", type=int, default=10)
+    parser.add_argument("--questions", type=int, default=10, help="pertanyaan per quiz")
+    parser.add_argument("--options", type=int, default=4, help="option per pertanyaan (satu benar)")
+    parser.add_argument("--attempts", type=int, default=1000, help="attempt per quiz")
+    parser.add_argument("--completion-rate", type=float, default=0.85, help="porsi attempt yang di-submit")
+    parser.add_argument("--participants", type=int, default=None, help="jumlah peserta unik (default: total attempt / 3)")
+    parser.add_argument("--days", type=int, default=90, help="rentang hari ke belakang untuk started_at")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=200_000, help="baris per tabel per transaksi")
+    args = parser.parse_args()
+    if min(args.quizzes, args.questions, args.attempts, args.days) < 1:
+        parser.error("--quizzes, --questions, --attempts, dan --days minimal 1")
+    if args.options < 2:
+        parser.error("--options minimal 2")
+    if not 0 <= args.completion_rate <= 1:
+        parser.error("--completion-rate harus di antara 0 dan 1")
+    args.participants = args.participants or max(args.quizzes * args.attempts // 3, 1)
+
+    migrations.upgrade(engine)
+    with engine.connect() as connection:
+        result = SyntheticDataGenerator(connection, args).run()
+    print(
+        f"Selesai dalam {result['seconds']} detik: {result['quizzes']} quiz, {result['questions']} pertanyaan, "
+        f"{result['options']} option, {result['attempts']} attempt, {result['answers']} jawaban"
+    )
+
+if __name__ == "__main__":
+    main()
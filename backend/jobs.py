@@ -0,0 +1,429 @@
+"""Background job runner in-process.
+
+Job dijalankan di thread pool terbatas dengan session dari ``JobSessionLocal``
+(pool database terpisah), sehingga pekerjaan panjang (purge, rebuild, regrade, export) tidak memakai
+connection dari pool request. Status, progress, dan hasil disimpan di tabel
+``jobs``; ``job_key`` membuat submit idempotent.
+
+Setiap job pending/running dimiliki satu proses (``owner_host``/``owner_pid``)
+yang memperbarui ``heartbeat_at`` secara berkala. Worker mana pun mengambil alih
+job yang pemiliknya sudah mati (proses tidak ada lagi di host yang sama, atau
+heartbeat lewat ``JOB_HEARTBEAT_TIMEOUT``). Saat shutdown graceful, job yang
+sedang jalan atau masih antre dikembalikan ke pending untuk worker lain.
+"""
+import inspect
+import os
+import socket
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from config import settings
+from logger import logger
+from database import JobSessionLocal
+
+from models import Job
+
+PENDING = "pending"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATUSES = (SUCCEEDED, FAILED, CANCELLED)
+
+HOST = socket.gethostname()
+
+class JobCancelled(Exception):
+    pass
+
+class JobInterrupted(Exception):
+    """Runner sedang shutdown: job dikembalikan ke pending, bukan dibatalkan."""
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+class JobContext:
+    """Diberikan ke handler: session database job, laporan progress, dan cek pembatalan."""
+
+    def __init__(self, runner: "JobRunner", job_id: int, db: Session, cancel_event: threading.Event):
+        self.runner = runner
+        self.job_id = job_id
+        self.db = db
+        self._cancel_event = cancel_event
+        self._last_report = 0.0
+        self._last_poll = time.monotonic()
+
+    def check_cancelled(self) -> None:
+        """Berhenti jika job dibatalkan. Selain event di proses ini, flag
+        ``cancel_requested`` dibaca ulang dari database (paling sering sekali per
+        ``progress_interval`` detik) karena cancel bisa diterima worker lain."""
+        now = time.monotonic()
+        if not self._cancel_event.is_set() and now - self._last_poll >= self.runner.progress_interval:
+            self._last_poll = now
+            if self.runner._cancel_requested(self.job_id):
+                self._cancel_event.set()
+        if self._cancel_event.is_set():
+            raise JobCancelled()
+        if self.runner.stopping:
+            raise JobInterrupted()
+
+    def report(self, progress: float, force: bool = False) -> None:
+        """Simpan progress (0-100), paling sering sekali per ``progress_interval`` detik."""
+        self.check_cancelled()
+        now = time.monotonic()
+        if not force and now - self._last_report < self.runner.progress_interval:
+            return
+        self._last_report = now
+        self.runner._update(self.job_id, progress=round(min(max(progress, 0.0), 100.0), 2))
+
+class JobRunner:
+    def __init__(self, workers: int, progress_interval: float = 1.0):
+        self.workers = workers
+        self.progress_interval = progress_interval
+        self._handlers: Dict[str, Callable] = {}
+        self._exposed: set = set()
+        self._cancel_events: Dict[int, threading.Event] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._heartbeat_thread: Optional[threading.Thread] = None
+        self._stop_heartbeat = threading.Event()
+        self.stopping = False
+
+    def handler(self, job_type: str, exposed: bool = True):
+        """Decorator untuk mendaftarkan fungsi ``handler(context, **params)``.
+
+        Job dengan ``exposed=False`` hanya bisa dijadwalkan dari kode internal,
+        tidak lewat ``POST /jobs``.
+        """
+        def decorator(func: Callable) -> Callable:
+            self._handlers[job_type] = func
+            if exposed:
+                self._exposed.add(job_type)
+            return func
+        return decorator
+
+    @property
+    def job_types(self) -> list:
+        return sorted(self._handlers)
+
+    def is_exposed(self, job_type: str) -> bool:
+        return job_type in self._exposed
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job")
+        return self._executor
+
+    def _update(self, job_id: int, **values) -> None:
+        """Update kolom job; status yang sudah final tidak pernah ditimpa."""
+        db = JobSessionLocal()
+        try:
+            db.query(Job).filter(Job.id == job_id, Job.status.notin_(FINISHED_STATUSES)).update(
+                values, synchronize_session=False
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    @staticmethod
+    def _owner() -> dict:
+        # Dibaca saat dipakai, bukan saat import: worker hasil fork punya pid sendiri
+        return {"owner_host": HOST, "owner_pid": os.getpid()}
+
+    def _cancel_requested(self, job_id: int) -> bool:
+        db = JobSessionLocal()
+        try:
+            return bool(db.query(Job.cancel_requested).filter(Job.id == job_id).scalar())
+        finally:
+            db.close()
+
+    def submit(
+        self,
+        job_type: str,
+        params: Optional[dict] = None,
+        job_key: Optional[str] = None,
+        dedupe_statuses: tuple = (PENDING, RUNNING, SUCCEEDED)
+    ) -> Job:
+        """Buat job baru, atau kembalikan job dengan ``job_key`` yang sama jika
+        statusnya ada di ``dedupe_statuses`` (default: aktif atau sukses)."""
+        if job_type not in self._handlers:
+            raise ValueError(f"Job type {job_type} tidak dikenal")
+        try:
+            inspect.signature(self._handlers[job_type]).bind(None, **(params or {}))
+        except TypeError as e:
+            raise ValueError(f"Parameter job {job_type} tidak valid: {e}")
+
+        db = JobSessionLocal()
+        try:
+            if job_key:
+                existing = db.query(Job).filter(Job.job_key == job_key).first()
+                if existing and existing.status in dedupe_statuses:
+                    return existing
+                if existing:
+                    # Key dilepas dari job lama agar job baru bisa memakainya
+                    existing.job_key = None
+                    db.flush()
+
+            # Runner yang sedang shutdown tidak menjalankan job baru: biarkan tanpa
+            # pemilik agar langsung diambil worker lain
+            owner = {} if self.stopping else dict(heartbeat_at=datetime.utcnow(), **self._owner())
+            job = Job(job_type=job_type, job_key=job_key, params=params or {}, status=PENDING, progress=0.0, **owner)
+            db.add(job)
+            try:
+                db.commit()
+            except IntegrityError:
+                db.rollback()
+                return db.query(Job).filter(Job.job_key == job_key).one()
+            db.refresh(job)
+            db.expunge(job)
+        finally:
+            db.close()
+
+        if not self.stopping:
+            self._schedule(job.id)
+        logger.info(f"Job {job.id} ({job_type}) dijadwalkan")
+        return job
+
+    def _schedule(self, job_id: int) -> None:
+        with self._lock:
+            if job_id in self._cancel_events:
+                # Sudah antre/berjalan di proses ini (misalnya submit dan recovery bersamaan)
+                return
+            self._cancel_events[job_id] = threading.Event()
+        self._pool().submit(self._run, job_id)
+
+    def _run(self, job_id: int) -> None:
+        cancel_event = self._cancel_events.get(job_id) or threading.Event()
+        db = JobSessionLocal()
+        try:
+            job = db.query(Job).filter(Job.id == job_id).first()
+            if not job or job.status != PENDING or self.stopping:
+                return
+            if cancel_event.is_set() or job.cancel_requested:
+                self._update(job_id, status=CANCELLED, finished_at=datetime.utcnow())
+                return
+
+            # Transisi bersyarat: job yang baru saja dibatalkan atau diambil alih worker
+            # lain tidak ikut dijalankan
+            owner = self._owner()
+            started = db.query(Job).filter(
+                Job.id == job_id,
+                Job.status == PENDING,
+                Job.owner_host == owner["owner_host"],
+                Job.owner_pid == owner["owner_pid"]
+            ).update(
+                {"status": RUNNING, "started_at": datetime.utcnow()}, synchronize_session=False
+            )
+            db.commit()
+            if not started:
+                return
+            db.refresh(job)
+
+            handler = self._handlers[job.job_type]
+            context = JobContext(self, job_id, db, cancel_event)
+            params = dict(job.params or {})
+            try:
+                result = handler(context, **params)
+                db.rollback()
+                self._update(job_id, status=SUCCEEDED, progress=100.0, result=result, finished_at=datetime.utcnow())
+                logger.info(f"Job {job_id} ({job.job_type}) selesai")
+            except JobCancelled:
+                db.rollback()
+                self._update(job_id, status=CANCELLED, finished_at=datetime.utcnow())
+                logger.info(f"Job {job_id} dibatalkan")
+            except JobInterrupted:
+                db.rollback()
+                self._update(job_id, status=PENDING, started_at=None, owner_host=None, owner_pid=None, heartbeat_at=None)
+                logger.info(f"Job {job_id} dikembalikan ke pending karena worker berhenti")
+            except Exception as e:
+                db.rollback()
+                self._update(
+                    job_id,
+                    status=FAILED,
+                    error=f"{e}\n{traceback.format_exc(limit=5)}",
+                    finished_at=datetime.utcnow()
+                )
+                logger.error(f"Job {job_id} ({job.job_type}) gagal: {str(e)}")
+        finally:
+            db.close()
+            with self._lock:
+                self._cancel_events.pop(job_id, None)
+
+    def get(self, db: Session, job_id: int) -> Optional[Job]:
+        return db.query(Job).filter(Job.id == job_id).first()
+
+    def cancel(self, db: Session, job_id: int) -> Optional[Job]:
+        job = self.get(db, job_id)
+        if not job or job.status in FINISHED_STATUSES:
+            return job
+        job.cancel_requested = True
+        if job.status == PENDING:
+            job.status = CANCELLED
+            job.finished_at = datetime.utcnow()
+        db.commit()
+        db.refresh(job)
+        with self._lock:
+            event = self._cancel_events.get(job_id)
+        if event:
+            event.set()
+        return job
+
+    def _owner_dead(self, job, stale_before: datetime) -> bool:
+        owner = self._owner()
+        if job.owner_pid is None or job.heartbeat_at is None or job.heartbeat_at < stale_before:
+            return True
+        if job.owner_host == owner["owner_host"] and job.owner_pid == owner["owner_pid"]:
+            # Pemiliknya proses ini (atau proses lama dengan pid sama): hidup hanya
+            # jika job memang dijadwalkan di sini
+            with self._lock:
+                return job.id not in self._cancel_events
+        return job.owner_host == owner["owner_host"] and not _pid_alive(job.owner_pid)
+
+    def recover(self) -> None:
+        """Ambil alih job pending/running yang pemiliknya sudah mati, lalu jadwalkan ulang.
+
+        Klaimnya UPDATE bersyarat pada pemilik dan heartbeat lama, sehingga aman
+        dijalankan bersamaan oleh beberapa worker: satu job hanya diambil satu worker.
+        """
+        if self.stopping:
+            return
+        now = datetime.utcnow()
+        stale_before = now - timedelta(seconds=settings.JOB_HEARTBEAT_TIMEOUT)
+        db = JobSessionLocal()
+        try:
+            jobs = db.query(Job.id, Job.owner_host, Job.owner_pid, Job.heartbeat_at).filter(
+                Job.status.in_((PENDING, RUNNING)),
+                Job.job_type.in_(list(self._handlers))
+            ).all()
+            job_ids = []
+            for job in jobs:
+                if not self._owner_dead(job, stale_before):
+                    continue
+                claimed = db.query(Job).filter(
+                    Job.id == job.id,
+                    Job.status.in_((PENDING, RUNNING)),
+                    Job.owner_host.is_not_distinct_from(job.owner_host),
+                    Job.owner_pid.is_not_distinct_from(job.owner_pid),
+                    Job.heartbeat_at.is_not_distinct_from(job.heartbeat_at)
+                ).update(dict(status=PENDING, heartbeat_at=now, **self._owner()), synchronize_session=False)
+                db.commit()
+                if claimed:
+                    job_ids.append(job.id)
+        finally:
+            db.close()
+        for job_id in job_ids:
+            self._schedule(job_id)
+        if job_ids:
+            logger.info(f"{len(job_ids)} job dijadwalkan ulang")
+
+    def heartbeat(self) -> None:
+        """Perbarui heartbeat job yang sedang antre/berjalan di proses ini."""
+        with self._lock:
+            job_ids = list(self._cancel_events)
+        if not job_ids:
+            return
+        owner = self._owner()
+        db = JobSessionLocal()
+        try:
+            db.query(Job).filter(
+                Job.id.in_(job_ids),
+                Job.owner_host == owner["owner_host"],
+                Job.owner_pid == owner["owner_pid"]
+            ).update({"heartbeat_at": datetime.utcnow()}, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    def _heartbeat_loop(self) -> None:
+        while True:
+            try:
+                self.recover()
+                self.heartbeat()
+            except Exception as e:
+                logger.error(f"Error heartbeat/recovery job: {str(e)}")
+            if self._stop_heartbeat.wait(settings.JOB_HEARTBEAT_INTERVAL):
+                return
+
+    def start(self) -> None:
+        """Mulai thread heartbeat + recovery (dipanggil saat startup di setiap worker)."""
+        with self._lock:
+            if self._heartbeat_thread is not None:
+                return
+            self._heartbeat_thread = threading.Thread(target=self._heartbeat_loop, name="job-heartbeat", daemon=True)
+        self._heartbeat_thread.start()
+
+    def shutdown(self) -> None:
+        """Shutdown graceful: job yang berjalan berhenti di checkpoint berikutnya dan
+        kembali ke pending; job yang masih antre dilepas untuk diambil worker lain."""
+        self.stopping = True
+        self._stop_heartbeat.set()
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        owner = self._owner()
+        db = JobSessionLocal()
+        try:
+            released = db.query(Job).filter(
+                Job.status == PENDING,
+                Job.owner_host == owner["owner_host"],
+                Job.owner_pid == owner["owner_pid"]
+            ).update({"owner_host": None, "owner_pid": None, "heartbeat_at": None}, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+        if released:
+            logger.info(f"{released} job antre dilepas untuk worker lain")
+
+job_runner = JobRunner(settings.JOB_WORKERS, settings.JOB_PROGRESS_INTERVAL)
+
+@job_runner.handler("purge_quiz", exposed=False)
+def purge_quiz_job(context: JobContext, quiz_id: int) -> dict:
+    from crud import QuizCRUD
+    return {"purged_attempts": QuizCRUD.purge_quiz(context.db, quiz_id, context=context)}
+
+@job_runner.handler("regrade_quiz")
+def regrade_quiz_job(context: JobContext, quiz_id: int, question_id: Optional[int] = None) -> dict:
+    from crud import QuizAttemptCRUD
+    return QuizAttemptCRUD.regrade(context.db, quiz_id, question_id, context=context)
+
+@job_runner.handler("snapshot_answers")
+def snapshot_answers_job(context: JobContext, quiz_id: Optional[int] = None) -> dict:
+    import snapshots
+    if quiz_id:
+        return {"quiz_id": quiz_id, "attempts_appended": snapshots.snapshot_quiz(context.db, quiz_id, context=context)}
+    return snapshots.snapshot_all(context.db, context=context)
+
+@job_runner.handler("rebuild_activity_rollups")
+def rebuild_activity_rollups_job(context: JobContext, quiz_id: Optional[int] = None) -> dict:
+    import rollups
+    rollups.rebuild(context.db, quiz_id)
+    context.db.commit()
+    return {"quiz_id": quiz_id}
+
+@job_runner.handler("rebuild_category_facets")
+def rebuild_category_facets_job(context: JobContext) -> dict:
+    from facets import category_facets
+    category_facets.load(context.db)
+    return category_facets.facets(context.db)
+
+@job_runner.handler("sweep_attempts")
+def sweep_attempts_job(context: JobContext) -> dict:
+    import sweeper
+    return sweeper.sweep(context.db, context=context)
+
+@job_runner.handler("partition_maintenance")
+def partition_maintenance_job(context: JobContext) -> dict:
+    import partitions
+    partitions.run_maintenance(context.db.get_bind())
+    return {}
@@ -0,0 +1,199 @@
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+from sqlalchemy import and_, or_, func
+from sqlalchemy.orm import Session
+from config import settings
+from logger import logger
+
+from models import QuizAttempt
+
+# (-score, time_taken, attempt_id): urutan ascending = ranking leaderboard
+SortKey = Tuple[int, int, int]
+
+def sort_key(score: int, time_taken: int, attempt_id: int) -> SortKey:
+    return (-(score or 0), time_taken or 0, attempt_id)
+
+class QuizLeaderboard:
+    """Top-K attempt selesai untuk satu quiz, terurut berdasarkan score lalu waktu."""
+
+    def __init__(self, top_k: int, entries: List[dict], total_completed: int, expires_at: float = float("inf")):
+        self.top_k = top_k
+        self.total_completed = total_completed
+        self.expires_at = expires_at
+        self.keys: List[SortKey] = []
+        self.entries = {}
+        for entry in entries:
+            key = sort_key(entry["score"], entry["time_taken"], entry["attempt_id"])
+            self.keys.append(key)
+            self.entries[entry["attempt_id"]] = entry
+        self.keys.sort()
+
+    @property
+    def is_complete(self) -> bool:
+        # True jika seluruh attempt selesai muat di memori
+        return self.total_completed <= len(self.keys)
+
+    def add(self, entry: dict) -> None:
+        self.total_completed += 1
+        key = sort_key(entry["score"], entry["time_taken"], entry["attempt_id"])
+        if len(self.keys) >= self.top_k and key >= self.keys[-1]:
+            return
+        insort(self.keys, key)
+        self.entries[entry["attempt_id"]] = entry
+        if len(self.keys) > self.top_k:
+            evicted = self.keys.pop()
+            self.entries.pop(evicted[2], None)
+
+    def page(self, skip: int, limit: int) -> Optional[List[dict]]:
+        """Satu halaman dari memori, atau None jika halaman melewati batas top-K."""
+        end = skip + limit
+        if end > len(self.keys) and not self.is_complete:
+            return None
+        return [
+            dict(self.entries[key[2]], rank=skip + position + 1)
+            for position, key in enumerate(self.keys[skip:end])
+        ]
+
+    def rank_of(self, attempt_id: int) -> Optional[dict]:
+        entry = self.entries.get(attempt_id)
+        if entry is None:
+            return None
+        position = bisect_left(self.keys, sort_key(entry["score"], entry["time_taken"], attempt_id))
+        return dict(entry, rank=position + 1)
+
+class LeaderboardIndex:
+    """Cache LRU leaderboard per quiz yang sedang ramai.
+
+    Leaderboard dimuat dari index (quiz_id, is_completed, score DESC, time_taken)
+    hanya untuk K baris teratas, lalu diperbarui saat attempt di-submit di worker
+    ini. Submit yang ditangani worker lain baru terlihat setelah leaderboard
+    dimuat ulang, paling lambat ``ttl`` detik kemudian.
+    """
+
+    def __init__(self, top_k: int, max_quizzes: int, ttl: float):
+        self.top_k = top_k
+        self.max_quizzes = max_quizzes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._boards: "OrderedDict[int, QuizLeaderboard]" = OrderedDict()
+
+    @staticmethod
+    def _ordered_query(db: Session, quiz_id: int):
+        return db.query(
+            QuizAttempt.id,
+            QuizAttempt.participant_name,
+            QuizAttempt.score,
+            QuizAttempt.time_taken,
+            QuizAttempt.completed_at
+        ).filter(
+            QuizAttempt.quiz_id == quiz_id,
+            QuizAttempt.is_completed == True
+        ).order_by(
+            QuizAttempt.score.desc(),
+            QuizAttempt.time_taken.asc(),
+            QuizAttempt.id.asc()
+        )
+
+    @staticmethod
+    def _entry(row) -> dict:
+        return {
+            "attempt_id": row.id,
+            "participant_name": row.participant_name,
+            "score": row.score or 0,
+            "time_taken": row.time_taken or 0,
+            "completed_at": row.completed_at
+        }
+
+    def _load(self, db: Session, quiz_id: int) -> QuizLeaderboard:
+        rows = self._ordered_query(db, quiz_id).limit(self.top_k).all()
+        if len(rows) < self.top_k:
+            total_completed = len(rows)
+        else:
+            total_completed = db.query(func.count(QuizAttempt.id)).filter(
+                QuizAttempt.quiz_id == quiz_id,
+                QuizAttempt.is_completed == True
+            ).scalar()
+        logger.info(f"Leaderboard quiz {quiz_id} dimuat ({len(rows)} dari {total_completed} attempts)")
+        return QuizLeaderboard(
+            self.top_k, [self._entry(row) for row in rows], total_completed, time.monotonic() + self.ttl
+        )
+
+    def get(self, db: Session, quiz_id: int) -> QuizLeaderboard:
+        with self._lock:
+            board = self._boards.get(quiz_id)
+            if board is not None and board.expires_at > time.monotonic():
+                self._boards.move_to_end(quiz_id)
+                return board
+
+        board = self._load(db, quiz_id)
+        with self._lock:
+            self._boards[quiz_id] = board
+            self._boards.move_to_end(quiz_id)
+            while len(self._boards) > self.max_quizzes:
+                self._boards.popitem(last=False)
+        return board
+
+    def record(self, attempt: QuizAttempt) -> None:
+        """Tambahkan attempt yang baru selesai ke leaderboard quiz jika sedang di-cache."""
+        with self._lock:
+            board = self._boards.get(attempt.quiz_id)
+            if board is not None:
+                board.add(self._entry(attempt))
+
+    def invalidate(self, quiz_id: Optional[int] = None) -> None:
+        with self._lock:
+            if quiz_id is None:
+                self._boards.clear()
+            else:
+                self._boards.pop(quiz_id, None)
+
+    def page(self, db: Session, quiz_id: int, skip: int, limit: int) -> Tuple[int, List[dict]]:
+        board = self.get(db, quiz_id)
+        with self._lock:
+            entries = board.page(skip, limit)
+            total_completed = board.total_completed
+        if entries is None:
+            # Halaman di luar top-K: ambil langsung lewat index
+            rows = self._ordered_query(db, quiz_id).offset(skip).limit(limit).all()
+            entries = [
+                dict(self._entry(row), rank=skip + position + 1)
+                for position, row in enumerate(rows)
+            ]
+        return total_completed, entries
+
+    def rank_of(self, db: Session, quiz_id: int, attempt_id: int) -> Optional[dict]:
+        board = self.get(db, quiz_id)
+        with self._lock:
+            entry = board.rank_of(attempt_id)
+        if entry is not None:
+            return entry
+
+        attempt = db.query(QuizAttempt).filter(
+            QuizAttempt.id == attempt_id,
+            QuizAttempt.quiz_id == quiz_id,
+            QuizAttempt.is_completed == True
+        ).first()
+        if not attempt:
+            return None
+
+        # Hitung attempt yang lebih baik dengan range scan pada index leaderboard
+        score, time_taken = attempt.score or 0, attempt.time_taken or 0
+        better = db.query(func.count(QuizAttempt.id)).filter(
+            QuizAttempt.quiz_id == quiz_id,
+            QuizAttempt.is_completed == True,
+            or_(
+                QuizAttempt.score > score,
+                and_(QuizAttempt.score == score, QuizAttempt.time_taken < time_taken),
+                and_(
+                    QuizAttempt.score == score,
+                    QuizAttempt.time_taken == time_taken,
+                    QuizAttempt.id < attempt_id
+                )
+            )
+        ).scalar()
+        return dict(self._entry(attempt), rank=better + 1)
+
+leaderboards = LeaderboardIndex(settings.LEADERBOARD_TOP_K, settings.LEADERBOARD_MAX_QUIZZES, settings.LEADERBOARD_TTL)
@@ -0,0 +1,518 @@
+"""Sesi quiz live (dipandu guru) lewat WebSocket dengan hub fan-out in-process.
+
+Guru membuat sesi untuk satu quiz lalu memajukan pertanyaan satu per satu;
+setiap siswa yang tersambung mendapat QuizAttempt biasa. Payload pertanyaan
+diserialisasi sekali saat sesi dibuat dan teks yang sama dimasukkan ke antrean
+kirim setiap koneksi, sehingga siswa yang lambat tidak menahan broadcast
+(koneksinya ditutup jika antreannya penuh). Jawaban dinilai di memori dengan
+kunci jawaban yang di-cache, ditampung di buffer, lalu disimpan ke
+user_answers per batch oleh ticker sesi; attempt ditutup sekaligus saat sesi
+berakhir.
+
+State sesi hanya diubah dari event loop, jadi tidak memakai lock. Sesi hidup
+di memori satu worker: dengan beberapa worker, load balancer harus mengarahkan
+semua koneksi satu sesi ke worker yang membuatnya.
+"""
+import asyncio
+import json
+import secrets
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+from fastapi import WebSocket
+from starlette.concurrency import run_in_threadpool
+from starlette.websockets import WebSocketDisconnect
+from config import settings
+from logger import logger
+
+from admission import Priority
+from database import run_in_session
+from crud import QuizCRUD, QuizAttemptCRUD
+from exceptions import QuizNotFoundException
+from schemas import QuestionPublic, QuizAttemptBatchCreate, QuizAttemptParticipant
+
+LOBBY = "lobby"
+QUESTION_OPEN = "question_open"
+QUESTION_CLOSED = "question_closed"
+ENDED = "ended"
+
+# Close code WebSocket
+CLOSE_POLICY = 1008
+CLOSE_ERROR = 1011
+CLOSE_TRY_AGAIN = 1013
+CLOSE_FORBIDDEN = 4403
+CLOSE_NOT_FOUND = 4404
+
+# Batas peserta per INSERT attempt (sama dengan QuizAttemptBatchCreate)
+JOIN_BATCH_SIZE = 1000
+
+def _dumps(message: dict) -> str:
+    return json.dumps(message, separators=(",", ":"), default=str)
+
+def _run_db(operation, *args):
+    return run_in_session(operation, *args, priority=Priority.HIGH)
+
+class LiveConnection:
+    """Satu WebSocket dengan antrean kirim terbatas dan task writer sendiri."""
+
+    __slots__ = ("websocket", "queue", "closed", "close_code")
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.LIVE_SEND_QUEUE_SIZE)
+        self.closed = False
+        self.close_code = 1000
+
+    def send(self, text: str) -> bool:
+        if self.closed:
+            return False
+        try:
+            self.queue.put_nowait(text)
+            return True
+        except asyncio.QueueFull:
+            logger.warning("Koneksi live terlalu lambat, ditutup")
+            self.close(CLOSE_POLICY)
+            return False
+
+    def close(self, code: int = 1000) -> None:
+        """Hentikan writer setelah pesan yang sudah diantrekan (dibuang jika antrean penuh)."""
+        if self.closed:
+            return
+        self.closed = True
+        self.close_code = code
+        if self.queue.full():
+            while not self.queue.empty():
+                self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+    async def writer(self) -> None:
+        try:
+            while True:
+                text = await self.queue.get()
+                if text is None:
+                    break
+                await self.websocket.send_text(text)
+        except Exception:
+            pass
+        finally:
+            self.closed = True
+            try:
+                await self.websocket.close(code=self.close_code)
+            except Exception:
+                pass
+
+class LiveParticipant:
+    __slots__ = ("attempt_id", "participant_name", "rejoin_key", "connection", "score", "results", "joined_at", "last_answer_at")
+
+    def __init__(self, attempt_id: int, participant_name: Optional[str], connection: LiveConnection):
+        self.attempt_id = attempt_id
+        self.participant_name = participant_name
+        self.rejoin_key = secrets.token_urlsafe(12)
+        self.connection = connection
+        self.score = 0
+        self.results: Dict[int, bool] = {}  # question_id -> benar
+        self.joined_at = time.monotonic()
+        self.last_answer_at: Optional[float] = None
+
+class LiveSession:
+    def __init__(self, session_id: str, quiz_id: int, quiz_title: str, questions: List[dict]):
+        self.session_id = session_id
+        self.quiz_id = quiz_id
+        self.quiz_title = quiz_title
+        self.host_key = secrets.token_urlsafe(16)
+        self.questions = questions
+        self.state = LOBBY
+        self.index = -1
+        self.hosts: List[LiveConnection] = []
+        self.participants: Dict[int, LiveParticipant] = {}
+        self._by_rejoin_key: Dict[str, LiveParticipant] = {}
+        self._counts: Counter = Counter()
+        self._answered = 0
+        self._pending_joins: list = []
+        self._pending_answers: List[dict] = []
+        self._flush_lock = asyncio.Lock()
+        self._dirty = False
+        self._stats_sent_at = 0.0
+        self._active_at = time.monotonic()
+        self._ticker: Optional[asyncio.Task] = None
+        self.on_end = None
+
+    @property
+    def current(self) -> Optional[dict]:
+        return self.questions[self.index] if 0 <= self.index < len(self.questions) else None
+
+    @property
+    def connected(self) -> int:
+        return sum(1 for participant in self.participants.values() if participant.connection is not None)
+
+    def summary(self) -> dict:
+        return {
+            "session_id": self.session_id,
+            "quiz_id": self.quiz_id,
+            "quiz_title": self.quiz_title,
+            "total_questions": len(self.questions),
+            "status": self.state,
+            "current_question": self.index if self.current else None,
+            "players": self.connected,
+        }
+
+    def start(self) -> None:
+        self._ticker = asyncio.create_task(self._run())
+
+    def _connections(self):
+        yield from self.hosts
+        for participant in self.participants.values():
+            if participant.connection is not None:
+                yield participant.connection
+
+    def broadcast(self, text: str) -> None:
+        for connection in list(self._connections()):
+            connection.send(text)
+
+    def _stats_message(self) -> str:
+        question = self.current
+        return _dumps({
+            "type": "stats",
+            "state": self.state,
+            "question_index": self.index if question else None,
+            "question_id": question["id"] if question else None,
+            "players": self.connected,
+            "answered": self._answered,
+            "counts": {str(option_id): count for option_id, count in self._counts.items()},
+        })
+
+    # Peserta
+    async def join(self, connection: LiveConnection, participant: QuizAttemptParticipant, rejoin_key: Optional[str] = None) -> LiveParticipant:
+        existing = self._by_rejoin_key.get(rejoin_key) if rejoin_key else None
+        if existing is not None:
+            if existing.connection is not None:
+                existing.connection.close(CLOSE_POLICY)
+            existing.connection = connection
+        else:
+            if self.state == ENDED:
+                raise RuntimeError(f"Sesi live {self.session_id} sudah berakhir")
+            future = asyncio.get_running_loop().create_future()
+            self._pending_joins.append((participant, connection, future))
+            existing = await future
+        self._dirty = True
+        self._active_at = time.monotonic()
+        return existing
+
+    def leave(self, participant: LiveParticipant, connection: LiveConnection) -> None:
+        if participant.connection is connection:
+            participant.connection = None
+            self._dirty = True
+
+    def answer(self, participant: LiveParticipant, question_id: int, option_id: Optional[int], text_answer: Optional[str]) -> Optional[str]:
+        """Nilai jawaban dengan kunci jawaban di memori; mengembalikan alasan jika ditolak."""
+        question = self.current
+        if self.state != QUESTION_OPEN or question is None or question["id"] != question_id:
+            return "Pertanyaan tidak sedang dibuka"
+        if question_id in participant.results:
+            return "Pertanyaan sudah dijawab"
+        if question["options"]:
+            if option_id not in question["options"]:
+                return "Option tidak valid"
+            text_answer = None
+        elif not text_answer:
+            return "Jawaban teks kosong"
+
+        is_correct = option_id in question["correct"]
+        participant.results[question_id] = is_correct
+        if is_correct:
+            participant.score += question["points"]
+        participant.last_answer_at = time.monotonic()
+        if option_id is not None:
+            self._counts[option_id] += 1
+        self._answered += 1
+        self._dirty = True
+        self._pending_answers.append({
+            "attempt_id": participant.attempt_id,
+            "question_id": question_id,
+            "selected_option_id": option_id if question["options"] else None,
+            "text_answer": text_answer[:1000] if text_answer else None,
+            "is_correct": is_correct,
+        })
+        return None
+
+    # Perintah guru
+    def advance(self) -> None:
+        if self.state == QUESTION_OPEN:
+            self.close_question()
+        if self.index + 1 >= len(self.questions):
+            return
+        self.index += 1
+        self.state = QUESTION_OPEN
+        self._counts = Counter()
+        self._answered = 0
+        self._dirty = True
+        self.broadcast(self.current["payload"])
+
+    def close_question(self) -> None:
+        question = self.current
+        if self.state != QUESTION_OPEN or question is None:
+            return
+        self.state = QUESTION_CLOSED
+        self.broadcast(_dumps({
+            "type": "reveal",
+            "question_id": question["id"],
+            "correct_option_ids": sorted(question["correct"]),
+            "answered": self._answered,
+            "counts": {str(option_id): count for option_id, count in self._counts.items()},
+        }))
+        for participant in self.participants.values():
+            if participant.connection is not None:
+                participant.connection.send(_dumps({
+                    "type": "result",
+                    "question_id": question["id"],
+                    "correct": participant.results.get(question["id"]),
+                    "score": participant.score,
+                }))
+
+    async def end(self) -> int:
+        """Simpan semua jawaban, tutup attempt, lalu putuskan semua koneksi."""
+        if self.state == ENDED:
+            return 0
+        self.close_question()
+        self.state = ENDED
+        # Flush yang sedang berjalan di ticker dibiarkan selesai (loop-nya berhenti
+        # sendiri karena ENDED); cancel di tengah _create_attempts membuat join
+        # menunggu selamanya. flush() di bawah menunggu lock-nya lalu menyapu sisanya.
+        if self._ticker is not None and self._ticker is not asyncio.current_task() and not self._flush_lock.locked():
+            self._ticker.cancel()
+        await self.flush()
+
+        now = time.monotonic()
+        results = {
+            participant.attempt_id: (
+                participant.score,
+                int((participant.last_answer_at or now) - participant.joined_at)
+            )
+            for participant in self.participants.values()
+        }
+        completed = 0
+        if results:
+            try:
+                completed = await run_in_threadpool(_run_db, QuizAttemptCRUD.complete_live_attempts, self.quiz_id, results)
+            except Exception as e:
+                logger.error(f"Error menutup attempt sesi live {self.session_id}: {str(e)}")
+
+        self.broadcast(_dumps({"type": "ended", "completed": completed}))
+        for connection in list(self._connections()):
+            connection.close()
+        if self.on_end:
+            self.on_end(self)
+        logger.info(f"Sesi live {self.session_id} selesai ({completed} attempt ditutup)")
+        return completed
+
+    # Ticker: batch join, simpan jawaban, dorong statistik
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            joins, self._pending_joins = self._pending_joins, []
+            for start in range(0, len(joins), JOIN_BATCH_SIZE):
+                await self._create_attempts(joins[start:start + JOIN_BATCH_SIZE])
+
+            rows, self._pending_answers = self._pending_answers, []
+            if rows:
+                try:
+                    await run_in_threadpool(_run_db, QuizAttemptCRUD.record_live_answers, rows)
+                except Exception as e:
+                    # Dicoba lagi pada tick berikutnya
+                    logger.error(f"Error menyimpan jawaban sesi live {self.session_id}: {str(e)}")
+                    self._pending_answers[:0] = rows
+
+    async def _create_attempts(self, joins: list) -> None:
+        try:
+            batch = await run_in_threadpool(
+                _run_db,
+                QuizAttemptCRUD.create_attempts_batch,
+                QuizAttemptBatchCreate(quiz_id=self.quiz_id, participants=[participant for participant, _, _ in joins])
+            )
+        except Exception as e:
+            for _, _, future in joins:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        # Peserta didaftarkan di sini, bukan setelah join dilanjutkan, agar end()
+        # yang menunggu flush ini ikut menutup attempt-nya
+        for (participant, connection, future), attempt_id in zip(joins, batch.attempt_ids):
+            player = LiveParticipant(attempt_id, participant.participant_name, None if future.done() else connection)
+            self.participants[attempt_id] = player
+            self._by_rejoin_key[player.rejoin_key] = player
+            if not future.done():
+                future.set_result(player)
+
+    async def _run(self) -> None:
+        while self.state != ENDED:
+            await asyncio.sleep(settings.LIVE_FLUSH_INTERVAL)
+            try:
+                await self.flush()
+                now = time.monotonic()
+                if self._dirty and now - self._stats_sent_at >= settings.LIVE_STATS_INTERVAL:
+                    self._dirty = False
+                    self._stats_sent_at = now
+                    self.broadcast(self._stats_message())
+                if any(True for _ in self._connections()):
+                    self._active_at = now
+                elif now - self._active_at > settings.LIVE_IDLE_TIMEOUT:
+                    logger.info(f"Sesi live {self.session_id} idle, diakhiri")
+                    await self.end()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error ticker sesi live {self.session_id}: {str(e)}")
+
+def _load_session(db, quiz_id: int) -> LiveSession:
+    """Cache kunci jawaban dan payload pertanyaan (tanpa kunci jawaban) untuk satu sesi."""
+    quiz = QuizCRUD.get_quiz_with_questions(db, quiz_id)
+    if not quiz:
+        raise QuizNotFoundException(quiz_id)
+    questions = sorted(quiz.questions, key=lambda question: question.id)
+    cached = []
+    for index, question in enumerate(questions):
+        public = QuestionPublic.model_validate(question).model_dump(mode="json")
+        public["options"].sort(key=lambda option: (option["option_order"], option["id"]))
+        cached.append({
+            "id": question.id,
+            "points": question.points or 0,
+            "options": {option.id for option in question.options},
+            "correct": {option.id for option in question.options if option.is_correct},
+            "payload": _dumps({"type": "question", "index": index, "total": len(questions), "question": public}),
+        })
+    return LiveSession(secrets.token_urlsafe(6), quiz.id, quiz.title, cached)
+
+class LiveHub:
+    """Registry sesi live di worker ini dan batas jumlah koneksi WebSocket."""
+
+    def __init__(self, max_connections: int):
+        self.max_connections = max_connections
+        self.sessions: Dict[str, LiveSession] = {}
+        self.connections = 0
+
+    async def create(self, quiz_id: int) -> LiveSession:
+        session = await run_in_threadpool(_run_db, _load_session, quiz_id)
+        session.on_end = lambda ended: self.sessions.pop(ended.session_id, None)
+        self.sessions[session.session_id] = session
+        session.start()
+        logger.info(f"Sesi live {session.session_id} dibuat untuk quiz {quiz_id}")
+        return session
+
+    def get(self, session_id: str) -> Optional[LiveSession]:
+        return self.sessions.get(session_id)
+
+    async def _serve(self, websocket: WebSocket, connection: LiveConnection, writer: asyncio.Task, on_message) -> None:
+        async def reader() -> None:
+            try:
+                while not connection.closed:
+                    text = await websocket.receive_text()
+                    try:
+                        message = json.loads(text)
+                        if not isinstance(message, dict):
+                            raise ValueError
+                    except ValueError:
+                        connection.send(_dumps({"type": "error", "message": "Pesan harus objek JSON"}))
+                        continue
+                    await on_message(message)
+            except (WebSocketDisconnect, RuntimeError):
+                pass
+
+        # Berhenti membaca begitu writer selesai (koneksi ditutup server), tanpa
+        # menunggu client membalas close frame
+        reading = asyncio.create_task(reader())
+        try:
+            await asyncio.wait({reading, writer}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            reading.cancel()
+            connection.close()
+            await writer
+
+    async def serve_host(self, websocket: WebSocket, session: LiveSession) -> None:
+        await websocket.accept()
+        connection = LiveConnection(websocket)
+        writer = asyncio.create_task(connection.writer())
+        session.hosts.append(connection)
+        connection.send(_dumps(dict(session.summary(), type="session")))
+        if session.current is not None:
+            connection.send(session.current["payload"])
+
+        async def on_message(message: dict) -> None:
+            action = message.get("action")
+            if action == "next":
+                session.advance()
+            elif action == "close":
+                session.close_question()
+            elif action == "end":
+                await asyncio.shield(session.end())
+            else:
+                connection.send(_dumps({"type": "error", "message": f"Action {action} tidak dikenal"}))
+
+        try:
+            await self._serve(websocket, connection, writer, on_message)
+        finally:
+            if connection in session.hosts:
+                session.hosts.remove(connection)
+
+    async def serve_player(
+        self,
+        websocket: WebSocket,
+        session: LiveSession,
+        participant: QuizAttemptParticipant,
+        rejoin_key: Optional[str] = None
+    ) -> None:
+        if self.connections >= self.max_connections:
+            await websocket.close(code=CLOSE_TRY_AGAIN)
+            return
+        self.connections += 1
+        try:
+            await websocket.accept()
+            connection = LiveConnection(websocket)
+            writer = asyncio.create_task(connection.writer())
+            try:
+                player = await session.join(connection, participant, rejoin_key)
+            except Exception as e:
+                logger.error(f"Error join sesi live {session.session_id}: {str(e)}")
+                connection.send(_dumps({"type": "error", "message": "Gagal bergabung ke sesi"}))
+                connection.close(CLOSE_ERROR)
+                await writer
+                return
+
+            connection.send(_dumps({
+                "type": "joined",
+                "attempt_id": player.attempt_id,
+                "rejoin_key": player.rejoin_key,
+                "score": player.score,
+                **session.summary(),
+            }))
+            if session.current is not None:
+                connection.send(session.current["payload"])
+
+            async def on_message(message: dict) -> None:
+                if message.get("action") != "answer":
+                    connection.send(_dumps({"type": "error", "message": "Action tidak dikenal"}))
+                    return
+                question_id, option_id = message.get("question_id"), message.get("option_id")
+                text_answer = message.get("text_answer")
+                if not isinstance(question_id, int) or (option_id is not None and not isinstance(option_id, int)):
+                    reason = "question_id/option_id harus integer"
+                else:
+                    reason = session.answer(player, question_id, option_id, text_answer if isinstance(text_answer, str) else None)
+                connection.send(_dumps({
+                    "type": "answer_ack",
+                    "question_id": question_id,
+                    "accepted": reason is None,
+                    "reason": reason,
+                }))
+
+            try:
+                await self._serve(websocket, connection, writer, on_message)
+            finally:
+                session.leave(player, connection)
+        finally:
+            self.connections -= 1
+
+    async def shutdown(self) -> None:
+        """Akhiri semua sesi agar jawaban yang masih di buffer tersimpan."""
+        for session in list(self.sessions.values()):
+            await session.end()
+
+live_hub = LiveHub(settings.LIVE_MAX_CONNECTIONS)
@@ -3,15 +3,24 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 import uvicorn
+import asyncio
+from starlette.concurrency import run_in_threadpool
 
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config import settings
-from database import init_db, get_db
+from database import init_db, get_db, engine, job_engine
 from logger import logger
-from backend.routes import quiz, attempt, health
+from ratelimit import RateLimitMiddleware
+from profiler import ProfilerMiddleware
+from partitions import maintenance_loop
+from snapshots import snapshot_loop
+from sweeper import sweeper_loop
+from jobs import job_runner
+from live import live_hub
+from backend.routes import quiz, attempt, health, jobs, live
 
 # Initialize database
 logger.info("Initializing database...")
@@ -27,6 +36,11 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
+# Rate limiting per client (ditambahkan sebelum CORS sehingga berada di dalamnya
+# dan response 429 tetap mendapat header CORS)
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -36,10 +50,51 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Profiler opt-in paling luar agar seluruh waktu request ikut terukur
+if settings.PROFILE_ENABLED:
+    app.add_middleware(ProfilerMiddleware)
+
 # Include routers
 app.include_router(health.router, prefix="/api/v1")
 app.include_router(quiz.router, prefix="/api/v1")
 app.include_router(attempt.router, prefix="/api/v1")
+app.include_router(jobs.router, prefix="/api/v1")
+app.include_router(live.router, prefix="/api/v1")
+
+# Background maintenance: partisi bulan berikutnya dan retention attempt lama
+@app.on_event("startup")
+async def start_partition_maintenance():
+    if settings.BACKGROUND_TASKS and engine.dialect.name == "postgresql":
+        app.state.partition_maintenance = asyncio.create_task(maintenance_loop(job_engine))
+
+# Snapshot kolumnar jawaban untuk endpoint analitik, dijalankan sebagai background job
+@app.on_event("startup")
+async def start_answer_snapshots():
+    if settings.BACKGROUND_TASKS and settings.SNAPSHOT_INTERVAL > 0:
+        app.state.answer_snapshots = asyncio.create_task(snapshot_loop())
+
+# Tutup atau hapus attempt yang tidak pernah di-submit, dijalankan sebagai background job
+@app.on_event("startup")
+async def start_attempt_sweeper():
+    if settings.BACKGROUND_TASKS and settings.ATTEMPT_SWEEP_INTERVAL > 0:
+        app.state.attempt_sweeper = asyncio.create_task(sweeper_loop())
+
+# Heartbeat job milik worker ini dan ambil alih job yang pemiliknya sudah mati,
+# termasuk purge quiz soft-deleted yang belum punya job
+@app.on_event("startup")
+async def start_job_runner():
+    from crud import QuizCRUD
+    job_runner.start()
+    await run_in_threadpool(QuizCRUD.resume_purges)
+
+# Sesi live yang masih berjalan diakhiri dulu agar buffer jawabannya tersimpan
+@app.on_event("shutdown")
+async def stop_live_sessions():
+    await live_hub.shutdown()
+
+@app.on_event("shutdown")
+async def stop_job_runner():
+    job_runner.shutdown()
 
 # Exception handlers
 @app.exception_handler(404)
@@ -65,6 +120,7 @@ async def validation_exception_handler(request, exc):
         content={"message": "Validation error", "details": str(exc)}
     )
 
+# Satu proses untuk development; produksi memakai launcher multi-worker server.py
 if __name__ == "__main__":
     uvicorn.run(
         "main:app",
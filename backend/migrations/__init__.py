@@ -0,0 +1,139 @@
+"""Versioned schema migrations.
+
+Setiap file ``vNNN_<nama>.py`` di package ini adalah satu migration dengan
+fungsi ``upgrade(connection)``. Versi yang sudah dijalankan dicatat di tabel
+``schema_migrations``. Migration dengan ``TRANSACTIONAL = False`` dijalankan
+dalam mode autocommit (misalnya untuk CREATE INDEX CONCURRENTLY).
+"""
+import importlib
+import pkgutil
+from contextlib import contextmanager
+from datetime import datetime
+from typing import List
+from sqlalchemy import text
+from logger import logger
+
+MIGRATIONS_TABLE = "schema_migrations"
+# Kunci advisory lock PostgreSQL agar beberapa worker tidak migrate bersamaan
+ADVISORY_LOCK_ID = 4_180_229
+
+def discover() -> list:
+    migrations = []
+    for module_info in pkgutil.iter_modules(__path__):
+        if not module_info.name.startswith("v"):
+            continue
+        module = importlib.import_module(f"{__name__}.{module_info.name}")
+        version = int(module_info.name[1:].split("_", 1)[0])
+        migrations.append((version, module_info.name, module))
+    return sorted(migrations, key=lambda migration: migration[0])
+
+def _ensure_migrations_table(connection) -> None:
+    connection.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} (
+            version INTEGER PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            applied_at TIMESTAMP NOT NULL
+        )
+    """))
+
+def applied_versions(connection) -> set:
+    _ensure_migrations_table(connection)
+    return {row[0] for row in connection.execute(text(f"SELECT version FROM {MIGRATIONS_TABLE}"))}
+
+def _record(connection, version: int, name: str) -> None:
+    connection.execute(
+        text(f"INSERT INTO {MIGRATIONS_TABLE} (version, name, applied_at) VALUES (:version, :name, :applied_at)"),
+        {"version": version, "name": name, "applied_at": datetime.utcnow()}
+    )
+
+@contextmanager
+def _migration_lock(engine):
+    if engine.dialect.name != "postgresql":
+        yield
+        return
+    with engine.connect() as lock_connection:
+        lock_connection.execute(text("SELECT pg_advisory_lock(:id)"), {"id": ADVISORY_LOCK_ID})
+        lock_connection.commit()
+        try:
+            yield
+        finally:
+            lock_connection.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": ADVISORY_LOCK_ID})
+            lock_connection.commit()
+
+def upgrade(engine) -> List[str]:
+    """Jalankan semua migration yang belum diterapkan, berurutan."""
+    applied = []
+    with _migration_lock(engine):
+        with engine.begin() as connection:
+            done = applied_versions(connection)
+
+        for version, name, module in discover():
+            if version in done:
+                continue
+            logger.info(f"Menjalankan migration {name}")
+            if getattr(module, "TRANSACTIONAL", True):
+                with engine.begin() as connection:
+                    module.upgrade(connection)
+                    _record(connection, version, name)
+            else:
+                with engine.connect() as raw_connection:
+                    connection = raw_connection.execution_options(isolation_level="AUTOCOMMIT")
+                    module.upgrade(connection)
+                    _record(connection, version, name)
+            applied.append(name)
+
+    if applied:
+        logger.info(f"Migration diterapkan: {', '.join(applied)}")
+    else:
+        logger.info("Schema database sudah up to date")
+    return applied
+
+def status(engine) -> List[dict]:
+    with engine.begin() as connection:
+        done = applied_versions(connection)
+    return [
+        {"version": version, "name": name, "applied": version in done}
+        for version, name, _ in discover()
+    ]
+
+def create_index_concurrently(connection, name: str, table: str, columns: str) -> None:
+    """CREATE INDEX CONCURRENTLY di PostgreSQL, CREATE INDEX biasa di dialect lain.
+
+    Index INVALID sisa build concurrent yang gagal di-drop dulu supaya
+    ``IF NOT EXISTS`` tidak melewatkannya. Tabel partisi tidak mendukung
+    CONCURRENTLY, jadi index dibuat ``ON ONLY`` di parent lalu dibangun
+    concurrent per partisi dan di-attach; partisi baru mewarisinya otomatis.
+    """
+    if connection.dialect.name != "postgresql":
+        connection.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})"))
+        return
+
+    partitioned = connection.execute(
+        text("SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass(:table)"), {"table": table}
+    ).scalar()
+    if partitioned:
+        connection.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON ONLY {table} ({columns})"))
+        children = connection.execute(text("""
+            SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = to_regclass(:table)
+        """), {"table": table}).scalars().all()
+        for child in children:
+            child_index = f"{name}_{child[len(table) + 1:]}"
+            _create_single_index_concurrently(connection, child_index, child, columns)
+            attached = connection.execute(
+                text("SELECT 1 FROM pg_inherits WHERE inhrelid = to_regclass(:index)"), {"index": child_index}
+            ).first()
+            if not attached:
+                connection.execute(text(f"ALTER INDEX {name} ATTACH PARTITION {child_index}"))
+        return
+    _create_single_index_concurrently(connection, name, table, columns)
+
+def _create_single_index_concurrently(connection, name: str, table: str, columns: str) -> None:
+    invalid = connection.execute(text("""
+        SELECT 1 FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid
+        WHERE c.relname = :name AND NOT i.indisvalid
+    """), {"name": name}).first()
+    if invalid:
+        logger.warning(f"Index {name} INVALID, dibuat ulang")
+        connection.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+    connection.execute(text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({columns})"))
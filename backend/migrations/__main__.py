@@ -0,0 +1,33 @@
+import argparse
+import sys
+
+from database import engine
+import migrations
+from migrations.plan_check import check_plans, seed_fixture
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m migrations", description="Kelola schema database")
+    parser.add_argument("command", choices=["upgrade", "status", "check-plans"])
+    parser.add_argument(
+        "--seed", action="store_true",
+        help="check-plans: isi fixture sintetis dulu jika tabel terlalu kecil (khusus database CI/scratch)"
+    )
+    args = parser.parse_args()
+
+    if args.command == "upgrade":
+        migrations.upgrade(engine)
+    elif args.command == "status":
+        for migration in migrations.status(engine):
+            state = "applied" if migration["applied"] else "pending"
+            print(f"{migration['version']:03d}  {state:8}  {migration['name']}")
+    elif args.command == "check-plans":
+        if args.seed:
+            seed_fixture(engine)
+        failures = check_plans(engine)
+        for failure in failures:
+            print(f"FAIL  {failure}")
+        return 1 if failures else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,217 @@
+"""Cek query plan untuk query CRUD yang hot path.
+
+Plan baru bermakna jika tabelnya berisi data dengan kardinalitas realistis dan
+statistik planner-nya baru: di tabel kosong planner bebas memilih apa saja, dan
+memaksa ``enable_seqscan = off`` hanya membuktikan index-nya ada, bukan bahwa
+index itu dipilih. Karena itu cek ini:
+- gagal jika tabel yang dicek berisi kurang dari ``MIN_ROWS`` baris, kecuali
+  database diisi dulu dengan fixture sintetis (``check-plans --seed``, untuk
+  database CI/scratch, memakai ``generate_data.py``);
+- menjalankan ANALYZE lalu EXPLAIN dengan setelan planner normal;
+- memakai nilai parameter yang diambil dari data (quiz, attempt, peserta yang ada).
+"""
+import json
+from argparse import Namespace
+from typing import Dict, List, Optional
+from sqlalchemy import func, select, text
+from logger import logger
+
+from models import Quiz, Question, AnswerOption, QuizAttempt, UserAnswer
+
+# Batas bawah baris per tabel agar plan mencerminkan produksi
+MIN_ROWS = {
+    "questions": 1_000,
+    "answer_options": 4_000,
+    "quiz_attempts": 50_000,
+    "user_answers": 200_000,
+}
+
+# Fixture --seed: 200 quiz x 10 pertanyaan x 4 option, 500 attempt per quiz
+SEED_FIXTURE = dict(
+    quizzes=200, questions=10, options=4, attempts=500, completion_rate=0.85,
+    participants=30_000, days=90, seed=29, batch_size=200_000
+)
+
+def _samples(connection) -> Dict[str, object]:
+    """Nilai parameter dari data yang ada: attempt selesai terbaru beserta quiz dan pesertanya."""
+    attempt = connection.execute(
+        select(QuizAttempt.id, QuizAttempt.quiz_id, QuizAttempt.participant_email)
+        .where(QuizAttempt.is_completed == True)
+        .order_by(QuizAttempt.id.desc()).limit(1)
+    ).first()
+    if attempt is None:
+        return {}
+    question_ids = connection.execute(
+        select(Question.id).where(Question.quiz_id == attempt.quiz_id).limit(3)
+    ).scalars().all()
+    # Kondisi tunak sweeper: hanya attempt terbuka yang paling tua melewati cutoff
+    oldest_open = connection.execute(
+        select(func.min(QuizAttempt.started_at)).where(QuizAttempt.is_completed == False)
+    ).scalar()
+    return {
+        "quiz_id": attempt.quiz_id,
+        "attempt_id": attempt.id,
+        "participant_email": attempt.participant_email or "student@example.com",
+        "category": connection.execute(select(Quiz.category).where(Quiz.id == attempt.quiz_id)).scalar(),
+        "question_ids": question_ids or [1],
+        "sweep_cutoff": oldest_open or "2000-01-01",
+    }
+
+def hot_queries(samples: dict) -> list:
+    """(nama, statement, tabel yang tidak boleh di-seq-scan atau None jika hanya dilaporkan)."""
+    quiz_id, attempt_id = samples["quiz_id"], samples["attempt_id"]
+    return [
+        (
+            # Filter kategori memilih sebagian besar tabel quiz yang kecil: seq scan wajar
+            "QuizCRUD.get_quizzes",
+            select(Quiz).where(Quiz.is_active == True, Quiz.category == samples["category"]),
+            None
+        ),
+        (
+            "QuizCRUD.get_quiz_with_questions (questions)",
+            select(Question).where(Question.quiz_id == quiz_id),
+            "questions"
+        ),
+        (
+            "QuizAttemptCRUD.create_attempt (jumlah pertanyaan)",
+            select(func.count(Question.id)).select_from(Quiz).outerjoin(
+                Question, Question.quiz_id == Quiz.id
+            ).where(Quiz.id == quiz_id, Quiz.deleted_at.is_(None)).group_by(Quiz.id),
+            "questions"
+        ),
+        (
+            "QuizCRUD.get_quiz_with_questions (options)",
+            select(AnswerOption).where(AnswerOption.question_id.in_(samples["question_ids"])),
+            "answer_options"
+        ),
+        (
+            "QuizAttemptCRUD.get_quiz_stats",
+            select(QuizAttempt).where(QuizAttempt.quiz_id == quiz_id, QuizAttempt.is_completed == True),
+            "quiz_attempts"
+        ),
+        (
+            "QuizAttemptCRUD.get_leaderboard",
+            select(QuizAttempt.id, QuizAttempt.score, QuizAttempt.time_taken).where(
+                QuizAttempt.quiz_id == quiz_id, QuizAttempt.is_completed == True
+            ).order_by(QuizAttempt.score.desc(), QuizAttempt.time_taken.asc()).limit(10),
+            "quiz_attempts"
+        ),
+        (
+            "QuizAttemptCRUD.get_participant_history",
+            select(QuizAttempt.id, QuizAttempt.started_at).where(
+                QuizAttempt.participant_email == samples["participant_email"]
+            ).order_by(QuizAttempt.started_at.desc(), QuizAttempt.id.desc()).limit(20),
+            "quiz_attempts"
+        ),
+        (
+            "sweeper.sweep (attempt terbuka)",
+            select(QuizAttempt.id, QuizAttempt.started_at).where(
+                QuizAttempt.is_completed == False, QuizAttempt.started_at < samples["sweep_cutoff"]
+            ).order_by(QuizAttempt.started_at).limit(500),
+            "quiz_attempts"
+        ),
+        (
+            "QuizAttemptCRUD.get_quiz_results (answers)",
+            select(UserAnswer).where(UserAnswer.attempt_id == attempt_id),
+            "user_answers"
+        ),
+        (
+            "user answer by attempt and question",
+            select(UserAnswer).where(UserAnswer.attempt_id == attempt_id, UserAnswer.question_id == samples["question_ids"][0]),
+            "user_answers"
+        ),
+    ]
+
+def _row_counts(connection) -> Dict[str, int]:
+    """Jumlah baris per tabel, dibatasi MIN_ROWS agar murah di tabel besar."""
+    counts = {}
+    for table, minimum in MIN_ROWS.items():
+        counts[table] = connection.execute(
+            text(f"SELECT count(*) FROM (SELECT 1 FROM {table} LIMIT {minimum}) AS sample")
+        ).scalar()
+    return counts
+
+def seed_fixture(engine) -> Optional[dict]:
+    """Isi database dengan fixture sintetis jika tabelnya belum cukup besar.
+
+    Hanya untuk database CI/scratch: data sintetis ditulis ke database yang dipakai.
+    """
+    from generate_data import SyntheticDataGenerator
+    with engine.connect() as connection:
+        counts = _row_counts(connection)
+        connection.commit()
+        if all(counts[table] >= minimum for table, minimum in MIN_ROWS.items()):
+            return None
+        logger.info("Mengisi fixture sintetis untuk plan check")
+        return SyntheticDataGenerator(connection, Namespace(**SEED_FIXTURE)).run()
+
+def _analyze(engine) -> None:
+    with engine.connect() as connection:
+        connection = connection.execution_options(isolation_level="AUTOCOMMIT")
+        if connection.dialect.name == "postgresql":
+            for table in ("quizzes", *MIN_ROWS):
+                connection.execute(text(f"ANALYZE {table}"))
+        else:
+            connection.execute(text("ANALYZE"))
+
+def _postgres_seq_scans(plan: dict) -> List[str]:
+    relations = []
+    if plan.get("Node Type") in ("Seq Scan", "Parallel Seq Scan"):
+        relations.append(plan.get("Relation Name"))
+    for child in plan.get("Plans", []):
+        relations.extend(_postgres_seq_scans(child))
+    return relations
+
+def _postgres_parent(connection, relation: str) -> str:
+    """Tabel induk untuk partisi (quiz_attempts_y2026m10 -> quiz_attempts);
+    EXPLAIN melaporkan scan per partisi, bukan atas nama tabel induknya."""
+    return connection.execute(text(
+        "SELECT coalesce(pg_partition_root(CAST(:relation AS regclass)), CAST(:relation AS regclass))::text"
+    ), {"relation": relation}).scalar()
+
+def _explain(connection, sql: str) -> List[str]:
+    """Nama tabel yang di-scan penuh oleh query (partisi dipetakan ke tabel induknya)."""
+    if connection.dialect.name == "postgresql":
+        raw = connection.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+        plan = raw if isinstance(raw, list) else json.loads(raw)
+        return sorted({_postgres_parent(connection, relation) for relation in _postgres_seq_scans(plan[0]["Plan"])})
+
+    scans = []
+    for row in connection.execute(text(f"EXPLAIN QUERY PLAN {sql}")):
+        detail = row[-1]
+        # "SCAN tabel" tanpa index = full table scan di SQLite
+        if detail.startswith("SCAN ") and "USING" not in detail:
+            scans.append(detail.split()[1])
+    return scans
+
+def check_plans(engine) -> List[str]:
+    """Jalankan EXPLAIN untuk tiap hot query, kembalikan daftar pelanggaran."""
+    with engine.connect() as connection:
+        counts = _row_counts(connection)
+    failures = [
+        f"{table}: hanya {counts[table]} baris (minimal {minimum}); isi dengan generate_data.py "
+        f"atau jalankan check-plans --seed di database CI"
+        for table, minimum in MIN_ROWS.items()
+        if counts[table] < minimum
+    ]
+    if failures:
+        for failure in failures:
+            logger.error(f"Plan check tidak representatif - {failure}")
+        return failures
+
+    _analyze(engine)
+    with engine.connect() as connection:
+        samples = _samples(connection)
+    for name, statement, table in hot_queries(samples):
+        sql = str(statement.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+        with engine.connect() as connection:
+            with connection.begin():
+                scans = _explain(connection, sql)
+        if table is not None and table in scans:
+            failures.append(f"{name}: sequential scan pada {table}")
+            logger.error(f"Plan check gagal - {name}: sequential scan pada {table}")
+        elif scans:
+            logger.info(f"Plan check OK - {name} (seq scan pada {', '.join(scans)} diterima)")
+        else:
+            logger.info(f"Plan check OK - {name}")
+    return failures
@@ -0,0 +1,220 @@
+"""Schema awal: tabel, CHECK, ON DELETE CASCADE, index dasar, dan trigger updated_at.
+
+Semua statement idempotent sehingga database lama yang dibuat lewat
+``database/init.sql`` atau ``Base.metadata.create_all`` ikut diselaraskan.
+"""
+from sqlalchemy import text
+
+POSTGRES_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS quizzes (
+        id SERIAL PRIMARY KEY,
+        title VARCHAR(255) NOT NULL,
+        description TEXT,
+        category VARCHAR(100),
+        difficulty_level VARCHAR(20) DEFAULT 'medium' CHECK (difficulty_level IN ('easy', 'medium', 'hard')),
+        time_limit INTEGER DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        is_active BOOLEAN DEFAULT true
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS questions (
+        id SERIAL PRIMARY KEY,
+        quiz_id INTEGER NOT NULL REFERENCES quizzes(id) ON DELETE CASCADE,
+        question_text TEXT NOT NULL,
+        question_type VARCHAR(20) DEFAULT 'multiple_choice' CHECK (question_type IN ('multiple_choice', 'true_false', 'text')),
+        points INTEGER DEFAULT 1,
+        explanation TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS answer_options (
+        id SERIAL PRIMARY KEY,
+        question_id INTEGER NOT NULL REFERENCES questions(id) ON DELETE CASCADE,
+        option_text TEXT NOT NULL,
+        is_correct BOOLEAN DEFAULT false,
+        option_order INTEGER DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS quiz_attempts (
+        id SERIAL PRIMARY KEY,
+        quiz_id INTEGER NOT NULL REFERENCES quizzes(id) ON DELETE CASCADE,
+        participant_name VARCHAR(255),
+        participant_email VARCHAR(255),
+        score INTEGER DEFAULT 0,
+        total_questions INTEGER DEFAULT 0,
+        time_taken INTEGER DEFAULT 0,
+        started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        completed_at TIMESTAMP,
+        is_completed BOOLEAN DEFAULT false
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS user_answers (
+        id SERIAL PRIMARY KEY,
+        attempt_id INTEGER NOT NULL REFERENCES quiz_attempts(id) ON DELETE CASCADE,
+        question_id INTEGER NOT NULL REFERENCES questions(id) ON DELETE CASCADE,
+        selected_option_id INTEGER REFERENCES answer_options(id),
+        text_answer TEXT,
+        is_correct BOOLEAN DEFAULT false,
+        answered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+]
+
+SQLITE_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS quizzes (
+        id INTEGER PRIMARY KEY,
+        title VARCHAR(255) NOT NULL,
+        description TEXT,
+        category VARCHAR(100),
+        difficulty_level VARCHAR(20) DEFAULT 'medium' CHECK (difficulty_level IN ('easy', 'medium', 'hard')),
+        time_limit INTEGER DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        is_active BOOLEAN DEFAULT 1
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS questions (
+        id INTEGER PRIMARY KEY,
+        quiz_id INTEGER NOT NULL REFERENCES quizzes(id) ON DELETE CASCADE,
+        question_text TEXT NOT NULL,
+        question_type VARCHAR(20) DEFAULT 'multiple_choice' CHECK (question_type IN ('multiple_choice', 'true_false', 'text')),
+        points INTEGER DEFAULT 1,
+        explanation TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS answer_options (
+        id INTEGER PRIMARY KEY,
+        question_id INTEGER NOT NULL REFERENCES questions(id) ON DELETE CASCADE,
+        option_text TEXT NOT NULL,
+        is_correct BOOLEAN DEFAULT 0,
+        option_order INTEGER DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS quiz_attempts (
+        id INTEGER PRIMARY KEY,
+        quiz_id INTEGER NOT NULL REFERENCES quizzes(id) ON DELETE CASCADE,
+        participant_name VARCHAR(255),
+        participant_email VARCHAR(255),
+        score INTEGER DEFAULT 0,
+        total_questions INTEGER DEFAULT 0,
+        time_taken INTEGER DEFAULT 0,
+        started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        completed_at TIMESTAMP,
+        is_completed BOOLEAN DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS user_answers (
+        id INTEGER PRIMARY KEY,
+        attempt_id INTEGER NOT NULL REFERENCES quiz_attempts(id) ON DELETE CASCADE,
+        question_id INTEGER NOT NULL REFERENCES questions(id) ON DELETE CASCADE,
+        selected_option_id INTEGER REFERENCES answer_options(id),
+        text_answer TEXT,
+        is_correct BOOLEAN DEFAULT 0,
+        answered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+]
+
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_questions_quiz_id ON questions(quiz_id)",
+    "CREATE INDEX IF NOT EXISTS idx_answer_options_question_id ON answer_options(question_id)",
+    "CREATE INDEX IF NOT EXISTS idx_quiz_attempts_quiz_id ON quiz_attempts(quiz_id)",
+    "CREATE INDEX IF NOT EXISTS idx_quiz_attempts_leaderboard ON quiz_attempts(quiz_id, is_completed, score DESC, time_taken)",
+    "CREATE INDEX IF NOT EXISTS idx_user_answers_attempt_id ON user_answers(attempt_id)",
+    "CREATE INDEX IF NOT EXISTS idx_user_answers_question_id ON user_answers(question_id)",
+]
+
+POSTGRES_TRIGGER = [
+    """
+    CREATE OR REPLACE FUNCTION update_updated_at_column()
+    RETURNS TRIGGER AS $$
+    BEGIN
+        NEW.updated_at = CURRENT_TIMESTAMP;
+        RETURN NEW;
+    END;
+    $$ language 'plpgsql'
+    """,
+    "DROP TRIGGER IF EXISTS update_quizzes_updated_at ON quizzes",
+    """
+    CREATE TRIGGER update_quizzes_updated_at BEFORE UPDATE ON quizzes
+        FOR EACH ROW EXECUTE FUNCTION update_updated_at_column()
+    """,
+]
+
+SQLITE_TRIGGER = [
+    """
+    CREATE TRIGGER IF NOT EXISTS update_quizzes_updated_at AFTER UPDATE ON quizzes
+    FOR EACH ROW WHEN NEW.updated_at = OLD.updated_at
+    BEGIN
+        UPDATE quizzes SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
+    END
+    """,
+]
+
+# (tabel, kolom, tabel referensi) yang harus ON DELETE CASCADE
+CASCADE_FOREIGN_KEYS = [
+    ("questions", "quiz_id", "quizzes"),
+    ("answer_options", "question_id", "questions"),
+    ("quiz_attempts", "quiz_id", "quizzes"),
+    ("user_answers", "attempt_id", "quiz_attempts"),
+    ("user_answers", "question_id", "questions"),
+]
+
+# (tabel, nama constraint, ekspresi CHECK)
+CHECK_CONSTRAINTS = [
+    ("quizzes", "quizzes_difficulty_level_check", "difficulty_level IN ('easy', 'medium', 'hard')"),
+    ("questions", "questions_question_type_check", "question_type IN ('multiple_choice', 'true_false', 'text')"),
+]
+
+def _reconcile_postgres(connection) -> None:
+    """Tambahkan CASCADE dan CHECK pada tabel lama hasil create_all."""
+    for table, column, referenced in CASCADE_FOREIGN_KEYS:
+        constraint = connection.execute(text("""
+            SELECT c.conname, c.confdeltype
+            FROM pg_constraint c
+            JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = ANY (c.conkey)
+            WHERE c.contype = 'f' AND c.conrelid = CAST(:table AS regclass) AND a.attname = :column
+        """), {"table": table, "column": column}).first()
+        if constraint and constraint.confdeltype == "c":
+            continue
+        name = constraint.conname if constraint else f"{table}_{column}_fkey"
+        if constraint:
+            connection.execute(text(f"ALTER TABLE {table} DROP CONSTRAINT {name}"))
+        # NOT VALID + VALIDATE agar tabel besar tidak terkunci selama validasi
+        connection.execute(text(
+            f"ALTER TABLE {table} ADD CONSTRAINT {name} FOREIGN KEY ({column}) "
+            f"REFERENCES {referenced}(id) ON DELETE CASCADE NOT VALID"
+        ))
+        connection.execute(text(f"ALTER TABLE {table} VALIDATE CONSTRAINT {name}"))
+
+    for table, name, expression in CHECK_CONSTRAINTS:
+        exists = connection.execute(text("""
+            SELECT 1 FROM pg_constraint
+            WHERE contype = 'c' AND conrelid = CAST(:table AS regclass) AND conname = :name
+        """), {"table": table, "name": name}).first()
+        if not exists:
+            connection.execute(text(f"ALTER TABLE {table} ADD CONSTRAINT {name} CHECK ({expression}) NOT VALID"))
+            connection.execute(text(f"ALTER TABLE {table} VALIDATE CONSTRAINT {name}"))
+
+def upgrade(connection) -> None:
+    is_postgres = connection.dialect.name == "postgresql"
+    for statement in POSTGRES_TABLES if is_postgres else SQLITE_TABLES:
+        connection.execute(text(statement))
+    if is_postgres:
+        _reconcile_postgres(connection)
+    for statement in INDEXES:
+        connection.execute(text(statement))
+    for statement in POSTGRES_TRIGGER if is_postgres else SQLITE_TRIGGER:
+        connection.execute(text(statement))
@@ -0,0 +1,45 @@
+"""Tabel full-text search quiz (tsvector + GIN di PostgreSQL, FTS5 di SQLite)."""
+from sqlalchemy import text
+
+from crud.search import SearchCRUD
+
+# PostgreSQL: dokumen tsvector di-generate dari kolom teks, diindeks dengan GIN
+POSTGRES_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS quiz_search (
+        quiz_id INTEGER PRIMARY KEY REFERENCES quizzes(id) ON DELETE CASCADE,
+        title TEXT NOT NULL DEFAULT '',
+        description TEXT NOT NULL DEFAULT '',
+        category TEXT NOT NULL DEFAULT '',
+        questions TEXT NOT NULL DEFAULT '',
+        document TSVECTOR GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', title), 'A') ||
+            setweight(to_tsvector('simple', category), 'B') ||
+            setweight(to_tsvector('simple', description), 'C') ||
+            setweight(to_tsvector('simple', questions), 'D')
+        ) STORED
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_quiz_search_document ON quiz_search USING GIN (document)",
+]
+
+# SQLite (embedded mode): tabel virtual FTS5, rowid = quiz_id
+SQLITE_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS quiz_search USING fts5(
+        title, description, category, questions
+    )
+    """,
+]
+
+def upgrade(connection) -> None:
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        statements = POSTGRES_DDL
+    elif dialect == "sqlite":
+        statements = SQLITE_DDL
+    else:
+        return
+    for statement in statements:
+        connection.execute(text(statement))
+    SearchCRUD.backfill(connection)
@@ -0,0 +1,19 @@
+"""Index untuk query CRUD yang paling sering dipanggil.
+
+Dibuat dengan CREATE INDEX CONCURRENTLY di PostgreSQL agar tidak mengunci
+tabel yang sedang dipakai, sehingga migration ini berjalan di luar transaksi.
+"""
+from migrations import create_index_concurrently
+
+TRANSACTIONAL = False
+
+INDEXES = [
+    ("idx_quizzes_active_category", "quizzes", "is_active, category"),
+    ("idx_quiz_attempts_quiz_completed", "quiz_attempts", "quiz_id, is_completed"),
+    ("idx_quiz_attempts_participant_email", "quiz_attempts", "participant_email"),
+    ("idx_user_answers_attempt_question", "user_answers", "attempt_id, question_id"),
+]
+
+def upgrade(connection) -> None:
+    for name, table, columns in INDEXES:
+        create_index_concurrently(connection, name, table, columns)
@@ -0,0 +1,135 @@
+"""Ubah quiz_attempts dan user_answers menjadi tabel partisi bulanan (PostgreSQL).
+
+quiz_attempts dipartisi RANGE (started_at), user_answers RANGE (answered_at).
+Data lama disalin ke tabel partisi baru dalam satu transaksi; untuk tabel yang
+sangat besar jalankan migration ini di jendela maintenance.
+
+Foreign key user_answers.attempt_id tidak bisa lagi menunjuk ke quiz_attempts
+(unique key tabel partisi harus memuat partition key), jadi ON DELETE CASCADE
+dari attempt ke jawaban diganti trigger statement-level.
+"""
+from sqlalchemy import text
+
+import partitions
+
+ATTEMPT_COLUMNS = (
+    "id, quiz_id, participant_name, participant_email, score, total_questions, "
+    "time_taken, started_at, completed_at, is_completed"
+)
+ANSWER_COLUMNS = "id, attempt_id, question_id, selected_option_id, text_answer, is_correct, answered_at"
+
+LEGACY_INDEXES = [
+    "idx_quiz_attempts_quiz_id",
+    "idx_quiz_attempts_quiz_completed",
+    "idx_quiz_attempts_leaderboard",
+    "idx_quiz_attempts_participant_email",
+    "idx_user_answers_attempt_id",
+    "idx_user_answers_question_id",
+    "idx_user_answers_attempt_question",
+]
+
+CREATE_TABLES = [
+    """
+    CREATE TABLE quiz_attempts (
+        id INTEGER NOT NULL DEFAULT nextval('quiz_attempts_id_seq'),
+        quiz_id INTEGER NOT NULL REFERENCES quizzes(id) ON DELETE CASCADE,
+        participant_name VARCHAR(255),
+        participant_email VARCHAR(255),
+        score INTEGER DEFAULT 0,
+        total_questions INTEGER DEFAULT 0,
+        time_taken INTEGER DEFAULT 0,
+        started_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        completed_at TIMESTAMP,
+        is_completed BOOLEAN DEFAULT false,
+        PRIMARY KEY (id, started_at)
+    ) PARTITION BY RANGE (started_at)
+    """,
+    "CREATE TABLE quiz_attempts_default PARTITION OF quiz_attempts DEFAULT",
+    """
+    CREATE TABLE user_answers (
+        id INTEGER NOT NULL DEFAULT nextval('user_answers_id_seq'),
+        attempt_id INTEGER NOT NULL,
+        question_id INTEGER NOT NULL REFERENCES questions(id) ON DELETE CASCADE,
+        selected_option_id INTEGER REFERENCES answer_options(id),
+        text_answer TEXT,
+        is_correct BOOLEAN DEFAULT false,
+        answered_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (id, answered_at)
+    ) PARTITION BY RANGE (answered_at)
+    """,
+    "CREATE TABLE user_answers_default PARTITION OF user_answers DEFAULT",
+]
+
+INDEXES = [
+    "CREATE INDEX idx_quiz_attempts_quiz_id ON quiz_attempts(quiz_id)",
+    "CREATE INDEX idx_quiz_attempts_quiz_completed ON quiz_attempts(quiz_id, is_completed)",
+    "CREATE INDEX idx_quiz_attempts_leaderboard ON quiz_attempts(quiz_id, is_completed, score DESC, time_taken)",
+    "CREATE INDEX idx_quiz_attempts_participant_email ON quiz_attempts(participant_email)",
+    "CREATE INDEX idx_user_answers_attempt_id ON user_answers(attempt_id)",
+    "CREATE INDEX idx_user_answers_question_id ON user_answers(question_id)",
+    "CREATE INDEX idx_user_answers_attempt_question ON user_answers(attempt_id, question_id)",
+]
+
+CASCADE_TRIGGER = [
+    """
+    CREATE OR REPLACE FUNCTION delete_user_answers_of_attempts()
+    RETURNS TRIGGER AS $$
+    BEGIN
+        DELETE FROM user_answers ua
+        USING deleted_attempts d
+        WHERE ua.attempt_id = d.id;
+        RETURN NULL;
+    END;
+    $$ language 'plpgsql'
+    """,
+    """
+    CREATE TRIGGER quiz_attempts_delete_answers AFTER DELETE ON quiz_attempts
+        REFERENCING OLD TABLE AS deleted_attempts
+        FOR EACH STATEMENT EXECUTE FUNCTION delete_user_answers_of_attempts()
+    """,
+]
+
+def upgrade(connection) -> None:
+    if not partitions.is_supported(connection):
+        return
+
+    connection.execute(text("ALTER TABLE user_answers RENAME TO user_answers_legacy"))
+    connection.execute(text("ALTER TABLE quiz_attempts RENAME TO quiz_attempts_legacy"))
+    for index in LEGACY_INDEXES:
+        connection.execute(text(f"DROP INDEX IF EXISTS {index}"))
+    # Sequence dipakai ulang oleh tabel baru, jangan ikut ter-drop bersama tabel lama
+    connection.execute(text("ALTER SEQUENCE quiz_attempts_id_seq OWNED BY NONE"))
+    connection.execute(text("ALTER SEQUENCE user_answers_id_seq OWNED BY NONE"))
+
+    for statement in CREATE_TABLES:
+        connection.execute(text(statement))
+    connection.execute(text("ALTER SEQUENCE quiz_attempts_id_seq OWNED BY quiz_attempts.id"))
+    connection.execute(text("ALTER SEQUENCE user_answers_id_seq OWNED BY user_answers.id"))
+
+    oldest = connection.execute(text("""
+        SELECT least(
+            (SELECT min(started_at) FROM quiz_attempts_legacy),
+            (SELECT min(answered_at) FROM user_answers_legacy)
+        )
+    """)).scalar()
+    partitions.ensure_partitions(connection, since=oldest)
+
+    connection.execute(text(f"""
+        INSERT INTO quiz_attempts ({ATTEMPT_COLUMNS})
+        SELECT id, quiz_id, participant_name, participant_email, score, total_questions,
+               time_taken, coalesce(started_at, CURRENT_TIMESTAMP), completed_at, is_completed
+        FROM quiz_attempts_legacy
+    """))
+    connection.execute(text(f"""
+        INSERT INTO user_answers ({ANSWER_COLUMNS})
+        SELECT id, attempt_id, question_id, selected_option_id, text_answer, is_correct,
+               coalesce(answered_at, CURRENT_TIMESTAMP)
+        FROM user_answers_legacy
+    """))
+    connection.execute(text("DROP TABLE user_answers_legacy"))
+    connection.execute(text("DROP TABLE quiz_attempts_legacy"))
+
+    for statement in INDEXES + CASCADE_TRIGGER:
+        connection.execute(text(statement))
+    connection.execute(text("ANALYZE quiz_attempts"))
+    connection.execute(text("ANALYZE user_answers"))
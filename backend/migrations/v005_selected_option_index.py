@@ -0,0 +1,14 @@
+"""Index user_answers(selected_option_id).
+
+Dipakai saat update option berbasis diff untuk mengecek apakah option yang
+akan dihapus sudah pernah dipilih, dan oleh pengecekan foreign key saat
+answer_options dihapus.
+"""
+from migrations import create_index_concurrently
+
+TRANSACTIONAL = False
+
+def upgrade(connection) -> None:
+    create_index_concurrently(
+        connection, "idx_user_answers_selected_option_id", "user_answers", "selected_option_id"
+    )
@@ -0,0 +1,5 @@
+"""Kolom quizzes.deleted_at untuk soft delete + purge bertahap quiz besar."""
+from sqlalchemy import text
+
+def upgrade(connection) -> None:
+    connection.execute(text("ALTER TABLE quizzes ADD COLUMN deleted_at TIMESTAMP"))
@@ -0,0 +1,51 @@
+"""Tabel jobs untuk background job runner (status, progress, hasil, idempotency key)."""
+from sqlalchemy import text
+
+POSTGRES_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id SERIAL PRIMARY KEY,
+        job_type VARCHAR(50) NOT NULL,
+        job_key VARCHAR(255) UNIQUE,
+        status VARCHAR(20) NOT NULL DEFAULT 'pending'
+            CONSTRAINT jobs_status_check CHECK (status IN ('pending', 'running', 'succeeded', 'failed', 'cancelled')),
+        progress DOUBLE PRECISION DEFAULT 0,
+        params JSON,
+        result JSON,
+        error TEXT,
+        cancel_requested BOOLEAN DEFAULT false,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        started_at TIMESTAMP,
+        finished_at TIMESTAMP
+    )
+    """,
+]
+
+SQLITE_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id INTEGER PRIMARY KEY,
+        job_type VARCHAR(50) NOT NULL,
+        job_key VARCHAR(255) UNIQUE,
+        status VARCHAR(20) NOT NULL DEFAULT 'pending'
+            CONSTRAINT jobs_status_check CHECK (status IN ('pending', 'running', 'succeeded', 'failed', 'cancelled')),
+        progress FLOAT DEFAULT 0,
+        params JSON,
+        result JSON,
+        error TEXT,
+        cancel_requested BOOLEAN DEFAULT 0,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        started_at DATETIME,
+        finished_at DATETIME
+    )
+    """,
+]
+
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status)",
+]
+
+def upgrade(connection) -> None:
+    statements = POSTGRES_DDL if connection.dialect.name == "postgresql" else SQLITE_DDL
+    for statement in statements + INDEXES:
+        connection.execute(text(statement))
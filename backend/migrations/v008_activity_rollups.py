@@ -0,0 +1,24 @@
+"""Tabel rollup aktivitas quiz per jam/hari, lalu backfill dari quiz_attempts."""
+from sqlalchemy import text
+
+import rollups
+
+DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS {table} (
+        quiz_id INTEGER NOT NULL REFERENCES quizzes(id) ON DELETE CASCADE,
+        bucket TIMESTAMP NOT NULL,
+        attempts_started INTEGER NOT NULL DEFAULT 0,
+        attempts_completed INTEGER NOT NULL DEFAULT 0,
+        score_sum BIGINT NOT NULL DEFAULT 0,
+        time_taken_sum BIGINT NOT NULL DEFAULT 0,
+        PRIMARY KEY (quiz_id, bucket)
+    )
+    """.format(table=table)
+    for table in ("quiz_activity_hourly", "quiz_activity_daily")
+]
+
+def upgrade(connection) -> None:
+    for statement in DDL:
+        connection.execute(text(statement))
+    rollups.rebuild(connection)
@@ -0,0 +1,24 @@
+"""Index quiz_attempts(participant_email, started_at DESC, id DESC).
+
+Dipakai riwayat attempt per peserta dengan keyset pagination: urutan index
+sama dengan ORDER BY sehingga setiap halaman cukup membaca ``limit`` baris.
+Index lama pada participant_email saja menjadi prefix dari index ini dan di-drop.
+"""
+from sqlalchemy import text
+
+from migrations import create_index_concurrently
+
+TRANSACTIONAL = False
+
+def upgrade(connection) -> None:
+    create_index_concurrently(
+        connection, "idx_quiz_attempts_participant_started", "quiz_attempts",
+        "participant_email, started_at DESC, id DESC"
+    )
+    if connection.dialect.name == "postgresql" and connection.execute(
+        text("SELECT relkind <> 'p' FROM pg_class WHERE relname = 'quiz_attempts'")
+    ).scalar():
+        connection.execute(text("DROP INDEX CONCURRENTLY IF EXISTS idx_quiz_attempts_participant_email"))
+    else:
+        # SQLite, atau index tabel partisi yang tidak bisa di-drop CONCURRENTLY
+        connection.execute(text("DROP INDEX IF EXISTS idx_quiz_attempts_participant_email"))
@@ -0,0 +1,13 @@
+"""Index quiz_attempts(is_completed, started_at).
+
+Dipakai sweeper attempt terbengkalai: setiap sweep hanya membaca range attempt
+terbuka yang started_at-nya lebih tua dari cutoff, urut dari yang tertua.
+"""
+from migrations import create_index_concurrently
+
+TRANSACTIONAL = False
+
+def upgrade(connection) -> None:
+    create_index_concurrently(
+        connection, "idx_quiz_attempts_completed_started", "quiz_attempts", "is_completed, started_at"
+    )
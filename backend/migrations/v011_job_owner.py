@@ -0,0 +1,9 @@
+"""Kolom pemilik dan heartbeat job agar worker mana pun bisa mengambil alih job
+yang prosesnya sudah mati (launcher multi-worker, rolling restart)."""
+from sqlalchemy import text
+
+def upgrade(connection) -> None:
+    timestamp = "TIMESTAMP" if connection.dialect.name == "postgresql" else "DATETIME"
+    connection.execute(text("ALTER TABLE jobs ADD COLUMN owner_host VARCHAR(255)"))
+    connection.execute(text("ALTER TABLE jobs ADD COLUMN owner_pid INTEGER"))
+    connection.execute(text(f"ALTER TABLE jobs ADD COLUMN heartbeat_at {timestamp}"))
@@ -0,0 +1,33 @@
+"""Kolom shard di primary key rollup aktivitas, agar submit bersamaan untuk satu
+quiz tersebar ke beberapa baris per bucket. Baris lama menjadi shard 0."""
+from sqlalchemy import text
+
+TABLES = ("quiz_activity_hourly", "quiz_activity_daily")
+
+DDL = """
+    CREATE TABLE {table} (
+        quiz_id INTEGER NOT NULL REFERENCES quizzes(id) ON DELETE CASCADE,
+        bucket TIMESTAMP NOT NULL,
+        shard SMALLINT NOT NULL DEFAULT 0,
+        attempts_started INTEGER NOT NULL DEFAULT 0,
+        attempts_completed INTEGER NOT NULL DEFAULT 0,
+        score_sum BIGINT NOT NULL DEFAULT 0,
+        time_taken_sum BIGINT NOT NULL DEFAULT 0,
+        PRIMARY KEY (quiz_id, bucket, shard)
+    )
+"""
+
+COLUMNS = "quiz_id, bucket, attempts_started, attempts_completed, score_sum, time_taken_sum"
+
+def upgrade(connection) -> None:
+    for table in TABLES:
+        if connection.dialect.name == "postgresql":
+            connection.execute(text(f"ALTER TABLE {table} ADD COLUMN shard SMALLINT NOT NULL DEFAULT 0"))
+            connection.execute(text(f"ALTER TABLE {table} DROP CONSTRAINT {table}_pkey"))
+            connection.execute(text(f"ALTER TABLE {table} ADD PRIMARY KEY (quiz_id, bucket, shard)"))
+        else:
+            # SQLite tidak bisa mengubah primary key: buat ulang tabelnya
+            connection.execute(text(DDL.format(table=f"{table}_new")))
+            connection.execute(text(f"INSERT INTO {table}_new ({COLUMNS}) SELECT {COLUMNS} FROM {table}"))
+            connection.execute(text(f"DROP TABLE {table}"))
+            connection.execute(text(f"ALTER TABLE {table}_new RENAME TO {table}"))
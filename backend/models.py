@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, BigInteger, SmallInteger, String, Text, Boolean, DateTime, Float, JSON, ForeignKey, Index, CheckConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from datetime import datetime
@@ -8,7 +8,7 @@ from database import Base
 class Quiz(Base):
     __tablename__ = "quizzes"
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     title = Column(String(255), nullable=False)
     description = Column(Text)
     category = Column(String(100))
@@ -17,36 +17,52 @@ class Quiz(Base):
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
     is_active = Column(Boolean, default=True)
+    deleted_at = Column(DateTime, nullable=True)  # soft delete, menunggu purge
+    
+    __table_args__ = (
+        CheckConstraint("difficulty_level IN ('easy', 'medium', 'hard')", name="quizzes_difficulty_level_check"),
+        Index("idx_quizzes_active_category", is_active, category),
+    )
     
     # Relationships
-    questions = relationship("Question", back_populates="quiz", cascade="all, delete-orphan")
-    attempts = relationship("QuizAttempt", back_populates="quiz", cascade="all, delete-orphan")
+    # passive_deletes: penghapusan child diserahkan ke ON DELETE CASCADE di database
+    questions = relationship("Question", back_populates="quiz", cascade="all, delete-orphan", passive_deletes=True)
+    attempts = relationship("QuizAttempt", back_populates="quiz", cascade="all, delete-orphan", passive_deletes=True)
 
 class Question(Base):
     __tablename__ = "questions"
     
-    id = Column(Integer, primary_key=True, index=True)
-    quiz_id = Column(Integer, ForeignKey("quizzes.id"), nullable=False)
+    id = Column(Integer, primary_key=True)
+    quiz_id = Column(Integer, ForeignKey("quizzes.id", ondelete="CASCADE"), nullable=False)
     question_text = Column(Text, nullable=False)
     question_type = Column(String(20), default="multiple_choice")
     points = Column(Integer, default=1)
     explanation = Column(Text)
     created_at = Column(DateTime, default=func.now())
     
+    __table_args__ = (
+        CheckConstraint("question_type IN ('multiple_choice', 'true_false', 'text')", name="questions_question_type_check"),
+        Index("idx_questions_quiz_id", quiz_id),
+    )
+    
     # Relationships
     quiz = relationship("Quiz", back_populates="questions")
-    options = relationship("AnswerOption", back_populates="question", cascade="all, delete-orphan")
-    user_answers = relationship("UserAnswer", back_populates="question")
+    options = relationship("AnswerOption", back_populates="question", cascade="all, delete-orphan", passive_deletes=True)
+    user_answers = relationship("UserAnswer", back_populates="question", passive_deletes=True)
 
 class AnswerOption(Base):
     __tablename__ = "answer_options"
     
-    id = Column(Integer, primary_key=True, index=True)
-    question_id = Column(Integer, ForeignKey("questions.id"), nullable=False)
+    id = Column(Integer, primary_key=True)
+    question_id = Column(Integer, ForeignKey("questions.id", ondelete="CASCADE"), nullable=False)
     option_text = Column(Text, nullable=False)
     is_correct = Column(Boolean, default=False)
     option_order = Column(Integer, default=0)
     
+    __table_args__ = (
+        Index("idx_answer_options_question_id", question_id),
+    )
+    
     # Relationships
     question = relationship("Question", back_populates="options")
     user_answers = relationship("UserAnswer", back_populates="selected_option")
@@ -54,33 +70,100 @@ class AnswerOption(Base):
 class QuizAttempt(Base):
     __tablename__ = "quiz_attempts"
     
-    id = Column(Integer, primary_key=True, index=True)
-    quiz_id = Column(Integer, ForeignKey("quizzes.id"), nullable=False)
+    id = Column(Integer, primary_key=True)
+    quiz_id = Column(Integer, ForeignKey("quizzes.id", ondelete="CASCADE"), nullable=False)
     participant_name = Column(String(255))
     participant_email = Column(String(255))
     score = Column(Integer, default=0)
     total_questions = Column(Integer, default=0)
     time_taken = Column(Integer, default=0)  # in seconds
-    started_at = Column(DateTime, default=func.now())
+    started_at = Column(DateTime, nullable=False, default=func.now())
     completed_at = Column(DateTime, nullable=True)
     is_completed = Column(Boolean, default=False)
     
+    __table_args__ = (
+        Index("idx_quiz_attempts_quiz_id", quiz_id),
+        Index("idx_quiz_attempts_quiz_completed", quiz_id, is_completed),
+        Index("idx_quiz_attempts_leaderboard", quiz_id, is_completed, score.desc(), time_taken),
+        Index("idx_quiz_attempts_participant_started", participant_email, started_at.desc(), id.desc()),
+        Index("idx_quiz_attempts_completed_started", is_completed, started_at),
+        {"postgresql_partition_by": "RANGE (started_at)"},
+    )
+    
     # Relationships
     quiz = relationship("Quiz", back_populates="attempts")
-    user_answers = relationship("UserAnswer", back_populates="attempt", cascade="all, delete-orphan")
+    user_answers = relationship("UserAnswer", back_populates="attempt", cascade="all, delete-orphan", passive_deletes=True)
 
 class UserAnswer(Base):
     __tablename__ = "user_answers"
     
-    id = Column(Integer, primary_key=True, index=True)
-    attempt_id = Column(Integer, ForeignKey("quiz_attempts.id"), nullable=False)
-    question_id = Column(Integer, ForeignKey("questions.id"), nullable=False)
+    id = Column(Integer, primary_key=True)
+    attempt_id = Column(Integer, ForeignKey("quiz_attempts.id", ondelete="CASCADE"), nullable=False)
+    question_id = Column(Integer, ForeignKey("questions.id", ondelete="CASCADE"), nullable=False)
     selected_option_id = Column(Integer, ForeignKey("answer_options.id"), nullable=True)
     text_answer = Column(Text, nullable=True)
     is_correct = Column(Boolean, default=False)
-    answered_at = Column(DateTime, default=func.now())
+    answered_at = Column(DateTime, nullable=False, default=func.now())
+    
+    __table_args__ = (
+        Index("idx_user_answers_attempt_id", attempt_id),
+        Index("idx_user_answers_question_id", question_id),
+        Index("idx_user_answers_attempt_question", attempt_id, question_id),
+        Index("idx_user_answers_selected_option_id", selected_option_id),
+        {"postgresql_partition_by": "RANGE (answered_at)"},
+    )
     
     # Relationships
     attempt = relationship("QuizAttempt", back_populates="user_answers")
     question = relationship("Question", back_populates="user_answers")
-    selected_option = relationship("AnswerOption", back_populates="user_answers")
\ No newline at end of file
+    selected_option = relationship("AnswerOption", back_populates="user_answers")
+
+class QuizActivityHourly(Base):
+    __tablename__ = "quiz_activity_hourly"
+    
+    quiz_id = Column(Integer, ForeignKey("quizzes.id", ondelete="CASCADE"), primary_key=True)
+    bucket = Column(DateTime, primary_key=True)  # awal jam (UTC)
+    shard = Column(SmallInteger, primary_key=True, server_default="0")
+    attempts_started = Column(Integer, nullable=False, default=0)
+    attempts_completed = Column(Integer, nullable=False, default=0)
+    score_sum = Column(BigInteger, nullable=False, default=0)
+    time_taken_sum = Column(BigInteger, nullable=False, default=0)
+
+class QuizActivityDaily(Base):
+    __tablename__ = "quiz_activity_daily"
+    
+    quiz_id = Column(Integer, ForeignKey("quizzes.id", ondelete="CASCADE"), primary_key=True)
+    bucket = Column(DateTime, primary_key=True)  # awal hari (UTC)
+    shard = Column(SmallInteger, primary_key=True, server_default="0")
+    attempts_started = Column(Integer, nullable=False, default=0)
+    attempts_completed = Column(Integer, nullable=False, default=0)
+    score_sum = Column(BigInteger, nullable=False, default=0)
+    time_taken_sum = Column(BigInteger, nullable=False, default=0)
+
+class Job(Base):
+    __tablename__ = "jobs"
+    
+    id = Column(Integer, primary_key=True)
+    job_type = Column(String(50), nullable=False)
+    job_key = Column(String(255), unique=True, nullable=True)  # idempotency key
+    status = Column(String(20), nullable=False, default="pending")
+    progress = Column(Float, default=0.0)  # 0-100
+    params = Column(JSON)
+    result = Column(JSON)
+    error = Column(Text)
+    cancel_requested = Column(Boolean, default=False)
+    created_at = Column(DateTime, default=func.now())
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    # Proses pemilik job pending/running dan heartbeat terakhirnya (recovery lintas worker)
+    owner_host = Column(String(255), nullable=True)
+    owner_pid = Column(Integer, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    
+    __table_args__ = (
+        CheckConstraint(
+            "status IN ('pending', 'running', 'succeeded', 'failed', 'cancelled')",
+            name="jobs_status_check"
+        ),
+        Index("idx_jobs_status", status),
+    )
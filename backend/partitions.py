@@ -0,0 +1,218 @@
+"""Partisi bulanan quiz_attempts/user_answers dan retention job (PostgreSQL).
+
+Partisi dinamai ``<tabel>_yYYYYmMM`` dan mencakup satu bulan kalender.
+Retention melepas (DETACH) partisi yang lebih tua dari batas retensi,
+mengarsipkan isinya sebagai NDJSON terkompresi gzip, lalu men-drop tabelnya;
+cache dan snapshot quiz yang attempt-nya ikut terhapus ditandai usang.
+"""
+import asyncio
+import gzip
+import os
+import re
+from datetime import date, datetime
+from typing import List, Optional, Tuple
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+from config import settings
+from logger import logger
+
+from models import UserAnswer
+
+# tabel -> kolom partition key
+PARTITIONED_TABLES = {
+    "quiz_attempts": "started_at",
+    "user_answers": "answered_at",
+}
+
+PARTITION_NAME = re.compile(r"^(?P<table>\w+)_y(?P<year>\d{4})m(?P<month>\d{2})$")
+
+def month_start(value) -> date:
+    return date(value.year, value.month, 1)
+
+def add_months(value: date, months: int) -> date:
+    index = value.year * 12 + (value.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_y{month.year:04d}m{month.month:02d}"
+
+def is_supported(connection) -> bool:
+    """True untuk PostgreSQL. Menerima Connection maupun Session."""
+    bind = connection.get_bind() if hasattr(connection, "get_bind") else connection
+    return bind.dialect.name == "postgresql"
+
+def answers_since(db, started_at) -> list:
+    """Filter tambahan agar query user_answers satu attempt hanya membaca partisi
+    sejak attempt dimulai (jawaban tidak mungkin lebih tua dari attempt-nya)."""
+    if started_at is None or not is_supported(db):
+        return []
+    return [UserAnswer.answered_at >= started_at]
+
+def create_partition(connection, table: str, month: date) -> None:
+    connection.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {partition_name(table, month)} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+    ))
+
+def ensure_partitions(connection, months_ahead: Optional[int] = None, since: Optional[date] = None) -> None:
+    """Pastikan partisi ada dari bulan ``since`` (default bulan ini) sampai N bulan ke depan."""
+    if not is_supported(connection):
+        return
+    months_ahead = settings.PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+    current = month_start(datetime.utcnow())
+    month = month_start(since) if since else current
+    last = add_months(current, months_ahead)
+    while month <= last:
+        for table in PARTITIONED_TABLES:
+            create_partition(connection, table, month)
+        month = add_months(month, 1)
+
+def list_partitions(connection, table: str) -> List[Tuple[str, date]]:
+    rows = connection.execute(text("""
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = CAST(:table AS regclass)
+    """), {"table": table}).scalars().all()
+
+    partitions = []
+    for name in rows:
+        match = PARTITION_NAME.match(name)
+        if match and match.group("table") == table:
+            partitions.append((name, date(int(match.group("year")), int(match.group("month")), 1)))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+def _detached_months(connection, table: str) -> List[date]:
+    """Bulan partisi yang sudah di-detach tapi belum di-drop (arsipnya gagal)."""
+    attached = {name for name, _ in list_partitions(connection, table)}
+    rows = connection.execute(text(
+        "SELECT relname FROM pg_class WHERE relkind = 'r' AND relname LIKE :pattern"
+    ), {"pattern": f"{table}\\_y%"}).scalars().all()
+    months = []
+    for name in rows:
+        match = PARTITION_NAME.match(name)
+        if name not in attached and match and match.group("table") == table:
+            months.append(date(int(match.group("year")), int(match.group("month")), 1))
+    return months
+
+def _archive(engine, name: str, query: str, archive_dir: str, params: Optional[dict] = None) -> str:
+    os.makedirs(archive_dir, exist_ok=True)
+    path = os.path.join(archive_dir, f"{name}.ndjson.gz")
+    rows = 0
+    with engine.connect() as connection:
+        result = connection.execution_options(stream_results=True, yield_per=10_000).execute(
+            text(f"SELECT row_to_json(t)::text FROM ({query}) t"), params or {}
+        )
+        with gzip.open(path + ".tmp", "wt", encoding="utf-8") as archive:
+            for (line,) in result:
+                archive.write(line)
+                archive.write("\n")
+                rows += 1
+    os.replace(path + ".tmp", path)
+    logger.info(f"{name} diarsipkan ke {path} ({rows} baris)")
+    return path
+
+def _invalidate(quiz_ids) -> None:
+    """Cache/snapshot quiz yang datanya ikut terhapus bersama partisi (sama seperti delete_attempt)."""
+    from leaderboard import leaderboards
+    from analysis import item_analysis
+    from stats_stream import stats_streams
+    import snapshots
+    for quiz_id in quiz_ids:
+        leaderboards.invalidate(quiz_id)
+        snapshots.invalidate(quiz_id)
+        item_analysis.invalidate(quiz_id)
+        stats_streams.invalidate(quiz_id)
+
+def _retire(engine, table: str, partition: str, archive_dir: str, late_answers_since: Optional[date] = None) -> bool:
+    """Detach, arsipkan, lalu drop satu partisi; False jika arsip gagal.
+
+    Untuk partisi quiz_attempts, jawaban attempt-nya yang tercatat di partisi
+    user_answers yang lebih baru (``answered_at >= late_answers_since``) ikut
+    diarsipkan dan dihapus agar tidak tertinggal tanpa attempt.
+    """
+    with engine.begin() as connection:
+        connection.execute(text(f"ALTER TABLE {table} DETACH PARTITION {partition}"))
+    logger.info(f"Partisi {partition} di-detach dari {table}")
+
+    late_answers = (
+        f"FROM user_answers ua WHERE ua.answered_at >= :late_since "
+        f"AND ua.attempt_id IN (SELECT id FROM {partition})"
+    )
+    params = {"late_since": late_answers_since}
+    try:
+        _archive(engine, partition, f"SELECT * FROM {partition}", os.path.join(archive_dir, table))
+        if late_answers_since:
+            _archive(
+                engine, f"{partition}_late", f"SELECT ua.* {late_answers}",
+                os.path.join(archive_dir, "user_answers"), params
+            )
+    except Exception as e:
+        # Tabel yang sudah di-detach dibiarkan agar data tidak hilang
+        logger.error(f"Gagal mengarsipkan partisi {partition}: {str(e)}")
+        return False
+    with engine.begin() as connection:
+        if table == "quiz_attempts":
+            quiz_ids = connection.execute(text(f"SELECT DISTINCT quiz_id FROM {partition}")).scalars().all()
+        else:
+            quiz_ids = connection.execute(text(
+                f"SELECT DISTINCT qa.quiz_id FROM {partition} ua JOIN quiz_attempts qa ON qa.id = ua.attempt_id"
+            )).scalars().all()
+        if late_answers_since:
+            connection.execute(text(f"DELETE {late_answers}"), params)
+        connection.execute(text(f"DROP TABLE {partition}"))
+    _invalidate(quiz_ids)
+    return True
+
+def apply_retention(engine, retention_months: Optional[int] = None, archive_dir: Optional[str] = None) -> List[str]:
+    """Detach, arsipkan, lalu drop partisi yang seluruhnya lebih tua dari batas retensi.
+
+    quiz_attempts diproses lebih dulu (beserta jawaban yang masuk setelah bulan
+    attempt-nya berakhir); partisi user_answers hanya di-drop sampai bulan
+    attempt tertua yang masih tersisa, termasuk partisi attempt yang sudah di-detach
+    tapi gagal diarsipkan.
+    """
+    retention_months = settings.ATTEMPT_RETENTION_MONTHS if retention_months is None else retention_months
+    archive_dir = archive_dir or settings.ARCHIVE_DIR
+    if retention_months <= 0 or engine.dialect.name != "postgresql":
+        return []
+
+    cutoff = add_months(month_start(datetime.utcnow()), -retention_months)
+    archived = []
+    with engine.connect() as connection:
+        expired = [(name, month) for name, month in list_partitions(connection, "quiz_attempts") if add_months(month, 1) <= cutoff]
+        answers_cutoff = min([cutoff, *_detached_months(connection, "quiz_attempts")])
+    for partition, month in expired:
+        if _retire(engine, "quiz_attempts", partition, archive_dir, late_answers_since=add_months(month, 1)):
+            archived.append(partition)
+        else:
+            answers_cutoff = min(answers_cutoff, month)
+
+    with engine.connect() as connection:
+        oldest_attempt = connection.execute(text("SELECT min(started_at) FROM quiz_attempts")).scalar()
+        if oldest_attempt is not None:
+            answers_cutoff = min(answers_cutoff, month_start(oldest_attempt))
+        expired = [name for name, month in list_partitions(connection, "user_answers") if add_months(month, 1) <= answers_cutoff]
+    for partition in expired:
+        if _retire(engine, "user_answers", partition, archive_dir):
+            archived.append(partition)
+    return archived
+
+def run_maintenance(engine) -> None:
+    try:
+        with engine.begin() as connection:
+            ensure_partitions(connection)
+        apply_retention(engine)
+    except Exception as e:
+        logger.error(f"Error partition maintenance: {str(e)}")
+
+async def maintenance_loop(engine, interval: Optional[int] = None) -> None:
+    """Jalankan run_maintenance secara berkala di threadpool (dipakai saat startup app)."""
+    interval = interval or settings.PARTITION_MAINTENANCE_INTERVAL
+    while True:
+        await run_in_threadpool(run_maintenance, engine)
+        await asyncio.sleep(interval)
+
+if __name__ == "__main__":
+    from database import engine
+    run_maintenance(engine)
@@ -0,0 +1,261 @@
+"""Profiler request opt-in untuk mencari tahu kenapa satu request lambat.
+
+Request diprofil jika membawa header ``X-Profile`` berisi ``PROFILE_TOKEN`` atau
+terpilih oleh ``PROFILE_SAMPLE_RATE``. Profiler-nya statistik: thread sampler
+mengambil stack setiap ``PROFILE_INTERVAL`` detik dari thread yang sedang
+mengerjakan request itu, yaitu event loop saat task request sedang berjalan dan
+worker threadpool yang menjalankan context request (endpoint/dependency sync).
+Waktu SQL diukur dari event cursor engine, sisanya dihitung sebagai waktu Python.
+
+Hasilnya ditulis ke ``PROFILE_DIR``: ``<id>.collapsed`` (format collapsed stack,
+langsung bisa dipakai flamegraph.pl / speedscope) dan ``<id>.json`` (ringkasan).
+Jika ``PROFILE_ENABLED`` mati, middleware dan listener SQL tidak dipasang sama
+sekali sehingga tidak ada overhead.
+"""
+import asyncio
+import contextvars
+import json
+import os
+import queue
+import random
+import re
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.concurrency import run_in_threadpool
+from config import settings
+from logger import logger
+
+try:
+    from asyncio.tasks import _current_tasks
+except ImportError:  # pragma: no cover
+    _current_tasks = None
+
+try:
+    # Frame dasar worker threadpool anyio; local ``context`` berisi context request
+    from anyio._backends._asyncio import WorkerThread
+    _WORKER_RUN_CODE = WorkerThread.run.__code__
+except (ImportError, AttributeError):  # pragma: no cover
+    _WORKER_RUN_CODE = None
+# Worker yang sedang menunggu pekerjaan atau melapor hasil ke event loop: bukan kerja request
+_WORKER_IDLE_CODES = (queue.Queue.get.__code__, asyncio.BaseEventLoop.call_soon_threadsafe.__code__)
+
+_active: contextvars.ContextVar[Optional["RequestProfile"]] = contextvars.ContextVar("active_profile", default=None)
+
+TOP_STATEMENTS = 10
+TOP_FUNCTIONS = 20
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+class RequestProfile:
+    """Sampel stack dan waktu SQL untuk satu request."""
+
+    def __init__(self, method: str, path: str, interval: float, max_seconds: float):
+        self.id = f"{time.strftime('%Y%m%d-%H%M%S')}-{secrets.token_hex(3)}"
+        self.method = method
+        self.path = path
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.status: Optional[int] = None
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.sql_time = 0.0
+        self.sql_count = 0
+        self.statements: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._loop_thread = threading.get_ident()
+        self._loop = asyncio.get_running_loop()
+        self._task = asyncio.current_task()
+        self.started = time.perf_counter()
+        self.wall_time = 0.0
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name=f"profiler-{self.id}", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self.wall_time = time.perf_counter() - self.started
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def record_sql(self, statement: str, elapsed: float) -> None:
+        key = re.sub(r"\s+", " ", statement).strip()[:200]
+        with self._lock:
+            self.sql_time += elapsed
+            self.sql_count += 1
+            entry = self.statements.setdefault(key, [0, 0.0])
+            entry[0] += 1
+            entry[1] += elapsed
+
+    def _run(self) -> None:
+        deadline = self.started + self.max_seconds
+        while not self._stop.wait(self.interval):
+            if time.perf_counter() > deadline:
+                logger.warning(f"Profil {self.id} dihentikan setelah {self.max_seconds} detik")
+                return
+            self._sample()
+
+    def _sample(self) -> None:
+        running_task = _current_tasks.get(self._loop) if _current_tasks is not None else None
+        sampler = threading.get_ident()
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == sampler:
+                continue
+            if thread_id == self._loop_thread:
+                # Event loop hanya dihitung saat task request ini yang sedang berjalan
+                if running_task is None or running_task is not self._task:
+                    continue
+                stack = self._stack(frame, None, "event-loop")
+            else:
+                root = self._worker_root(frame)
+                if root is None:
+                    continue
+                stack = self._stack(frame, root, "threadpool")
+            self.stacks[stack] += 1
+            self.samples += 1
+
+    def _worker_root(self, frame):
+        """Frame dasar worker anyio jika thread ini sedang menjalankan context request ini."""
+        if _WORKER_RUN_CODE is None:
+            return None
+        child = None
+        while frame is not None:
+            if frame.f_code is _WORKER_RUN_CODE:
+                # Worker idle masih menyimpan context pekerjaan terakhirnya
+                if child is None or child.f_code in _WORKER_IDLE_CODES:
+                    return None
+                context = frame.f_locals.get("context")
+                if isinstance(context, contextvars.Context) and context.get(_active) is self:
+                    return frame
+                return None
+            child, frame = frame, frame.f_back
+        return None
+
+    @staticmethod
+    def _stack(frame, root, label: str) -> str:
+        frames = []
+        while frame is not None and frame is not root:
+            frames.append(_frame_label(frame))
+            frame = frame.f_back
+        frames.append(label)
+        return ";".join(reversed(frames))
+
+    def summary(self) -> dict:
+        leaf_counts: Counter = Counter()
+        for stack, count in self.stacks.items():
+            leaf_counts[stack.rsplit(";", 1)[-1]] += count
+        statements = sorted(self.statements.items(), key=lambda item: item[1][1], reverse=True)
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "wall_ms": round(self.wall_time * 1000, 2),
+            "sql_ms": round(self.sql_time * 1000, 2),
+            "python_ms": round(max(self.wall_time - self.sql_time, 0.0) * 1000, 2),
+            "sql_queries": self.sql_count,
+            "samples": self.samples,
+            "interval_ms": self.interval * 1000,
+            "top_statements": [
+                {"statement": statement, "count": count, "total_ms": round(total * 1000, 2)}
+                for statement, (count, total) in statements[:TOP_STATEMENTS]
+            ],
+            "top_functions": [
+                {"function": function, "samples": count}
+                for function, count in leaf_counts.most_common(TOP_FUNCTIONS)
+            ]
+        }
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _active.get() is not None:
+        conn.info["profile_started"] = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _active.get()
+    started = conn.info.pop("profile_started", None)
+    if profile is not None and started is not None:
+        profile.record_sql(statement, time.perf_counter() - started)
+
+def install_sql_timing() -> None:
+    """Pasang listener waktu SQL di semua engine (request dan job); idempotent."""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+class ProfilerMiddleware:
+    """ASGI middleware yang memprofil request terpilih dan menyimpan hasilnya ke disk."""
+
+    def __init__(self, app, directory: Optional[str] = None, token: Optional[str] = None, sample_rate: Optional[float] = None):
+        self.app = app
+        self.directory = directory or settings.PROFILE_DIR
+        self.token = (settings.PROFILE_TOKEN if token is None else token).encode("latin-1")
+        self.sample_rate = settings.PROFILE_SAMPLE_RATE if sample_rate is None else sample_rate
+        os.makedirs(self.directory, exist_ok=True)
+        install_sql_timing()
+
+    def _should_profile(self, scope) -> bool:
+        if self.token:
+            for name, value in scope.get("headers") or []:
+                if name == b"x-profile":
+                    return secrets.compare_digest(value, self.token)
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(scope["method"], scope["path"], settings.PROFILE_INTERVAL, settings.PROFILE_MAX_SECONDS)
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"x-profile-id", profile.id.encode())]
+            await send(message)
+
+        token = _active.set(profile)
+        profile.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            profile.stop()
+            _active.reset(token)
+            await run_in_threadpool(self._save, profile)
+
+    def _save(self, profile: RequestProfile) -> None:
+        try:
+            base = os.path.join(self.directory, profile.id)
+            with open(f"{base}.collapsed", "w") as collapsed:
+                for stack, count in profile.stacks.most_common():
+                    collapsed.write(f"{stack} {count}\n")
+            summary = profile.summary()
+            with open(f"{base}.json", "w") as summary_file:
+                json.dump(summary, summary_file, indent=2)
+            self._prune()
+            logger.info(
+                f"Profil {profile.method} {profile.path} disimpan sebagai {profile.id}: "
+                f"{summary['wall_ms']} ms, SQL {summary['sql_ms']} ms ({profile.sql_count} query)"
+            )
+        except Exception as e:
+            logger.error(f"Error menyimpan profil {profile.id}: {str(e)}")
+
+    def _prune(self) -> None:
+        """Simpan hanya ``PROFILE_MAX_FILES`` profil terbaru (nama file diawali timestamp)."""
+        profiles = sorted(name[:-5] for name in os.listdir(self.directory) if name.endswith(".json"))
+        for profile_id in profiles[:-settings.PROFILE_MAX_FILES]:
+            for extension in (".json", ".collapsed"):
+                try:
+                    os.remove(os.path.join(self.directory, profile_id + extension))
+                except FileNotFoundError:
+                    pass
@@ -0,0 +1,78 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+from sqlalchemy.orm import Session
+from config import settings
+from logger import logger
+
+from schemas import QuizWithQuestions
+from singleflight import SingleFlight
+
+class QuizContentCache:
+    """Konten publik quiz (pertanyaan + option tanpa kunci jawaban) per quiz.
+
+    Saat quiz mulai dipakai, ratusan request GET /quiz/{id} datang bersamaan;
+    load dari database digabung lewat single-flight sehingga hanya satu query
+    join yang berjalan, dan hasilnya disimpan singkat (``QUIZ_CONTENT_TTL``)
+    atau lebih lama lewat prewarm sebelum jadwal mulai (paling lama
+    ``QUIZ_CONTENT_PREWARM_TTL``). Hasil load yang dimulai sebelum invalidate
+    tidak disimpan. Cache ini per worker: perubahan dari worker lain terlihat
+    paling lambat setelah TTL, jadi jalur tulis (membuat attempt) tidak
+    memakainya.
+    """
+
+    def __init__(self, max_quizzes: int, ttl: float):
+        self.max_quizzes = max_quizzes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[int, Tuple[float, QuizWithQuestions]]" = OrderedDict()
+        self._generations = {}
+        self._flight = SingleFlight()
+
+    def _load(self, db: Session, quiz_id: int, generation: int, ttl: float) -> Optional[QuizWithQuestions]:
+        from crud.quiz import QuizCRUD
+        quiz = QuizCRUD.get_quiz_with_questions(db, quiz_id)
+        if not quiz:
+            return None
+        content = QuizWithQuestions.model_validate(quiz)
+        with self._lock:
+            if self._generations.get(quiz_id, 0) == generation:
+                self._entries[quiz_id] = (time.monotonic() + ttl, content)
+                self._entries.move_to_end(quiz_id)
+                while len(self._entries) > self.max_quizzes:
+                    self._entries.popitem(last=False)
+        return content
+
+    def get(self, db: Session, quiz_id: int) -> Optional[QuizWithQuestions]:
+        """Konten quiz yang belum dihapus, atau None."""
+        with self._lock:
+            entry = self._entries.get(quiz_id)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(quiz_id)
+                return entry[1]
+            generation = self._generations.get(quiz_id, 0)
+        return self._flight.do((quiz_id, generation), self._load, db, quiz_id, generation, self.ttl)
+
+    @staticmethod
+    def prewarm_ttl(ttl: Optional[float] = None) -> float:
+        """TTL prewarm, dibatasi ``QUIZ_CONTENT_PREWARM_TTL``."""
+        return min(ttl or settings.QUIZ_CONTENT_PREWARM_TTL, settings.QUIZ_CONTENT_PREWARM_TTL)
+
+    def prewarm(self, db: Session, quiz_id: int, ttl: Optional[float] = None) -> Optional[QuizWithQuestions]:
+        """Muat ulang konten dari database dan simpan selama ``ttl`` detik."""
+        with self._lock:
+            generation = self._generations.get(quiz_id, 0)
+        content = self._flight.do(
+            (quiz_id, generation, "prewarm"), self._load, db, quiz_id, generation, self.prewarm_ttl(ttl)
+        )
+        if content is not None:
+            logger.info(f"Konten quiz {quiz_id} di-prewarm ({len(content.questions)} questions)")
+        return content
+
+    def invalidate(self, quiz_id: int) -> None:
+        with self._lock:
+            self._entries.pop(quiz_id, None)
+            self._generations[quiz_id] = self._generations.get(quiz_id, 0) + 1
+
+quiz_contents = QuizContentCache(settings.QUIZ_CONTENT_MAX_QUIZZES, settings.QUIZ_CONTENT_TTL)
@@ -0,0 +1,144 @@
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from fastapi.responses import JSONResponse
+from config import settings
+from logger import logger
+
+# Path yang tidak pernah dibatasi
+EXEMPT_PATHS = ("/api/v1/health", "/docs", "/redoc", "/openapi.json")
+
+def route_group(method: str, path: str) -> str:
+    path = path.rstrip("/")
+    if method == "PUT" and path.endswith("/time"):
+        return "heartbeat"
+    if method == "POST" and path.endswith("/submit"):
+        return "submit"
+    if method == "POST" and "/attempt" in path:
+        return "attempt"
+    if method in ("GET", "HEAD", "OPTIONS"):
+        return "read"
+    return "write"
+
+class TokenBucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, capacity: float, now: float):
+        self.tokens = capacity
+        self.updated = now
+
+    def refill(self, capacity: float, rate: float, now: float) -> None:
+        self.tokens = min(capacity, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+
+class RateLimiter:
+    """Token bucket per (route group, identitas client).
+
+    Bucket disimpan di OrderedDict berurutan dari yang terakhir dipakai, sehingga
+    bucket yang idle selalu berada di depan dan bisa dibuang dalam O(1) amortized.
+    Tidak memakai lock karena hanya dipanggil dari event loop.
+    """
+
+    def __init__(self, budgets: Dict[str, List[float]], idle_ttl: float, max_buckets: int):
+        self.budgets = budgets
+        self.idle_ttl = idle_ttl
+        self.max_buckets = max_buckets
+        self._buckets: "OrderedDict[Tuple[str, str], TokenBucket]" = OrderedDict()
+
+    def _expire(self, now: float) -> None:
+        while self._buckets:
+            bucket = next(iter(self._buckets.values()))
+            if now - bucket.updated < self.idle_ttl and len(self._buckets) < self.max_buckets:
+                break
+            self._buckets.popitem(last=False)
+
+    def _bucket(self, key: Tuple[str, str], capacity: float, now: float) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(capacity, now)
+            self._buckets[key] = bucket
+        else:
+            self._buckets.move_to_end(key)
+        return bucket
+
+    def check(self, group: str, identities: List[Tuple[str, float]], now: Optional[float] = None) -> float:
+        """Ambil satu token dari setiap bucket identitas.
+
+        ``identities`` berisi pasangan (identitas, pengali budget). Mengembalikan 0
+        jika request diizinkan, atau jumlah detik sampai token berikutnya tersedia
+        jika ditolak (tidak ada token yang terpakai).
+        """
+        budget = self.budgets.get(group) or self.budgets.get("default")
+        if not budget:
+            return 0.0
+        now = time.monotonic() if now is None else now
+        self._expire(now)
+
+        buckets = []
+        retry_after = 0.0
+        for identity, scale in identities:
+            capacity, rate = budget[0] * scale, budget[1] * scale
+            bucket = self._bucket((group, identity), capacity, now)
+            bucket.refill(capacity, rate, now)
+            if bucket.tokens < 1:
+                retry_after = max(retry_after, (1 - bucket.tokens) / rate if rate > 0 else self.idle_ttl)
+            buckets.append(bucket)
+
+        if retry_after:
+            return retry_after
+        for bucket in buckets:
+            bucket.tokens -= 1
+        return 0.0
+
+class RateLimitMiddleware:
+    """ASGI middleware yang membalas 429 + Retry-After saat budget client habis."""
+
+    def __init__(self, app, limiter: Optional[RateLimiter] = None):
+        self.app = app
+        self.limiter = limiter or RateLimiter(
+            settings.RATE_LIMIT_BUDGETS,
+            settings.RATE_LIMIT_IDLE_TTL,
+            settings.RATE_LIMIT_MAX_BUCKETS
+        )
+
+    @staticmethod
+    def _identities(scope) -> List[Tuple[str, float]]:
+        """Identitas peserta dengan budget normal, plus IP dengan budget cadangan.
+
+        Satu kelas sering berada di balik satu IP NAT, jadi budget IP dikali
+        ``RATE_LIMIT_IP_MULTIPLIER``; bucket IP tetap dicek agar header peserta
+        yang diganti-ganti tidak bisa melewati batas.
+        """
+        headers = dict(scope.get("headers") or [])
+        client_ip = scope["client"][0] if scope.get("client") else "unknown"
+        if settings.RATE_LIMIT_TRUST_FORWARDED and b"x-forwarded-for" in headers:
+            client_ip = headers[b"x-forwarded-for"].decode("latin-1").split(",")[0].strip()
+        identities = [(f"ip:{client_ip}", settings.RATE_LIMIT_IP_MULTIPLIER)]
+
+        email = headers.get(b"x-participant-email", b"").decode("latin-1").strip().lower()
+        participant_id = headers.get(b"x-participant-id", b"").decode("latin-1").strip()[:64]
+        if email:
+            identities.append((f"email:{email}", 1.0))
+        elif participant_id:
+            identities.append((f"participant:{participant_id}", 1.0))
+        return identities
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(EXEMPT_PATHS):
+            await self.app(scope, receive, send)
+            return
+
+        group = route_group(scope["method"], scope["path"])
+        identities = self._identities(scope)
+        retry_after = self.limiter.check(group, identities)
+        if retry_after:
+            logger.warning(f"Rate limit {group} terlampaui untuk {', '.join(identity for identity, _ in identities)}")
+            response = JSONResponse(
+                status_code=429,
+                content={"message": "Terlalu banyak request, silakan coba lagi nanti."},
+                headers={"Retry-After": str(max(1, int(retry_after + 0.999)))}
+            )
+            await response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
@@ -0,0 +1,182 @@
+"""Rollup aktivitas quiz per jam dan per hari.
+
+Counter diperbarui di transaksi yang sama dengan event-nya (attempt dimulai,
+di-submit, atau dihapus) lewat upsert ``INSERT ... ON CONFLICT DO UPDATE``,
+sehingga chart time-series tidak perlu memindai quiz_attempts. Setiap bucket
+terdiri dari hingga ``ROLLUP_SHARDS`` baris (shard acak per transaksi) yang
+dijumlahkan saat dibaca, agar submit bersamaan tidak antre di lock satu baris. ``rebuild``
+menghitung ulang rollup secara set-based dari quiz_attempts (backfill, regrade).
+Bucket memakai waktu yang sama dengan kolom sumbernya (UTC).
+"""
+import random
+from datetime import datetime, timedelta
+from typing import List, Optional
+from sqlalchemy import delete, func, insert, literal, select, union_all
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from config import settings
+
+from models import QuizAttempt, QuizActivityHourly, QuizActivityDaily
+
+COUNTERS = ("attempts_started", "attempts_completed", "score_sum", "time_taken_sum")
+ROLLUPS = {"hour": QuizActivityHourly, "day": QuizActivityDaily}
+
+def _dialect(connection) -> str:
+    bind = connection.get_bind() if hasattr(connection, "get_bind") else connection
+    return bind.dialect.name
+
+def _truncate(dialect: str, value, unit: str):
+    """Potong timestamp ke awal jam/hari; datetime Python dipotong langsung."""
+    if isinstance(value, datetime):
+        if unit == "day":
+            return value.replace(hour=0, minute=0, second=0, microsecond=0)
+        return value.replace(minute=0, second=0, microsecond=0)
+    if dialect == "postgresql":
+        return func.date_trunc(unit, value)
+    # Format sama dengan DateTime SQLAlchemy di SQLite agar primary key cocok
+    pattern = "%Y-%m-%d 00:00:00.000000" if unit == "day" else "%Y-%m-%d %H:00:00.000000"
+    return func.strftime(pattern, value)
+
+def _upsert(db: Session, model, values: dict) -> None:
+    dialect = _dialect(db)
+    statement = (postgresql.insert if dialect == "postgresql" else sqlite.insert)(model).values(**values)
+    statement = statement.on_conflict_do_update(
+        index_elements=[model.quiz_id, model.bucket, model.shard],
+        set_={
+            counter: getattr(model, counter) + getattr(statement.excluded, counter)
+            for counter in COUNTERS if counter in values
+        }
+    )
+    db.execute(statement)
+
+def _add(db: Session, quiz_id: int, at, **deltas) -> None:
+    dialect = _dialect(db)
+    # Shard yang sama untuk baris jam dan hari: urutan lock tetap, tidak deadlock
+    shard = random.randrange(max(1, settings.ROLLUP_SHARDS))
+    for unit, model in ROLLUPS.items():
+        _upsert(db, model, dict(deltas, quiz_id=quiz_id, bucket=_truncate(dialect, at, unit), shard=shard))
+
+def record_started(db: Session, quiz_id: int, count: int = 1) -> None:
+    """Dipanggil sebelum commit saat attempt dibuat (started_at = now() di database)."""
+    _add(db, quiz_id, func.now(), attempts_started=count)
+
+def record_completed(db: Session, attempt: QuizAttempt) -> None:
+    """Dipanggil sebelum commit saat attempt di-submit."""
+    _add(
+        db, attempt.quiz_id, attempt.completed_at,
+        attempts_completed=1,
+        score_sum=attempt.score or 0,
+        time_taken_sum=attempt.time_taken or 0
+    )
+
+def record_completed_many(db: Session, quiz_id: int, completed_at: datetime, count: int, score_sum: int, time_taken_sum: int) -> None:
+    """Satu upsert untuk banyak attempt yang selesai bersamaan (akhir sesi live)."""
+    _add(
+        db, quiz_id, completed_at,
+        attempts_completed=count,
+        score_sum=score_sum,
+        time_taken_sum=time_taken_sum
+    )
+
+def record_deleted(db: Session, quiz_id: int, started_at, completed_at, score, time_taken) -> None:
+    """Kurangi counter attempt yang dihapus."""
+    if started_at is not None:
+        _add(db, quiz_id, started_at, attempts_started=-1)
+    if completed_at is not None:
+        _add(
+            db, quiz_id, completed_at,
+            attempts_completed=-1,
+            score_sum=-(score or 0),
+            time_taken_sum=-(time_taken or 0)
+        )
+
+def record_deleted_many(db: Session, quiz_id: int, started_at: datetime, count: int) -> None:
+    """Satu upsert untuk banyak attempt tanpa submit yang dihapus (bucket jam yang sama)."""
+    _add(db, quiz_id, started_at, attempts_started=-count)
+
+def rebuild(connection, quiz_id: Optional[int] = None) -> None:
+    """Hitung ulang rollup (semua quiz atau satu quiz) dengan INSERT ... SELECT
+    ke shard 0.
+
+    Menerima Connection (migration) maupun Session; commit dilakukan pemanggil.
+    """
+    dialect = _dialect(connection)
+    quiz_filter = [QuizAttempt.quiz_id == quiz_id] if quiz_id else []
+    for model in ROLLUPS.values():
+        connection.execute(delete(model).where(*([model.quiz_id == quiz_id] if quiz_id else [])))
+
+    zero = literal(0)
+    events = union_all(
+        select(
+            QuizAttempt.quiz_id,
+            _truncate(dialect, QuizAttempt.started_at, "hour").label("bucket"),
+            literal(1).label("attempts_started"),
+            zero.label("attempts_completed"),
+            zero.label("score_sum"),
+            zero.label("time_taken_sum")
+        ).where(QuizAttempt.started_at.isnot(None), *quiz_filter),
+        select(
+            QuizAttempt.quiz_id,
+            _truncate(dialect, QuizAttempt.completed_at, "hour").label("bucket"),
+            zero,
+            literal(1),
+            func.coalesce(QuizAttempt.score, 0),
+            func.coalesce(QuizAttempt.time_taken, 0)
+        ).where(QuizAttempt.is_completed == True, QuizAttempt.completed_at.isnot(None), *quiz_filter)
+    ).subquery()
+
+    connection.execute(insert(QuizActivityHourly).from_select(
+        ["quiz_id", "bucket", *COUNTERS],
+        select(
+            events.c.quiz_id,
+            events.c.bucket,
+            *[func.sum(events.c[counter]) for counter in COUNTERS]
+        ).group_by(events.c.quiz_id, events.c.bucket)
+    ))
+
+    daily_bucket = _truncate(dialect, QuizActivityHourly.bucket, "day")
+    connection.execute(insert(QuizActivityDaily).from_select(
+        ["quiz_id", "bucket", *COUNTERS],
+        select(
+            QuizActivityHourly.quiz_id,
+            daily_bucket,
+            *[func.sum(getattr(QuizActivityHourly, counter)) for counter in COUNTERS]
+        ).where(
+            *([QuizActivityHourly.quiz_id == quiz_id] if quiz_id else [])
+        ).group_by(QuizActivityHourly.quiz_id, daily_bucket)
+    ))
+
+def _point(bucket: datetime, counters: dict) -> dict:
+    started, completed = counters["attempts_started"], counters["attempts_completed"]
+    return {
+        "bucket": bucket,
+        "attempts_started": started,
+        "attempts_completed": completed,
+        "completion_rate": round(completed / started * 100, 2) if started > 0 else None,
+        "average_score": round(counters["score_sum"] / completed, 2) if completed > 0 else None,
+        "average_time": round(counters["time_taken_sum"] / completed, 2) if completed > 0 else None
+    }
+
+def timeseries(db: Session, quiz_id: int, granularity: str, start: datetime, end: datetime) -> List[dict]:
+    """Titik time-series dari rollup saja; shard dan granularity week dijumlahkan
+    dari baris rollup yang dibaca."""
+    model = QuizActivityHourly if granularity == "hour" else QuizActivityDaily
+    floor = _truncate("", start, "hour" if granularity == "hour" else "day")
+    if granularity == "week":
+        floor -= timedelta(days=floor.weekday())
+    rows = db.query(model).filter(
+        model.quiz_id == quiz_id,
+        model.bucket >= floor,
+        model.bucket < end
+    ).order_by(model.bucket).all()
+
+    buckets = {}
+    for row in rows:
+        bucket = row.bucket
+        if granularity == "week":
+            monday = bucket.date() - timedelta(days=bucket.weekday())
+            bucket = datetime.combine(monday, datetime.min.time())
+        counters = buckets.setdefault(bucket, dict.fromkeys(COUNTERS, 0))
+        for counter in COUNTERS:
+            counters[counter] += getattr(row, counter) or 0
+    return [_point(bucket, counters) for bucket, counters in buckets.items()]
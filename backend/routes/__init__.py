@@ -1,7 +1,9 @@
-from routes import quiz, attempt, health
+from routes import quiz, attempt, health, jobs, live
 
 __all__ = [
     "quiz", 
     "attempt", 
-    "health"
+    "health",
+    "jobs",
+    "live"
 ]
\ No newline at end of file
@@ -1,18 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from datetime import datetime
 from logger import logger
 
 from backend.database import get_db
 from crud import QuizAttemptCRUD
 from schemas import (
     QuizAttemptCreate, QuizAttemptResponse,
-    UserAnswerSubmit, QuizResult
+    QuizAttemptBatchCreate, QuizAttemptBatchResponse,
+    UserAnswerSubmit, QuizResult, AttemptHistory
 )
 from exceptions import (
     AttemptNotFoundException, QuizAlreadyCompletedException,
-    QuizNotFoundException
+    QuizNotFoundException, ValidationException
 )
 
 router = APIRouter(prefix="/attempt", tags=["attempt"])
@@ -33,13 +35,43 @@ def start_quiz_attempt(
         logger.error(f"Error starting quiz attempt: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.get("/", response_model=AttemptHistory)
+def get_participant_attempts(
+    participant_email: str = Query(..., min_length=3, max_length=255),
+    cursor: Optional[str] = Query(None, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    try:
+        return QuizAttemptCRUD.get_participant_history(db, participant_email, cursor, limit)
+    except ValidationException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting attempts peserta {participant_email}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.post("/batch", response_model=QuizAttemptBatchResponse)
+def start_quiz_attempts_batch(
+    batch: QuizAttemptBatchCreate,
+    db: Session = Depends(get_db)
+):
+    try:
+        logger.info(f"Starting {len(batch.participants)} attempts untuk quiz_id: {batch.quiz_id}")
+        return QuizAttemptCRUD.create_attempts_batch(db, batch)
+    except QuizNotFoundException:
+        raise
+    except Exception as e:
+        logger.error(f"Error starting batch attempts: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.get("/{attempt_id}", response_model=QuizAttemptResponse)
 def get_quiz_attempt(
     attempt_id: int,
+    started_at: Optional[datetime] = Query(None),
     db: Session = Depends(get_db)
 ):
     try:
-        attempt = QuizAttemptCRUD.get_attempt(db, attempt_id)
+        attempt = QuizAttemptCRUD.get_attempt(db, attempt_id, started_at)
         if not attempt:
             raise AttemptNotFoundException(attempt_id)
         return attempt
@@ -53,11 +85,12 @@ def get_quiz_attempt(
 def submit_quiz_answers(
     attempt_id: int,
     answers: UserAnswerSubmit,
+    started_at: Optional[datetime] = Query(None),
     db: Session = Depends(get_db)
 ):
     try:
         logger.info(f"Submitting answers untuk attempt_id: {attempt_id}")
-        result = QuizAttemptCRUD.submit_answers(db, attempt_id, answers.answers)
+        result = QuizAttemptCRUD.submit_answers(db, attempt_id, answers.answers, started_at)
         logger.info(f"Successfully submitted answers untuk attempt: {attempt_id}")
         return result
     except (AttemptNotFoundException, QuizAlreadyCompletedException):
@@ -69,10 +102,11 @@ def submit_quiz_answers(
 @router.get("/{attempt_id}/results", response_model=QuizResult)
 def get_quiz_results(
     attempt_id: int,
+    started_at: Optional[datetime] = Query(None),
     db: Session = Depends(get_db)
 ):
     try:
-        result = QuizAttemptCRUD.get_quiz_results(db, attempt_id)
+        result = QuizAttemptCRUD.get_quiz_results(db, attempt_id, started_at)
         if not result:
             raise AttemptNotFoundException(attempt_id)
         return result
@@ -86,6 +120,7 @@ def get_quiz_results(
 def update_time_taken(
     attempt_id: int,
     time_data: dict,
+    started_at: Optional[datetime] = Query(None),
     db: Session = Depends(get_db)
 ):
     try:
@@ -93,7 +128,7 @@ def update_time_taken(
         if not isinstance(time_taken, int) or time_taken < 0:
             raise ValueError("time_taken harus integer positif")
         
-        QuizAttemptCRUD.update_time_taken(db, attempt_id, time_taken)
+        QuizAttemptCRUD.update_time_taken(db, attempt_id, time_taken, started_at)
         
         return JSONResponse(
             status_code=200,
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import JSONResponse
 from backend.database import test_database_connection
+from admission import db_admission
 from logger import logger
 
 router = APIRouter(tags=["health"])
@@ -11,7 +12,7 @@ async def health_check():
         if test_database_connection():
             return JSONResponse(
                 status_code=200,
-                content={"status": "healthy", "database": "connected"}
+                content={"status": "healthy", "database": "connected", "pool": db_admission.snapshot()}
             )
         else:
             return JSONResponse(
@@ -0,0 +1,50 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from logger import logger
+
+from database import get_db
+from jobs import job_runner
+from schemas import JobCreate, JobResponse
+from exceptions import JobNotFoundException, ValidationException
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+@router.post("/", response_model=JobResponse, status_code=202)
+def create_job(job: JobCreate):
+    # Tidak memakai get_db: job dibuat lewat pool DB khusus job
+    if not job_runner.is_exposed(job.job_type):
+        raise ValidationException(f"Job type {job.job_type} tidak dikenal")
+    try:
+        return job_runner.submit(job.job_type, job.params, job_key=job.job_key)
+    except ValueError as e:
+        raise ValidationException(str(e))
+    except Exception as e:
+        logger.error(f"Error creating job {job.job_type}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.get("/{job_id}", response_model=JobResponse)
+def get_job(job_id: int, db: Session = Depends(get_db)):
+    try:
+        job = job_runner.get(db, job_id)
+        if not job:
+            raise JobNotFoundException(job_id)
+        return job
+    except JobNotFoundException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting job {job_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.post("/{job_id}/cancel", response_model=JobResponse)
+def cancel_job(job_id: int, db: Session = Depends(get_db)):
+    try:
+        job = job_runner.cancel(db, job_id)
+        if not job:
+            raise JobNotFoundException(job_id)
+        logger.info(f"Cancel diminta untuk job {job_id}")
+        return job
+    except JobNotFoundException:
+        raise
+    except Exception as e:
+        logger.error(f"Error cancelling job {job_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
@@ -0,0 +1,64 @@
+import secrets
+from fastapi import APIRouter, HTTPException, Query, WebSocket
+from pydantic import ValidationError
+from typing import Optional
+from logger import logger
+
+from live import live_hub, CLOSE_FORBIDDEN, CLOSE_NOT_FOUND, CLOSE_POLICY
+from schemas import LiveSessionCreate, LiveSessionResponse, QuizAttemptParticipant
+from config import settings
+from exceptions import LiveSessionNotFoundException, LiveSessionsUnavailableException, QuizNotFoundException
+
+router = APIRouter(prefix="/live", tags=["live"])
+
+@router.post("/", response_model=LiveSessionResponse, status_code=201)
+async def create_live_session(payload: LiveSessionCreate):
+    # Sesi hanya ada di memori worker pembuatnya; dengan beberapa worker yang berbagi
+    # socket, WebSocket peserta akan mendarat di worker lain
+    if not settings.LIVE_SESSIONS_ENABLED:
+        raise LiveSessionsUnavailableException()
+    try:
+        session = await live_hub.create(payload.quiz_id)
+        return LiveSessionResponse(**session.summary(), host_key=session.host_key)
+    except QuizNotFoundException:
+        raise
+    except Exception as e:
+        logger.error(f"Error creating sesi live untuk quiz {payload.quiz_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.get("/{session_id}", response_model=LiveSessionResponse)
+async def get_live_session(session_id: str):
+    session = live_hub.get(session_id)
+    if session is None:
+        raise LiveSessionNotFoundException(session_id)
+    return LiveSessionResponse(**session.summary())
+
+@router.websocket("/{session_id}/host")
+async def live_host(websocket: WebSocket, session_id: str, host_key: str = Query(...)):
+    session = live_hub.get(session_id)
+    if session is None:
+        await websocket.close(code=CLOSE_NOT_FOUND)
+        return
+    if not secrets.compare_digest(host_key, session.host_key):
+        await websocket.close(code=CLOSE_FORBIDDEN)
+        return
+    await live_hub.serve_host(websocket, session)
+
+@router.websocket("/{session_id}/play")
+async def live_play(
+    websocket: WebSocket,
+    session_id: str,
+    participant_name: Optional[str] = Query(None),
+    participant_email: Optional[str] = Query(None),
+    rejoin_key: Optional[str] = Query(None)
+):
+    session = live_hub.get(session_id)
+    if session is None:
+        await websocket.close(code=CLOSE_NOT_FOUND)
+        return
+    try:
+        participant = QuizAttemptParticipant(participant_name=participant_name, participant_email=participant_email)
+    except ValidationError:
+        await websocket.close(code=CLOSE_POLICY)
+        return
+    await live_hub.serve_player(websocket, session, participant, rejoin_key)
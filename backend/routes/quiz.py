@@ -1,15 +1,23 @@
+import asyncio
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
+from datetime import datetime
 from logger import logger
 
+from config import settings
 from database import get_db
-from crud import QuizCRUD, QuestionCRUD
+from crud import QuizCRUD, QuestionCRUD, SearchCRUD
 from schemas import (
     QuizCreateRequest, QuizResponse, QuizUpdateRequest, QuizPublic,
-    QuizWithQuestions, QuizStats, QuestionCreate, QuestionResponse, QuestionUpdate
+    QuizWithQuestions, QuizStats, QuestionCreate, QuestionResponse, QuestionUpdate,
+    QuizSearchResult, CategoryFacets, Leaderboard, JobResponse, ItemAnalysis,
+    QuizTimeseries, TimeseriesGranularity
 )
-from exceptions import QuizNotFoundException
+from exceptions import QuizNotFoundException, ValidationException
+from stats_stream import stats_streams
+from quiz_content import quiz_contents
 
 router = APIRouter(prefix="/quiz", tags=["quiz"])
 
@@ -34,16 +42,50 @@ def get_quizzes(
         logger.error(f"Error getting quizzes: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@router.get("/search", response_model=List[QuizSearchResult])
+def search_quizzes(
+    q: str = Query(..., min_length=1, max_length=200),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    try:
+        return SearchCRUD.search(db, q, skip=skip, limit=limit)
+    except Exception as e:
+        logger.error(f"Error searching quizzes: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.get("/stats", response_model=List[QuizStats])
+def get_quizzes_stats(
+    ids: Optional[List[str]] = Query(None, description="Id quiz, dipisah koma atau diulang"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    db: Session = Depends(get_db)
+):
+    try:
+        quiz_ids = None
+        if ids:
+            try:
+                quiz_ids = sorted({int(value) for item in ids for value in item.split(",") if value.strip()})
+            except ValueError:
+                raise ValidationException("Parameter ids harus berisi id quiz berupa angka.")
+            if len(quiz_ids) > 500:
+                raise ValidationException("Maksimal 500 id quiz per request.")
+        from crud import QuizAttemptCRUD
+        return QuizAttemptCRUD.get_quizzes_stats(db, quiz_ids, skip=skip, limit=limit)
+    except ValidationException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting quizzes stats: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
 @router.get("/{quiz_id}", response_model=QuizWithQuestions)
 def get_quiz(quiz_id: int, db: Session = Depends(get_db)):
     try:
-        quiz = QuizCRUD.get_quiz_with_questions(db, quiz_id)
+        # QuizWithQuestions tidak memuat is_correct, aman dibagi antar request
+        quiz = QuizCRUD.get_quiz_content(db, quiz_id)
         if not quiz:
             raise QuizNotFoundException(quiz_id)
-        
-        for question in quiz.questions:
-            for option in question.options:
-                option.is_correct = False
         return quiz
     except QuizNotFoundException:
         raise
@@ -103,6 +145,120 @@ def get_quiz_stats(quiz_id: int, db: Session = Depends(get_db)):
         logger.error(f"Error getting stats: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@router.post("/{quiz_id}/prewarm")
+def prewarm_quiz(
+    quiz_id: int,
+    ttl: Optional[int] = Query(None, ge=1, le=86400, description="Lama konten disimpan (detik), maksimal QUIZ_CONTENT_PREWARM_TTL"),
+    db: Session = Depends(get_db)
+):
+    try:
+        content = QuizCRUD.prewarm_quiz(db, quiz_id, ttl)
+        if not content:
+            raise QuizNotFoundException(quiz_id)
+        return JSONResponse(
+            status_code=200,
+            content={
+                "message": "Konten quiz berhasil di-prewarm",
+                "quiz_id": quiz_id,
+                "questions": len(content.questions),
+                "ttl": quiz_contents.prewarm_ttl(ttl)
+            }
+        )
+    except QuizNotFoundException:
+        raise
+    except Exception as e:
+        logger.error(f"Error prewarming quiz {quiz_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.get("/{quiz_id}/stats/stream")
+async def stream_quiz_stats(quiz_id: int):
+    """Server-Sent Events: event ``stats`` berisi QuizLiveStats setiap ada perubahan."""
+    try:
+        queue = await stats_streams.subscribe(quiz_id)
+    except QuizNotFoundException:
+        raise
+    except Exception as e:
+        logger.error(f"Error subscribing stats stream quiz {quiz_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+    async def events():
+        try:
+            while True:
+                try:
+                    payload = await asyncio.wait_for(queue.get(), timeout=settings.STATS_STREAM_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: stats\ndata: {payload}\n\n"
+        finally:
+            stats_streams.unsubscribe(quiz_id, queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/{quiz_id}/leaderboard", response_model=Leaderboard)
+def get_quiz_leaderboard(
+    quiz_id: int,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=100),
+    attempt_id: Optional[int] = Query(None, gt=0),
+    db: Session = Depends(get_db)
+):
+    try:
+        from crud import QuizAttemptCRUD
+        return QuizAttemptCRUD.get_leaderboard(db, quiz_id, skip=skip, limit=limit, attempt_id=attempt_id)
+    except QuizNotFoundException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting leaderboard: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.get("/{quiz_id}/timeseries", response_model=QuizTimeseries)
+def get_quiz_timeseries(
+    quiz_id: int,
+    granularity: TimeseriesGranularity = TimeseriesGranularity.day,
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    db: Session = Depends(get_db)
+):
+    try:
+        from crud import QuizAttemptCRUD
+        return QuizAttemptCRUD.get_timeseries(db, quiz_id, granularity.value, start, end)
+    except (QuizNotFoundException, ValidationException):
+        raise
+    except Exception as e:
+        logger.error(f"Error getting timeseries: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.get("/{quiz_id}/item-analysis", response_model=ItemAnalysis)
+def get_item_analysis(quiz_id: int, db: Session = Depends(get_db)):
+    try:
+        from crud import QuizAttemptCRUD
+        return QuizAttemptCRUD.get_item_analysis(db, quiz_id)
+    except QuizNotFoundException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting item analysis: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.post("/{quiz_id}/regrade", response_model=JobResponse, status_code=202)
+def regrade_quiz(
+    quiz_id: int,
+    question_id: Optional[int] = Query(None, gt=0),
+    db: Session = Depends(get_db)
+):
+    try:
+        from crud import QuizAttemptCRUD
+        return QuizAttemptCRUD.schedule_regrade(db, quiz_id, question_id)
+    except QuizNotFoundException:
+        raise
+    except Exception as e:
+        logger.error(f"Error scheduling regrade: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
 @router.get("/categories/", response_model=List[str])
 def get_categories(db: Session = Depends(get_db)):
     try:
@@ -111,6 +267,14 @@ def get_categories(db: Session = Depends(get_db)):
         logger.error(f"Error getting categories: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@router.get("/facets/", response_model=CategoryFacets)
+def get_category_facets(db: Session = Depends(get_db)):
+    try:
+        return QuizCRUD.get_category_facets(db)
+    except Exception as e:
+        logger.error(f"Error getting category facets: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
 @router.post("/{quiz_id}/question/", response_model=QuestionResponse)
 def create_question(
     quiz_id: int,
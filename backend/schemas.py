@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 from enum import Enum
 
@@ -14,12 +14,21 @@ class QuestionType(str, Enum):
     true_false = "true_false"
     text = "text"
 
+class TimeseriesGranularity(str, Enum):
+    hour = "hour"
+    day = "day"
+    week = "week"
+
 # Answer Option
 class AnswerOptionCreate(BaseModel):
     option_text: str = Field(..., min_length=1, max_length=500)
     is_correct: bool = False
     option_order: int = Field(default=0, ge=0)
 
+class AnswerOptionUpdate(AnswerOptionCreate):
+    # id option lama; tanpa id option dicocokkan berdasarkan teksnya
+    id: Optional[int] = Field(default=None, gt=0)
+
 class AnswerOptionResponse(AnswerOptionCreate):
     id: int
     question_id: int
@@ -50,7 +59,7 @@ class QuestionUpdate(BaseModel):
     question_type: Optional[QuestionType] = None
     points: Optional[int] = Field(None, ge=1, le=100)
     explanation: Optional[str] = None
-    options: Optional[List[AnswerOptionCreate]] = None
+    options: Optional[List[AnswerOptionUpdate]] = None
     
     class Config:
         from_attributes = True
@@ -120,6 +129,10 @@ class QuizPublic(BaseModel):
     class Config:
         from_attributes = True
 
+class QuizSearchResult(QuizPublic):
+    rank: float = 0.0
+    snippet: Optional[str] = None
+
 class QuizWithQuestions(BaseModel):
     id: int
     title: str
@@ -140,6 +153,19 @@ class QuizAttemptCreate(BaseModel):
     participant_name: Optional[str] = Field(default=None, max_length=255)
     participant_email: Optional[EmailStr] = None
 
+class QuizAttemptParticipant(BaseModel):
+    participant_name: Optional[str] = Field(default=None, max_length=255)
+    participant_email: Optional[EmailStr] = None
+
+class QuizAttemptBatchCreate(BaseModel):
+    quiz_id: int = Field(..., gt=0)
+    participants: List[QuizAttemptParticipant] = Field(min_items=1, max_items=1000)
+
+class QuizAttemptBatchResponse(BaseModel):
+    quiz_id: int
+    total_questions: int = 0
+    attempt_ids: List[int] = []
+
 class QuizAttemptResponse(QuizAttemptCreate):
     id: int
     score: int = 0
@@ -152,6 +178,21 @@ class QuizAttemptResponse(QuizAttemptCreate):
     class Config:
         from_attributes = True
 
+class AttemptSummary(BaseModel):
+    attempt_id: int
+    quiz_id: int
+    quiz_title: str
+    score: int = 0
+    percentage: float = 0.0
+    is_completed: bool = False
+    started_at: datetime
+    completed_at: Optional[datetime] = None
+
+class AttemptHistory(BaseModel):
+    participant_email: str
+    attempts: List[AttemptSummary] = []
+    next_cursor: Optional[str] = None
+
 # User Answers
 class UserAnswerCreate(BaseModel):
     question_id: int = Field(..., gt=0)
@@ -187,10 +228,114 @@ class QuizResult(BaseModel):
     correct_answers: List[AnswerDetail] = []
     incorrect_answers: List[AnswerDetail] = []
 
+class LeaderboardEntry(BaseModel):
+    rank: int
+    attempt_id: int
+    participant_name: Optional[str] = None
+    score: int = 0
+    time_taken: int = 0
+    completed_at: Optional[datetime] = None
+
+class Leaderboard(BaseModel):
+    quiz_id: int
+    total_completed: int = 0
+    entries: List[LeaderboardEntry] = []
+    my_rank: Optional[LeaderboardEntry] = None
+
+class CategoryFacet(BaseModel):
+    category: str
+    count: int = 0
+    difficulties: Dict[str, int] = {}
+
+class CategoryFacets(BaseModel):
+    total: int = 0
+    categories: List[CategoryFacet] = []
+    difficulties: Dict[str, int] = {}
+
+class ItemOptionStat(BaseModel):
+    option_id: int
+    option_text: str
+    is_correct: bool = False
+    count: int = 0
+    proportion: float = 0.0
+
+class ItemStat(BaseModel):
+    question_id: int
+    question_text: str
+    points: int = 0
+    answered: int = 0
+    difficulty: Optional[float] = None
+    discrimination: Optional[float] = None
+    point_biserial: Optional[float] = None
+    options: List[ItemOptionStat] = []
+
+class ItemAnalysis(BaseModel):
+    quiz_id: int
+    total_attempts: int = 0
+    computed_at: datetime
+    snapshot_watermark: Optional[datetime] = None
+    items: List[ItemStat] = []
+
+class ActivityPoint(BaseModel):
+    bucket: datetime
+    attempts_started: int = 0
+    attempts_completed: int = 0
+    completion_rate: Optional[float] = None
+    average_score: Optional[float] = None
+    average_time: Optional[float] = None
+
+class QuizTimeseries(BaseModel):
+    quiz_id: int
+    granularity: TimeseriesGranularity
+    start: datetime
+    end: datetime
+    points: List[ActivityPoint] = []
+
 class QuizStats(BaseModel):
     quiz_id: int
     quiz_title: str
     total_attempts: int = 0
     average_score: float = 0.0
     pass_rate: float = 0.0
-    average_time: float = 0.0
\ No newline at end of file
+    average_time: float = 0.0
+
+class QuizLiveStats(QuizStats):
+    attempts_started: int = 0
+    updated_at: datetime
+
+# Live sessions
+class LiveSessionCreate(BaseModel):
+    quiz_id: int = Field(..., gt=0)
+
+class LiveSessionResponse(BaseModel):
+    session_id: str
+    quiz_id: int
+    quiz_title: str
+    total_questions: int = 0
+    status: str
+    current_question: Optional[int] = None
+    players: int = 0
+    host_key: Optional[str] = None
+
+# Background jobs
+class JobCreate(BaseModel):
+    job_type: str = Field(..., min_length=1, max_length=50)
+    params: Dict[str, Any] = {}
+    job_key: Optional[str] = Field(None, max_length=255)
+
+class JobResponse(BaseModel):
+    id: int
+    job_type: str
+    job_key: Optional[str] = None
+    status: str
+    progress: float = 0.0
+    params: Optional[Dict[str, Any]] = None
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    cancel_requested: bool = False
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
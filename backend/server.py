@@ -0,0 +1,280 @@
+"""Launcher produksi multi-worker: ``python server.py --workers 4``.
+
+Master memuat app sekali sebelum fork (``import main``: koneksi database dan
+migrasi), membuka socket listen, lalu fork N worker uvicorn yang berbagi socket
+tersebut. Modul yang sudah dimuat dibagi copy-on-write; ``gc.freeze`` mencegah
+GC menyentuh objek warisan master sehingga halamannya tidak ikut tersalin.
+
+Setiap worker membuang pool SQLAlchemy warisan master (``dispose(close=False)``)
+dan membuka koneksinya sendiri. Task latar (maintenance partisi, jadwal snapshot)
+hanya berjalan di worker slot 0. Job runner berjalan di setiap worker: job milik
+worker yang berhenti dikembalikan ke pending atau diambil alih lewat heartbeat
+(lihat ``jobs.py``).
+
+Sinyal ke master:
+- SIGHUP: rolling restart, worker diganti satu per satu. Pengganti di-fork dan
+  ditunggu sampai siap menerima request sebelum worker lama dihentikan dengan
+  SIGTERM (graceful), sehingga socket tidak pernah tanpa worker. Worker baru
+  di-fork dari image master, jadi perubahan kode butuh restart master.
+- SIGTERM/SIGINT: hentikan semua worker secara graceful lalu keluar.
+Worker yang mati tanpa diminta di-fork ulang di slot yang sama.
+
+Sesi live disimpan di memori worker yang membuatnya, dan semua worker berbagi
+satu socket sehingga WebSocket peserta tidak bisa diarahkan ke worker tersebut.
+Karena itu default-nya satu worker; dengan ``--workers`` lebih dari satu,
+pembuatan sesi live ditolak (503).
+"""
+import argparse
+import gc
+import os
+import select
+import signal
+import socket
+import sys
+import time
+from typing import Dict, Optional, Tuple
+
+import uvicorn
+
+from config import settings
+from logger import logger
+
+# Jeda sebelum fork ulang slot yang gagal start, agar tidak berputar terus saat app rusak
+RESPAWN_DELAY = 1.0
+
+class WorkerServer(uvicorn.Server):
+    """Server uvicorn di dalam worker: lapor siap ke master lewat pipe.
+
+    SIGINT dan SIGHUP diabaikan karena dikirim ke seluruh process group oleh
+    terminal; master yang memutuskan kapan worker berhenti lewat SIGTERM.
+    """
+
+    def __init__(self, config: uvicorn.Config, ready_fd: int):
+        super().__init__(config)
+        self.ready_fd = ready_fd
+
+    def install_signal_handlers(self) -> None:
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, self.handle_exit)
+
+    async def startup(self, sockets=None) -> None:
+        await super().startup(sockets=sockets)
+        if not self.should_exit:
+            os.write(self.ready_fd, b"1")
+        os.close(self.ready_fd)
+
+def _bind(host: str, port: int, backlog: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+def _run_worker(app, sock: socket.socket, slot: int, ready_fd: int, args) -> None:
+    """Isi proses worker setelah fork; tidak pernah kembali ke loop master."""
+    import database
+
+    for sig in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT, signal.SIGCHLD):
+        signal.signal(sig, signal.SIG_DFL)
+    # Koneksi di pool warisan master milik proses lain: lepas tanpa menutupnya
+    database.engine.dispose(close=False)
+    database.job_engine.dispose(close=False)
+    settings.BACKGROUND_TASKS = slot == 0
+    settings.LIVE_SESSIONS_ENABLED = args.workers == 1
+
+    config = uvicorn.Config(
+        app,
+        lifespan="on",
+        backlog=args.backlog,
+        timeout_keep_alive=args.keep_alive,
+        timeout_graceful_shutdown=args.graceful_timeout
+    )
+    server = WorkerServer(config, ready_fd)
+    code = 0
+    try:
+        server.run(sockets=[sock])
+        code = 0 if server.started else 1
+    except BaseException as e:
+        logger.error(f"Worker {os.getpid()} berhenti karena error: {str(e)}")
+        code = 1
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(code)
+
+class Arbiter:
+    """Proses master: fork, awasi, dan ganti worker."""
+
+    def __init__(self, app, sock: socket.socket, workers: int, args):
+        self.app = app
+        self.sock = sock
+        self.workers = workers
+        self.args = args
+        self.slots: Dict[int, int] = {}
+        self.retiring: Dict[int, float] = {}
+        self.reload_requested = False
+        self.stop_requested = False
+
+    # Sinyal hanya menandai; pekerjaannya dilakukan loop utama
+    def _on_reload(self, sig, frame) -> None:
+        self.reload_requested = True
+
+    def _on_stop(self, sig, frame) -> None:
+        self.stop_requested = True
+
+    def _spawn(self, slot: int) -> Tuple[int, int]:
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            _run_worker(self.app, self.sock, slot, write_fd, self.args)
+        os.close(write_fd)
+        logger.info(f"Worker {pid} (slot {slot}) di-fork")
+        return pid, read_fd
+
+    def _wait_ready(self, pid: int, read_fd: int) -> bool:
+        """Tunggu worker melapor siap; False jika mati atau melewati batas waktu."""
+        try:
+            ready, _, _ = select.select([read_fd], [], [], self.args.ready_timeout)
+            return bool(ready) and os.read(read_fd, 1) == b"1"
+        except InterruptedError:
+            return False
+        finally:
+            os.close(read_fd)
+
+    def _start_slot(self, slot: int) -> Optional[int]:
+        pid, read_fd = self._spawn(slot)
+        if self._wait_ready(pid, read_fd):
+            return pid
+        logger.error(f"Worker {pid} (slot {slot}) gagal start")
+        self._terminate(pid)
+        return None
+
+    def _terminate(self, pid: int) -> None:
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            return
+        self.retiring[pid] = time.monotonic() + self.args.graceful_timeout + 5
+
+    def _slot_of(self, pid: int) -> Optional[int]:
+        for slot, slot_pid in self.slots.items():
+            if slot_pid == pid:
+                return slot
+        return None
+
+    def _reap(self) -> None:
+        """Kumpulkan worker yang sudah keluar; slot yang kosong diisi lagi oleh _fill_slots."""
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            if self.retiring.pop(pid, None) is not None:
+                continue
+            slot = self._slot_of(pid)
+            if slot is None:
+                continue
+            del self.slots[slot]
+            logger.warning(f"Worker {pid} (slot {slot}) keluar tanpa diminta (status {status})")
+
+    def _kill_overdue(self) -> None:
+        now = time.monotonic()
+        for pid, deadline in list(self.retiring.items()):
+            if now > deadline:
+                logger.warning(f"Worker {pid} melewati graceful timeout, dihentikan paksa")
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+                self.retiring[pid] = now + 60
+
+    def _fill_slots(self) -> None:
+        for slot in range(self.workers):
+            if self.stop_requested or self.reload_requested:
+                return
+            if slot not in self.slots:
+                pid = self._start_slot(slot)
+                if pid is None:
+                    time.sleep(RESPAWN_DELAY)
+                    return
+                self.slots[slot] = pid
+
+    def _rolling_restart(self) -> None:
+        logger.info("Rolling restart worker dimulai")
+        for slot in range(self.workers):
+            if self.stop_requested:
+                return
+            old_pid = self.slots.get(slot)
+            pid = self._start_slot(slot)
+            if pid is None:
+                # Pertahankan worker lama agar kapasitas tidak berkurang
+                logger.error("Rolling restart dihentikan, worker lama tetap berjalan")
+                return
+            self.slots[slot] = pid
+            if old_pid is not None:
+                self._terminate(old_pid)
+            self._reap()
+        logger.info("Rolling restart worker selesai")
+
+    def _stop(self) -> None:
+        for pid in list(self.slots.values()):
+            self._terminate(pid)
+        self.slots.clear()
+        while self.retiring:
+            self._reap()
+            self._kill_overdue()
+            time.sleep(0.1)
+
+    def run(self) -> int:
+        signal.signal(signal.SIGHUP, self._on_reload)
+        signal.signal(signal.SIGTERM, self._on_stop)
+        signal.signal(signal.SIGINT, self._on_stop)
+        logger.info(f"Master {os.getpid()} menjalankan {self.workers} worker")
+        try:
+            while not self.stop_requested:
+                self._reap()
+                if self.reload_requested:
+                    self.reload_requested = False
+                    self._rolling_restart()
+                self._fill_slots()
+                self._kill_overdue()
+                time.sleep(0.2)
+        finally:
+            self._stop()
+            self.sock.close()
+        logger.info("Semua worker berhenti")
+        return 0
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python server.py", description="Jalankan API dengan beberapa worker")
+    parser.add_argument("--host", default=settings.HOST)
+    parser.add_argument("--port", type=int, default=settings.PORT)
+    parser.add_argument("--workers", type=int, default=settings.WEB_WORKERS or os.cpu_count() or 1)
+    parser.add_argument("--backlog", type=int, default=2048)
+    parser.add_argument("--keep-alive", type=int, default=5)
+    parser.add_argument("--graceful-timeout", type=int, default=settings.WORKER_GRACEFUL_TIMEOUT)
+    parser.add_argument("--ready-timeout", type=int, default=settings.WORKER_READY_TIMEOUT)
+    args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers minimal 1")
+    if args.workers > 1:
+        logger.warning("Sesi live dinonaktifkan: butuh --workers 1 karena sesi disimpan per worker")
+
+    sock = _bind(args.host, args.port, args.backlog)
+    from main import app
+    import database
+
+    # Master tidak melayani request: tutup koneksi hasil init/migrasi sebelum fork
+    database.engine.dispose()
+    database.job_engine.dispose()
+    gc.collect()
+    gc.freeze()
+    return Arbiter(app, sock, args.workers, args).run()
+
+if __name__ == "__main__":
+    sys.exit(main())
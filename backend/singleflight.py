@@ -0,0 +1,51 @@
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+class SingleFlight:
+    """Gabungkan pemanggilan bersamaan dengan key yang sama menjadi satu eksekusi.
+
+    Thread pertama (leader) menjalankan ``fn``; thread lain dengan key yang sama
+    menunggu lalu menerima hasil (atau exception) yang sama. Setelah selesai key
+    dilepas, jadi pemanggilan berikutnya kembali menjalankan ``fn``. Hasil dibagi
+    antar thread, jadi harus immutable (bukan objek ORM yang terikat session).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable, *args) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
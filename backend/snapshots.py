@@ -0,0 +1,261 @@
+"""Snapshot kolumnar jawaban per quiz untuk analitik (NumPy ``.npy`` + memmap).
+
+Setiap quiz punya direktori ``<SNAPSHOT_DIR>/quiz_<id>/`` berisi satu file
+``.npy`` per kolom dan ``meta.json`` (jumlah baris + watermark). Job snapshot
+menambahkan attempt yang selesai setelah watermark langsung ke ujung file;
+``meta.json`` ditulis terakhir sebagai commit point, sehingga sisa tulisan dari
+job yang terputus dipotong di run berikutnya. Perubahan yang menyentuh data
+lama (regrade, hapus attempt, retensi partisi) menandai snapshot ``STALE`` agar
+dibangun ulang penuh; selama itu pembaca kembali ke database. Pembaca
+snapshot menggabungkannya dengan attempt setelah watermark dari database.
+"""
+import asyncio
+import fcntl
+import json
+import os
+import shutil
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+import numpy as np
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from config import settings
+from logger import logger
+
+from models import Quiz, QuizAttempt, UserAnswer
+
+# tabel -> kolom -> dtype
+COLUMNS = {
+    "attempts": {
+        "attempt_id": np.int64,
+        "score": np.int64,
+        "time_taken": np.int64,
+        "completed_at": "datetime64[us]",
+    },
+    "answers": {
+        "attempt_id": np.int64,
+        "question_id": np.int64,
+        "option_id": np.int64,  # 0 = tanpa option (jawaban teks)
+        "is_correct": np.int8,
+        "answered_at": "datetime64[us]",
+    },
+}
+
+NPY_MAGIC = b"\x93NUMPY\x01\x00"
+# Header berukuran tetap agar shape bisa diperbarui di tempat saat append
+NPY_HEADER_SIZE = 128
+
+def quiz_dir(quiz_id: int) -> str:
+    return os.path.join(settings.SNAPSHOT_DIR, f"quiz_{quiz_id}")
+
+def _column_path(directory: str, table: str, column: str) -> str:
+    return os.path.join(directory, f"{table}_{column}.npy")
+
+def _npy_header(dtype: np.dtype, rows: int) -> bytes:
+    header = repr({"descr": np.lib.format.dtype_to_descr(dtype), "fortran_order": False, "shape": (rows,)})
+    padding = NPY_HEADER_SIZE - len(NPY_MAGIC) - 2 - len(header) - 1
+    return NPY_MAGIC + (NPY_HEADER_SIZE - len(NPY_MAGIC) - 2).to_bytes(2, "little") + header.encode("latin-1") + b" " * padding + b"\n"
+
+def _append_column(path: str, dtype, committed_rows: int, values: np.ndarray) -> None:
+    """Tambahkan ``values`` setelah ``committed_rows`` baris pertama, lalu perbarui header."""
+    dtype = np.dtype(dtype)
+    values = np.ascontiguousarray(values, dtype=dtype)
+    mode = "r+b" if os.path.exists(path) else "w+b"
+    with open(path, mode) as column:
+        column.seek(NPY_HEADER_SIZE + committed_rows * dtype.itemsize)
+        column.truncate()
+        column.write(values.tobytes())
+        column.seek(0)
+        column.write(_npy_header(dtype, committed_rows + len(values)))
+
+class QuizSnapshot:
+    """Kolom snapshot satu quiz yang di-memory-map (read-only)."""
+
+    def __init__(self, quiz_id: int, meta: dict, columns: Dict[str, Dict[str, np.ndarray]]):
+        self.quiz_id = quiz_id
+        self.meta = meta
+        self.columns = columns
+
+    @property
+    def watermark(self) -> datetime:
+        return datetime.fromisoformat(self.meta["watermark"])
+
+    @property
+    def attempts(self) -> Dict[str, np.ndarray]:
+        return self.columns["attempts"]
+
+    @property
+    def answers(self) -> Dict[str, np.ndarray]:
+        return self.columns["answers"]
+
+def _read_meta(directory: str) -> Optional[dict]:
+    try:
+        with open(os.path.join(directory, "meta.json"), encoding="utf-8") as meta_file:
+            return json.load(meta_file)
+    except FileNotFoundError:
+        return None
+
+def _write_meta(directory: str, meta: dict) -> None:
+    path = os.path.join(directory, "meta.json")
+    with open(path + ".tmp", "w", encoding="utf-8") as meta_file:
+        json.dump(meta, meta_file)
+    os.replace(path + ".tmp", path)
+
+def is_stale(quiz_id: int) -> bool:
+    return os.path.exists(os.path.join(quiz_dir(quiz_id), "STALE"))
+
+def load(quiz_id: int) -> Optional[QuizSnapshot]:
+    """Snapshot quiz sebagai array memmap, atau None jika belum ada/perlu rebuild."""
+    directory = quiz_dir(quiz_id)
+    meta = _read_meta(directory)
+    if meta is None or is_stale(quiz_id):
+        return None
+    columns = {}
+    for table, table_columns in COLUMNS.items():
+        rows = meta["rows"][table]
+        columns[table] = {}
+        for column, dtype in table_columns.items():
+            if rows == 0:
+                columns[table][column] = np.empty(0, dtype=dtype)
+            else:
+                columns[table][column] = np.load(_column_path(directory, table, column), mmap_mode="r")[:rows]
+    return QuizSnapshot(quiz_id, meta, columns)
+
+def invalidate(quiz_id: int) -> None:
+    """Tandai snapshot quiz usang; dibangun ulang penuh pada run berikutnya."""
+    directory = quiz_dir(quiz_id)
+    if os.path.isdir(directory):
+        with open(os.path.join(directory, "STALE"), "w"):
+            pass
+
+def remove(quiz_id: int) -> None:
+    shutil.rmtree(quiz_dir(quiz_id), ignore_errors=True)
+
+@contextmanager
+def _quiz_lock(quiz_id: int):
+    """Lock file per quiz agar dua job (atau dua worker) tidak menulis snapshot bersamaan."""
+    os.makedirs(settings.SNAPSHOT_DIR, exist_ok=True)
+    with open(os.path.join(settings.SNAPSHOT_DIR, f"quiz_{quiz_id}.lock"), "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def window(quiz_id: int, after: datetime, until: Optional[datetime] = None) -> tuple:
+    """Filter attempt selesai satu quiz dengan ``after < completed_at <= until``.
+
+    Dipakai job snapshot untuk menambah data, dan oleh pembaca snapshot untuk
+    mengambil attempt setelah watermark yang belum masuk snapshot.
+    """
+    criteria = (
+        QuizAttempt.quiz_id == quiz_id,
+        QuizAttempt.is_completed == True,
+        QuizAttempt.completed_at > after
+    )
+    return criteria if until is None else criteria + (QuizAttempt.completed_at <= until,)
+
+def _datetimes(values) -> np.ndarray:
+    return np.array([value or datetime.min for value in values], dtype="datetime64[us]")
+
+def snapshot_quiz(db: Session, quiz_id: int, cutoff: Optional[datetime] = None, context=None) -> int:
+    """Tambahkan attempt yang selesai di antara watermark dan ``cutoff`` ke snapshot.
+
+    ``cutoff`` default-nya sekarang dikurangi SNAPSHOT_LAG, memberi waktu transaksi
+    submit yang masih berjalan untuk commit sebelum watermark melewatinya.
+    Mengembalikan jumlah attempt yang ditambahkan.
+    """
+    cutoff = cutoff or datetime.utcnow() - timedelta(seconds=settings.SNAPSHOT_LAG)
+    with _quiz_lock(quiz_id):
+        return _append_snapshot(db, quiz_id, cutoff, context)
+
+def _append_snapshot(db: Session, quiz_id: int, cutoff: datetime, context) -> int:
+    directory = quiz_dir(quiz_id)
+    if is_stale(quiz_id):
+        os.remove(os.path.join(directory, "STALE"))
+        shutil.rmtree(directory, ignore_errors=True)
+
+    meta = _read_meta(directory)
+    watermark = datetime.fromisoformat(meta["watermark"]) if meta else datetime.min
+    if cutoff <= watermark:
+        return 0
+    window_criteria = window(quiz_id, watermark, cutoff)
+    attempts = db.execute(
+        select(QuizAttempt.id, QuizAttempt.score, QuizAttempt.time_taken, QuizAttempt.completed_at).where(*window_criteria)
+    ).all()
+    if not attempts and meta is None:
+        # Belum ada attempt selesai: tidak perlu membuat snapshot kosong
+        return 0
+
+    os.makedirs(directory, exist_ok=True)
+    rows = dict(meta["rows"]) if meta else {"attempts": 0, "answers": 0}
+    if attempts:
+        values = list(zip(*attempts))
+        columns = {
+            "attempt_id": np.array(values[0], dtype=np.int64),
+            "score": np.array([value or 0 for value in values[1]], dtype=np.int64),
+            "time_taken": np.array([value or 0 for value in values[2]], dtype=np.int64),
+            "completed_at": _datetimes(values[3]),
+        }
+        for column, dtype in COLUMNS["attempts"].items():
+            _append_column(_column_path(directory, "attempts", column), dtype, rows["attempts"], columns[column])
+        rows["attempts"] += len(attempts)
+
+        result = db.execute(
+            select(
+                UserAnswer.attempt_id,
+                UserAnswer.question_id,
+                func.coalesce(UserAnswer.selected_option_id, 0),
+                case((UserAnswer.is_correct == True, 1), else_=0),
+                UserAnswer.answered_at
+            ).join(QuizAttempt, QuizAttempt.id == UserAnswer.attempt_id).where(*window_criteria)
+            .execution_options(yield_per=settings.SNAPSHOT_BATCH_SIZE)
+        )
+        for batch in result.partitions():
+            values = list(zip(*batch))
+            columns = {
+                "attempt_id": np.array(values[0], dtype=np.int64),
+                "question_id": np.array(values[1], dtype=np.int64),
+                "option_id": np.array(values[2], dtype=np.int64),
+                "is_correct": np.array(values[3], dtype=np.int8),
+                "answered_at": _datetimes(values[4]),
+            }
+            for column, dtype in COLUMNS["answers"].items():
+                _append_column(_column_path(directory, "answers", column), dtype, rows["answers"], columns[column])
+            rows["answers"] += len(batch)
+            if context:
+                context.check_cancelled()
+
+    _write_meta(directory, {"watermark": cutoff.isoformat(), "rows": rows, "updated_at": datetime.utcnow().isoformat()})
+    if attempts:
+        from analysis import item_analysis
+        item_analysis.invalidate(quiz_id)
+        logger.info(f"Snapshot quiz {quiz_id}: +{len(attempts)} attempts, {rows['answers']} jawaban total")
+    return len(attempts)
+
+def snapshot_all(db: Session, context=None) -> dict:
+    cutoff = datetime.utcnow() - timedelta(seconds=settings.SNAPSHOT_LAG)
+    quiz_ids = db.execute(select(Quiz.id).where(Quiz.deleted_at.is_(None)).order_by(Quiz.id)).scalars().all()
+    appended = 0
+    for index, quiz_id in enumerate(quiz_ids):
+        appended += snapshot_quiz(db, quiz_id, cutoff, context)
+        db.rollback()  # akhiri transaksi baca per quiz
+        if context:
+            context.report((index + 1) / len(quiz_ids) * 100)
+    return {"quizzes": len(quiz_ids), "attempts_appended": appended, "watermark": cutoff.isoformat()}
+
+async def snapshot_loop(interval: Optional[int] = None) -> None:
+    """Jadwalkan job snapshot secara berkala (dipakai saat startup app)."""
+    from jobs import job_runner
+    interval = interval or settings.SNAPSHOT_INTERVAL
+    while True:
+        try:
+            await run_in_threadpool(
+                job_runner.submit, "snapshot_answers", {}, f"snapshot_answers:{int(time.time() // interval)}"
+            )
+        except Exception as e:
+            logger.error(f"Error scheduling snapshot: {str(e)}")
+        await asyncio.sleep(interval)
@@ -0,0 +1,203 @@
+"""Statistik quiz live untuk stream SSE, dihitung inkremental dari event attempt.
+
+Saat subscriber pertama sebuah quiz datang, counter diisi dengan satu query
+agregat; setelah itu start dan submit attempt di worker ini hanya menambah
+counter di memori. Satu task publisher per quiz mengirim hasilnya paling
+sering sekali per ``STATS_STREAM_INTERVAL``; payload diserialisasi sekali
+untuk semua subscriber quiz tersebut. Perubahan yang tidak bisa dihitung
+inkremental (hapus attempt, regrade, perubahan poin) memicu query ulang,
+begitu juga resync berkala agar submit di worker lain ikut terhitung.
+"""
+import asyncio
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional, Set
+from sqlalchemy import and_, case, func, select
+from starlette.concurrency import run_in_threadpool
+from config import settings
+from logger import logger
+
+from database import run_in_session
+from exceptions import QuizNotFoundException
+from models import Quiz, Question, QuizAttempt
+from schemas import QuizLiveStats
+
+# Batas lulus sama dengan get_quiz_stats: >= 60% dari total poin
+PASS_PERCENTAGE = 60
+
+class QuizStatsState:
+    __slots__ = (
+        "quiz_id", "quiz_title", "max_score", "started", "completed", "score_sum", "time_sum", "passed",
+        "version", "published_version", "seeded_at", "needs_seed", "seed_lock", "subscribers", "task", "payload"
+    )
+
+    def __init__(self, quiz_id: int):
+        self.quiz_id = quiz_id
+        self.quiz_title = ""
+        self.max_score = 0
+        self.started = self.completed = self.score_sum = self.time_sum = self.passed = 0
+        self.version = 0
+        self.published_version = -1
+        self.seeded_at: Optional[float] = None
+        self.needs_seed = True
+        self.seed_lock = asyncio.Lock()
+        self.subscribers: Set[asyncio.Queue] = set()
+        self.task: Optional[asyncio.Task] = None
+        self.payload: Optional[str] = None
+
+def _load_counters(db, quiz_id: int) -> dict:
+    quiz = db.execute(select(Quiz.title).where(Quiz.id == quiz_id, Quiz.deleted_at.is_(None))).first()
+    if not quiz:
+        raise QuizNotFoundException(quiz_id)
+    max_score = db.execute(
+        select(func.coalesce(func.sum(Question.points), 0)).where(Question.quiz_id == quiz_id)
+    ).scalar()
+    completed = QuizAttempt.is_completed == True
+    row = db.execute(
+        select(
+            func.count(QuizAttempt.id),
+            func.sum(case((completed, 1), else_=0)),
+            func.sum(case((completed, func.coalesce(QuizAttempt.score, 0)), else_=0)),
+            func.sum(case((completed, func.coalesce(QuizAttempt.time_taken, 0)), else_=0)),
+            func.sum(case((and_(completed, QuizAttempt.score * 100 >= max_score * PASS_PERCENTAGE), 1), else_=0))
+        ).where(QuizAttempt.quiz_id == quiz_id)
+    ).one()
+    return {
+        "quiz_title": quiz.title,
+        "max_score": max_score or 0,
+        "started": row[0] or 0,
+        "completed": row[1] or 0,
+        "score_sum": row[2] or 0,
+        "time_sum": row[3] or 0,
+        "passed": row[4] or 0,
+    }
+
+class QuizStatsStreams:
+    """Registry state statistik per quiz yang sedang punya subscriber SSE.
+
+    Event dari CRUD datang dari thread pool, jadi counter dijaga ``threading.Lock``;
+    subscriber dan publisher hanya berjalan di event loop. Quiz tanpa subscriber
+    tidak punya state, sehingga event untuk quiz itu hanya berupa lookup dict.
+    """
+
+    def __init__(self, interval: float, resync_interval: float):
+        self.interval = interval
+        self.resync_interval = resync_interval
+        self._lock = threading.Lock()
+        self._states: Dict[int, QuizStatsState] = {}
+
+    # Event dari CRUD (thread mana saja)
+    def record_started(self, quiz_id: int, count: int = 1) -> None:
+        with self._lock:
+            state = self._states.get(quiz_id)
+            if state is not None:
+                state.started += count
+                state.version += 1
+
+    def record_completed(self, quiz_id: int, score: int, time_taken: int) -> None:
+        with self._lock:
+            state = self._states.get(quiz_id)
+            if state is not None:
+                score = score or 0
+                state.completed += 1
+                state.score_sum += score
+                state.time_sum += time_taken or 0
+                if state.max_score > 0 and score * 100 >= state.max_score * PASS_PERCENTAGE:
+                    state.passed += 1
+                state.version += 1
+
+    def invalidate(self, quiz_id: int) -> None:
+        with self._lock:
+            state = self._states.get(quiz_id)
+            if state is not None:
+                state.needs_seed = True
+
+    # Subscriber (event loop)
+    async def subscribe(self, quiz_id: int) -> asyncio.Queue:
+        """Queue berisi payload JSON terbaru; raise QuizNotFoundException jika quiz tidak ada."""
+        with self._lock:
+            state = self._states.get(quiz_id)
+            if state is None:
+                state = self._states[quiz_id] = QuizStatsState(quiz_id)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        state.subscribers.add(queue)
+        try:
+            await self._seed(state)
+        except Exception:
+            self.unsubscribe(quiz_id, queue)
+            raise
+        if state.payload is None or state.published_version != state.version:
+            self._publish(state)
+        else:
+            queue.put_nowait(state.payload)
+        if state.task is None:
+            state.task = asyncio.create_task(self._run(state))
+        return queue
+
+    def unsubscribe(self, quiz_id: int, queue: asyncio.Queue) -> None:
+        with self._lock:
+            state = self._states.get(quiz_id)
+            if state is None:
+                return
+            state.subscribers.discard(queue)
+            if state.subscribers:
+                return
+            self._states.pop(quiz_id, None)
+        if state.task is not None:
+            state.task.cancel()
+
+    async def _seed(self, state: QuizStatsState) -> None:
+        async with state.seed_lock:
+            if not state.needs_seed:
+                return
+            with self._lock:
+                state.needs_seed = False
+            try:
+                counters = await run_in_threadpool(run_in_session, _load_counters, state.quiz_id)
+            except Exception:
+                with self._lock:
+                    state.needs_seed = True
+                raise
+            with self._lock:
+                for name, value in counters.items():
+                    setattr(state, name, value)
+                state.seeded_at = time.monotonic()
+                state.version += 1
+
+    def _publish(self, state: QuizStatsState) -> None:
+        with self._lock:
+            version = state.version
+            completed, max_score = state.completed, state.max_score
+            stats = QuizLiveStats(
+                quiz_id=state.quiz_id,
+                quiz_title=state.quiz_title,
+                attempts_started=state.started,
+                total_attempts=completed,
+                average_score=round(state.score_sum / completed / max_score * 100, 2) if completed and max_score > 0 else 0.0,
+                pass_rate=round(state.passed / completed * 100, 2) if completed and max_score > 0 else 0.0,
+                average_time=round(state.time_sum / completed, 2) if completed else 0.0,
+                updated_at=datetime.utcnow()
+            )
+        state.payload = stats.model_dump_json()
+        state.published_version = version
+        for queue in list(state.subscribers):
+            if queue.full():
+                queue.get_nowait()  # subscriber lambat cukup menerima nilai terbaru
+            queue.put_nowait(state.payload)
+
+    async def _run(self, state: QuizStatsState) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                if state.seeded_at is None or time.monotonic() - state.seeded_at >= self.resync_interval:
+                    self.invalidate(state.quiz_id)
+                await self._seed(state)
+                if state.published_version != state.version:
+                    self._publish(state)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error stream statistik quiz {state.quiz_id}: {str(e)}")
+
+stats_streams = QuizStatsStreams(settings.STATS_STREAM_INTERVAL, settings.STATS_STREAM_RESYNC_INTERVAL)
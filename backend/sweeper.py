@@ -0,0 +1,213 @@
+"""Sweeper attempt terbengkalai: attempt yang dimulai tapi tidak pernah di-submit.
+
+Sweep dijalankan berkala sebagai background job dan bekerja per batch kecil
+(``ATTEMPT_SWEEP_BATCH_SIZE`` attempt per transaksi) di atas index
+``(is_completed, started_at)``, sehingga hanya attempt terbuka yang dibaca:
+- Quiz dengan ``time_limit``: attempt yang melewati batas waktu (ditambah
+  ``ATTEMPT_SWEEP_GRACE``) ditutup dan dinilai dari jawaban yang sudah tersimpan.
+- Quiz tanpa ``time_limit``: attempt yang lebih tua dari ``ATTEMPT_STALE_AGE``
+  dihapus jika belum punya jawaban, atau ditutup dengan nilai jawabannya jika ada.
+
+Attempt milik sesi live yang berjalan di worker ini, atau yang masih menerima
+jawaban dalam ``LIVE_IDLE_TIMEOUT`` terakhir (sesi live di worker lain),
+dilewati; penutupannya urusan ``complete_live_attempts`` di akhir sesi.
+"""
+import asyncio
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import bindparam, case, delete, exists, func, select
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from config import settings
+from logger import logger
+from models import Quiz, Question, QuizAttempt, UserAnswer
+from partitions import answers_since, is_supported
+import rollups
+
+_attempts = QuizAttempt.__table__
+# is_completed menjaga attempt yang di-submit di antara SELECT dan UPDATE
+_CLOSE_ATTEMPT = _attempts.update().where(
+    _attempts.c.id == bindparam("attempt_id"),
+    _attempts.c.is_completed == False
+).values(
+    score=bindparam("new_score"),
+    time_taken=bindparam("new_time_taken"),
+    completed_at=bindparam("closed_at"),
+    is_completed=True
+)
+# Di PostgreSQL started_at ikut di WHERE agar hanya partisi attempt tersebut yang
+# disentuh. Tidak dipakai di SQLite: started_at dari CURRENT_TIMESTAMP disimpan tanpa
+# pecahan detik sehingga tidak pernah sama dengan datetime yang di-bind
+_CLOSE_PARTITIONED_ATTEMPT = _CLOSE_ATTEMPT.where(_attempts.c.started_at == bindparam("attempt_started_at"))
+
+def _live_quiz_ids() -> set:
+    from live import live_hub
+    return {session.quiz_id for session in list(live_hub.sessions.values())}
+
+def _candidates(db: Session, quiz_ids, cutoff: datetime, active_since: datetime, live_quiz_ids: set) -> list:
+    recent_answer = exists().where(
+        UserAnswer.attempt_id == QuizAttempt.id,
+        UserAnswer.answered_at >= active_since
+    )
+    statement = select(QuizAttempt.id, QuizAttempt.quiz_id, QuizAttempt.started_at, QuizAttempt.time_taken).where(
+        QuizAttempt.is_completed == False,
+        QuizAttempt.started_at < cutoff,
+        QuizAttempt.quiz_id.in_(quiz_ids),
+        ~recent_answer
+    ).order_by(QuizAttempt.started_at).limit(settings.ATTEMPT_SWEEP_BATCH_SIZE)
+    if live_quiz_ids:
+        statement = statement.where(QuizAttempt.quiz_id.notin_(live_quiz_ids))
+    if db.get_bind().dialect.name == "postgresql":
+        # Sweep paralel (worker lain) melewati baris yang sedang dikunci
+        statement = statement.with_for_update(skip_locked=True)
+    return db.execute(statement).all()
+
+def _sweep_batch(db: Session, rows: list, time_limit: Optional[int]) -> tuple:
+    """Tutup/hapus satu batch attempt; mengembalikan jumlah yang ditutup dan dihapus per quiz.
+
+    ``completed_at`` diambil per batch tepat sebelum UPDATE, sehingga batch yang
+    commit belakangan tidak mendapat completed_at yang sudah dilewati watermark snapshot.
+    """
+    partitioned = is_supported(db)
+    graded = {
+        attempt_id: (answers, score)
+        for attempt_id, answers, score in db.execute(
+            select(
+                UserAnswer.attempt_id,
+                func.count(),
+                func.coalesce(func.sum(case((UserAnswer.is_correct == True, Question.points), else_=0)), 0)
+            ).join(Question, Question.id == UserAnswer.question_id).where(
+                UserAnswer.attempt_id.in_([row.id for row in rows]),
+                *answers_since(db, min(row.started_at for row in rows))
+            ).group_by(UserAnswer.attempt_id)
+        )
+    }
+
+    closing = []
+    purging = []
+    for row in rows:
+        if time_limit is None and row.id not in graded:
+            purging.append(row)
+        else:
+            closing.append({
+                "attempt_id": row.id,
+                "attempt_started_at": row.started_at,
+                "quiz_id": row.quiz_id,
+                "new_score": graded.get(row.id, (0, 0))[1],
+                "new_time_taken": time_limit if time_limit is not None else row.time_taken or 0
+            })
+
+    closed = defaultdict(int)
+    if closing:
+        closed_at = datetime.utcnow()
+        for values in closing:
+            values["closed_at"] = closed_at
+        db.connection().execute(_CLOSE_PARTITIONED_ATTEMPT if partitioned else _CLOSE_ATTEMPT, closing)
+        totals = defaultdict(lambda: [0, 0, 0])
+        for values in closing:
+            total = totals[values["quiz_id"]]
+            total[0] += 1
+            total[1] += values["new_score"]
+            total[2] += values["new_time_taken"]
+        for quiz_id, (count, score_sum, time_taken_sum) in totals.items():
+            rollups.record_completed_many(db, quiz_id, closed_at, count, score_sum, time_taken_sum)
+            closed[quiz_id] = count
+
+    purged = defaultdict(int)
+    if purging:
+        statement = delete(QuizAttempt).where(
+            QuizAttempt.id.in_([row.id for row in purging]),
+            QuizAttempt.is_completed == False
+        )
+        if partitioned:
+            statement = statement.where(QuizAttempt.started_at >= min(row.started_at for row in purging))
+        db.execute(statement)
+        # Counter attempts_started dikurangi per bucket jam started_at
+        buckets = defaultdict(int)
+        for row in purging:
+            buckets[(row.quiz_id, row.started_at.replace(minute=0, second=0, microsecond=0))] += 1
+        for (quiz_id, bucket), count in buckets.items():
+            rollups.record_deleted_many(db, quiz_id, bucket, count)
+            purged[quiz_id] += count
+    return closed, purged
+
+def _invalidate(closed: dict, purged: dict) -> None:
+    from leaderboard import leaderboards
+    from analysis import item_analysis
+    from stats_stream import stats_streams
+    for quiz_id in closed:
+        leaderboards.invalidate(quiz_id)
+        item_analysis.invalidate(quiz_id)
+    for quiz_id in set(closed) | set(purged):
+        stats_streams.invalidate(quiz_id)
+
+def sweep(db: Session, now: Optional[datetime] = None, context=None) -> dict:
+    """Satu putaran sweep; mengembalikan jumlah attempt yang ditutup dan dihapus.
+
+    ``completed_at`` attempt yang ditutup adalah waktu commit batch-nya, sehingga
+    snapshot inkremental tetap menangkapnya (watermark-nya berdasarkan completed_at).
+    Cutoff dihitung dari ``now`` dalam UTC; started_at dari ``now()`` database juga
+    UTC karena timezone session PostgreSQL dipatok ke UTC (lihat database.py).
+    """
+    now = now or datetime.utcnow()
+    active_since = now - timedelta(seconds=settings.LIVE_IDLE_TIMEOUT)
+    live_quiz_ids = _live_quiz_ids()
+    existing_quizzes = select(Quiz.id).where(Quiz.deleted_at.is_(None))
+
+    time_limits = db.execute(
+        select(Quiz.time_limit).where(Quiz.time_limit > 0, Quiz.deleted_at.is_(None)).distinct()
+    ).scalars().all()
+    db.rollback()
+    phases = [
+        (time_limit, now - timedelta(seconds=time_limit + settings.ATTEMPT_SWEEP_GRACE),
+         existing_quizzes.where(Quiz.time_limit == time_limit))
+        for time_limit in sorted(time_limits)
+    ]
+    phases.append((
+        None, now - timedelta(seconds=settings.ATTEMPT_STALE_AGE),
+        existing_quizzes.where(func.coalesce(Quiz.time_limit, 0) <= 0)
+    ))
+
+    result = {"closed": 0, "purged": 0}
+    for index, (time_limit, cutoff, quiz_ids) in enumerate(phases):
+        while True:
+            try:
+                rows = _candidates(db, quiz_ids, cutoff, active_since, live_quiz_ids)
+                if not rows:
+                    db.rollback()
+                    break
+                closed, purged = _sweep_batch(db, rows, time_limit)
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            _invalidate(closed, purged)
+            result["closed"] += sum(closed.values())
+            result["purged"] += sum(purged.values())
+            if context:
+                context.check_cancelled()
+            if len(rows) < settings.ATTEMPT_SWEEP_BATCH_SIZE:
+                break
+        if context:
+            context.report((index + 1) / len(phases) * 100)
+
+    if result["closed"] or result["purged"]:
+        logger.info(f"Sweep attempt: {result['closed']} ditutup, {result['purged']} dihapus")
+    return result
+
+async def sweeper_loop(interval: Optional[int] = None) -> None:
+    """Jadwalkan job sweep attempt secara berkala (dipakai saat startup app)."""
+    from jobs import job_runner
+    interval = interval or settings.ATTEMPT_SWEEP_INTERVAL
+    while True:
+        try:
+            await run_in_threadpool(
+                job_runner.submit, "sweep_attempts", {}, f"sweep_attempts:{int(time.time() // interval)}"
+            )
+        except Exception as e:
+            logger.error(f"Error scheduling sweep attempt: {str(e)}")
+        await asyncio.sleep(interval)
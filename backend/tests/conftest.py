@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Modul backend diimpor sebagai top-level (from config import settings, dst.)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,31 @@
+"""Plan check hot query terhadap fixture sintetis.
+
+Default-nya database SQLite sementara. Di CI, set ``PLAN_CHECK_DATABASE_URL`` ke
+database PostgreSQL scratch (kosong) agar plan dialect utama, termasuk tabel
+partisi quiz_attempts/user_answers, ikut dicek.
+"""
+import os
+
+import pytest
+from sqlalchemy import create_engine
+
+import migrations
+from migrations.plan_check import check_plans, seed_fixture
+
+@pytest.fixture(scope="module")
+def engine(tmp_path_factory):
+    url = os.getenv("PLAN_CHECK_DATABASE_URL") or f"sqlite:///{tmp_path_factory.mktemp('plan_check') / 'plan_check.db'}"
+    engine = create_engine(url)
+    migrations.upgrade(engine)
+    yield engine
+    engine.dispose()
+
+def test_plan_check_refuses_unseeded_tables(engine):
+    if os.getenv("PLAN_CHECK_DATABASE_URL"):
+        pytest.skip("database CI mungkin sudah berisi fixture")
+    failures = check_plans(engine)
+    assert failures and all("baris" in failure for failure in failures)
+
+def test_hot_queries_use_indexes_on_seeded_fixture(engine):
+    seed_fixture(engine)
+    assert check_plans(engine) == []
@@ -1,77 +0,0 @@
--- Table: quizzes
-CREATE TABLE quizzes (
-    id SERIAL PRIMARY KEY,
-    title VARCHAR(255) NOT NULL,
-    description TEXT,
-    category VARCHAR(100),
-    difficulty_level VARCHAR(20) CHECK (difficulty_level IN ('easy', 'medium', 'hard')),
-    time_limit INTEGER DEFAULT 0,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    is_active BOOLEAN DEFAULT true
-);
-
--- Table: questions
-CREATE TABLE questions (
-    id SERIAL PRIMARY KEY,
-    quiz_id INTEGER REFERENCES quizzes(id) ON DELETE CASCADE,
-    question_text TEXT NOT NULL,
-    question_type VARCHAR(20) DEFAULT 'multiple_choice' CHECK (question_type IN ('multiple_choice', 'true_false', 'text')),
-    points INTEGER DEFAULT 1,
-    explanation TEXT,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
-
--- Table: answer_options
-CREATE TABLE answer_options (
-    id SERIAL PRIMARY KEY,
-    question_id INTEGER REFERENCES questions(id) ON DELETE CASCADE,
-    option_text TEXT NOT NULL,
-    is_correct BOOLEAN DEFAULT false,
-    option_order INTEGER DEFAULT 0
-);
-
--- Table: quiz_attempts
-CREATE TABLE quiz_attempts (
-    id SERIAL PRIMARY KEY,
-    quiz_id INTEGER REFERENCES quizzes(id) ON DELETE CASCADE,
-    participant_name VARCHAR(255),
-    participant_email VARCHAR(255),
-    score INTEGER DEFAULT 0,
-    total_questions INTEGER DEFAULT 0,
-    time_taken INTEGER DEFAULT 0, -- in seconds
-    started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    completed_at TIMESTAMP,
-    is_completed BOOLEAN DEFAULT false
-);
-
--- Table: user_answers
-CREATE TABLE user_answers (
-    id SERIAL PRIMARY KEY,
-    attempt_id INTEGER REFERENCES quiz_attempts(id) ON DELETE CASCADE,
-    question_id INTEGER REFERENCES questions(id) ON DELETE CASCADE,
-    selected_option_id INTEGER REFERENCES answer_options(id),
-    text_answer TEXT, -- for text questions
-    is_correct BOOLEAN DEFAULT false,
-    answered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
-
--- Indexes for better performance
-CREATE INDEX idx_questions_quiz_id ON questions(quiz_id);
-CREATE INDEX idx_answer_options_question_id ON answer_options(question_id);
-CREATE INDEX idx_quiz_attempts_quiz_id ON quiz_attempts(quiz_id);
-CREATE INDEX idx_user_answers_attempt_id ON user_answers(attempt_id);
-CREATE INDEX idx_user_answers_question_id ON user_answers(question_id);
-
--- Update timestamp function (for PostgreSQL)
-CREATE OR REPLACE FUNCTION update_updated_at_column()
-RETURNS TRIGGER AS $$
-BEGIN
-    NEW.updated_at = CURRENT_TIMESTAMP;
-    RETURN NEW;
-END;
-$$ language 'plpgsql';
-
--- Trigger for updating updated_at
-CREATE TRIGGER update_quizzes_updated_at BEFORE UPDATE ON quizzes
-    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
\ No newline at end of file
@@ -2,7 +2,7 @@ import React, { useState } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import { useApi, useAsyncAction } from '../hooks/useApi';
 import QuizAPI from '../services/api';
-import { QuizWithQuestions, QuestionCreateRequest, QuestionType, Question } from '../types/quiz';
+import { QuizWithQuestions, QuestionCreateRequest, QuestionUpdateRequest, QuestionType, Question } from '../types/quiz';
 
 interface QuestionFormData {
   question_text: string;
@@ -10,6 +10,7 @@ interface QuestionFormData {
   points: number;
   explanation: string;
   options: Array<{
+    id?: number;
     option_text: string;
     is_correct: boolean;
     option_order: number;
@@ -65,19 +66,20 @@ const QuestionManagement: React.FC = () => {
   const handleEditQuestion = (question: Question) => {
     setEditingQuestion(question);
     
-    let options: Array<{ option_text: string; is_correct: boolean; option_order: number }> = [];
+    let options: QuestionFormData['options'] = [];
     
     // Ensure proper options based on question type
     if (question.question_type === 'true_false') {
       options = [
-        { option_text: 'True', is_correct: question.options[0]?.is_correct || false, option_order: 1 },
-        { option_text: 'False', is_correct: question.options[1]?.is_correct || false, option_order: 2 }
+        { id: question.options[0]?.id, option_text: 'True', is_correct: question.options[0]?.is_correct || false, option_order: 1 },
+        { id: question.options[1]?.id, option_text: 'False', is_correct: question.options[1]?.is_correct || false, option_order: 2 }
       ];
     } else if (question.question_type === 'text') {
       options = [];
     } else {
-      // Multiple choice - map options without id property
+      // Multiple choice - keep option ids so edits update the same options
       options = question.options.map(opt => ({
+        id: opt.id,
         option_text: opt.option_text,
         is_correct: opt.is_correct || false,
         option_order: opt.option_order
@@ -121,7 +123,7 @@ const QuestionManagement: React.FC = () => {
     }
 
     try {
-      let questionData: QuestionCreateRequest;
+      let questionData: QuestionCreateRequest & QuestionUpdateRequest;
       
       if (questionForm.question_type === 'true_false') {
         questionData = {
@@ -130,8 +132,8 @@ const QuestionManagement: React.FC = () => {
           points: questionForm.points,
           explanation: questionForm.explanation.trim() || undefined,
           options: [
-            { option_text: 'True', is_correct: questionForm.options[0]?.is_correct || false, option_order: 1 },
-            { option_text: 'False', is_correct: questionForm.options[1]?.is_correct || false, option_order: 2 }
+            { id: questionForm.options[0]?.id, option_text: 'True', is_correct: questionForm.options[0]?.is_correct || false, option_order: 1 },
+            { id: questionForm.options[1]?.id, option_text: 'False', is_correct: questionForm.options[1]?.is_correct || false, option_order: 2 }
           ]
         };
       } else if (questionForm.question_type === 'text') {
@@ -149,6 +151,7 @@ const QuestionManagement: React.FC = () => {
           points: questionForm.points,
           explanation: questionForm.explanation.trim() || undefined,
           options: questionForm.options.map(opt => ({
+            id: opt.id,
             option_text: opt.option_text.trim(),
             is_correct: opt.is_correct,
             option_order: opt.option_order
@@ -2,7 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { useParams, useNavigate, useSearchParams } from 'react-router-dom';
 import { useApi, useAsyncAction } from '../hooks/useApi';
 import { useQuiz } from '../hooks/useQuiz';
-import QuizAPI from '../services/api';
+import QuizAPI, { setParticipantEmail } from '../services/api';
 import QuizStorageService from '../utils/quizStorage';
 import QuestionCard from '../components/QuestionCard';
 import { QuizWithQuestions, QuizAttempt, UserAnswer, UserAnswerSubmit } from '../types/quiz';
@@ -44,6 +44,7 @@ const Quiz: React.FC = () => {
       if (existingAttemptId) {
         const attempt = QuizStorageService.getAttemptById(Number(existingAttemptId));
         if (attempt && !attempt.is_completed) {
+          setParticipantEmail(attempt.participant_email);
           setCurrentAttempt(attempt);
           setShowParticipantForm(false);
         }
@@ -56,6 +57,7 @@ const Quiz: React.FC = () => {
           );
           
           if (resumeQuiz) {
+            setParticipantEmail(incompleteAttempt.participant_email);
             setCurrentAttempt(incompleteAttempt);
             setShowParticipantForm(false);
           }
@@ -81,6 +83,7 @@ const Quiz: React.FC = () => {
         participant_email: participantInfo.email.trim() || undefined,
       };
 
+      setParticipantEmail(attemptData.participant_email);
       const attempt = await startAttempt(QuizAPI.startAttempt, attemptData);
       
       if (attempt) {
@@ -119,11 +122,11 @@ const handleSubmitQuiz = async () => {
     try {
       // Update time taken via API
       if (currentAttempt.id) {
-        await QuizAPI.updateTimeTaken(currentAttempt.id, finalTimeTaken);
+        await QuizAPI.updateTimeTaken(currentAttempt.id, finalTimeTaken, currentAttempt.started_at);
       }
 
       // Submit answers via API
-      const completedAttempt = await QuizAPI.submitAnswers(currentAttempt.id, answerData);
+      const completedAttempt = await QuizAPI.submitAnswers(currentAttempt.id, answerData, currentAttempt.started_at);
 
       if (completedAttempt) {
         const updatedAttempt = {
@@ -137,7 +140,7 @@ const handleSubmitQuiz = async () => {
         QuizStorageService.saveAttempt(updatedAttempt);
         
         try {
-          const results = await QuizAPI.getResults(currentAttempt.id);
+          const results = await QuizAPI.getResults(currentAttempt.id, currentAttempt.started_at);
           if (results) {
             const consistentResults = {
               ...results,
@@ -18,7 +18,10 @@ const Results: React.FC = () => {
     loading,
     error,
   } = useApi<QuizResult>(
-    () => QuizAPI.getResults(Number(attemptId)),
+    () => QuizAPI.getResults(
+      Number(attemptId),
+      QuizStorageService.getAttemptById(Number(attemptId))?.started_at
+    ),
     [attemptId]
   );
 
@@ -24,9 +24,42 @@ const api = axios.create({
   },
 });
 
+// Participant identity for per-participant rate limiting on the backend
+const PARTICIPANT_ID_KEY = 'quizParticipantId';
+let participantId: string | undefined;
+let participantEmail: string | undefined;
+
+function getParticipantId(): string {
+  if (participantId) return participantId;
+  try {
+    participantId = localStorage.getItem(PARTICIPANT_ID_KEY) || undefined;
+  } catch {
+    // localStorage unavailable (e.g. private mode); keep an in-memory id
+  }
+  if (!participantId) {
+    participantId = typeof crypto !== 'undefined' && 'randomUUID' in crypto
+      ? crypto.randomUUID()
+      : `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+    try {
+      localStorage.setItem(PARTICIPANT_ID_KEY, participantId);
+    } catch {
+      // ignore, the id simply won't survive a reload
+    }
+  }
+  return participantId;
+}
+
+export function setParticipantEmail(email?: string | null): void {
+  participantEmail = email?.trim() || undefined;
+}
+
 // Request interceptor for logging and error handling
 api.interceptors.request.use(
   (config) => {
+    config.headers['X-Participant-Id'] = getParticipantId();
+    if (participantEmail) {
+      config.headers['X-Participant-Email'] = participantEmail;
+    }
     if (ENV.DEBUG) {
       console.log(`[API] ${config.method?.toUpperCase()} ${config.url}`);
     }
@@ -93,6 +126,10 @@ function handleApiError(error: any): string {
   }
 }
 
+function attemptParams(startedAt?: string) {
+  return startedAt ? { started_at: startedAt } : undefined;
+}
+
 export class QuizAPI {
 // Quiz Management
 
@@ -177,23 +214,32 @@ export class QuizAPI {
     return response.data;
   }
 
-  static async getAttempt(attemptId: number): Promise<QuizAttempt> {
-    const response = await api.get<QuizAttempt>(`/attempt/${attemptId}`);
+  // started_at lets the backend look the attempt up in its own monthly partition
+  static async getAttempt(attemptId: number, startedAt?: string): Promise<QuizAttempt> {
+    const response = await api.get<QuizAttempt>(`/attempt/${attemptId}`, {
+      params: attemptParams(startedAt),
+    });
     return response.data;
   }
 
-  static async submitAnswers(attemptId: number, answers: UserAnswerSubmit): Promise<QuizAttempt> {
-    const response = await api.post<QuizAttempt>(`/attempt/${attemptId}/submit`, answers);
+  static async submitAnswers(attemptId: number, answers: UserAnswerSubmit, startedAt?: string): Promise<QuizAttempt> {
+    const response = await api.post<QuizAttempt>(`/attempt/${attemptId}/submit`, answers, {
+      params: attemptParams(startedAt),
+    });
     return response.data;
   }
 
-  static async getResults(attemptId: number): Promise<QuizResult> {
-    const response = await api.get<QuizResult>(`/attempt/${attemptId}/results`);
+  static async getResults(attemptId: number, startedAt?: string): Promise<QuizResult> {
+    const response = await api.get<QuizResult>(`/attempt/${attemptId}/results`, {
+      params: attemptParams(startedAt),
+    });
     return response.data;
   }
 
-  static async updateTimeTaken(attemptId: number, timeTaken: number): Promise<void> {
-    await api.put<void>(`/attempt/${attemptId}/time`, { time_taken: timeTaken });
+  static async updateTimeTaken(attemptId: number, timeTaken: number, startedAt?: string): Promise<void> {
+    await api.put<void>(`/attempt/${attemptId}/time`, { time_taken: timeTaken }, {
+      params: attemptParams(startedAt),
+    });
   }
 }
 
@@ -135,12 +135,17 @@ export interface AnswerOptionCreate {
   option_order: number;
 }
 
+// Existing options keep their id so answers that selected them stay valid
+export interface AnswerOptionUpdate extends AnswerOptionCreate {
+  id?: number;
+}
+
 export interface QuestionUpdateRequest {
   question_text?: string;
   question_type?: QuestionType;
   points?: number;
   explanation?: string;
-  options?: AnswerOptionCreate[];
+  options?: AnswerOptionUpdate[];
 }
 
 // User Statistics